@@ -0,0 +1,330 @@
+"""
+Adaptive batch sizing for bulk Smartsheet uploads.
+
+A fixed batch size is wrong for some boards: rows with very long descriptions
+make large batches exceed the request size limit, while small rows waste round
+trips. AdaptiveBatcher caps each batch by item count and by serialized payload
+bytes, and adjusts the count from what it observes:
+
+- the batch is halved and retried when the API rejects it as too large (413);
+  the byte cap then grows back after successful batches, up to just below
+  the smallest size rejected
+- when a request times out or its connection drops, the caller's confirm
+  callback checks whether the batch was applied anyway before it is resent,
+  since endpoints like add_rows are not idempotent
+- the batch grows while latency per item stays flat
+- the batch shrinks when latency per item rises sharply
+
+The batcher is independent of the endpoint: callers pass a ``send`` callable,
+so the same class drives row inserts and any other bulk stage.
+"""
+
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from smartsheet.exceptions import ApiError, ServerTimeoutExceededError, UnexpectedRequestError
+
+from bulk_rows import RowPayload
+import json_backend
+from migration_log import get_logger
+
+log = get_logger('batcher')
+
+# Smartsheet rejects request bodies above a few MB; stay well below
+DEFAULT_MAX_BATCH_BYTES = 1_000_000
+
+# HTTP status of a request body the API refuses for its size
+PAYLOAD_TOO_LARGE_STATUS = 413
+
+# HTTP statuses of a request that timed out while the server handled it
+TIMEOUT_STATUSES = (408, 504)
+
+
+def _status_code(error: ApiError) -> Any:
+    return getattr(getattr(error.error, 'result', None), 'status_code', None)
+
+
+def is_batch_too_large_error(error: Exception) -> bool:
+    """
+    Check whether an API error means the batch should be made smaller.
+
+    Args:
+        error: Exception raised by a Smartsheet client call
+
+    Returns:
+        True for payload-too-large responses; the request was not applied
+    """
+    return isinstance(error, ApiError) and _status_code(error) == PAYLOAD_TOO_LARGE_STATUS
+
+
+def is_uncertain_error(error: Exception) -> bool:
+    """
+    Check whether a failed request may have been applied anyway.
+
+    Args:
+        error: Exception raised by a Smartsheet client call
+
+    Returns:
+        True for timeouts and connection errors (UnexpectedRequestError
+        wraps every error of the HTTP library)
+    """
+    if isinstance(error, (ServerTimeoutExceededError, UnexpectedRequestError)):
+        return True
+    return isinstance(error, ApiError) and _status_code(error) in TIMEOUT_STATUSES
+
+
+def resend(batch: List[Any]) -> None:
+    """
+    confirm callback for idempotent requests (e.g. update_rows).
+
+    Applying such a request twice does no harm, so the batch is always resent.
+    """
+    return None
+
+
+def json_payload_size(item: Any) -> int:
+    """
+    Return the serialized JSON size of an item in bytes.
+
+    Args:
+        item: SDK model (anything with to_dict) or plain JSON-compatible value
+
+    Returns:
+        Length of the UTF-8 encoded JSON representation
+    """
+    if hasattr(item, 'to_dict'):
+        item = item.to_dict()
+    return len(json_backend.dumps(item))
+
+
+# Approximate JSON overhead of one cell / one object value entry (keys, braces)
+CELL_OVERHEAD_BYTES = 40
+OBJECT_VALUE_ENTRY_OVERHEAD_BYTES = 50
+
+
+def _text_size(value: Any) -> int:
+    if value is None:
+        return 0
+    text = value if isinstance(value, str) else str(value)
+    # Plain ASCII is one byte per character; only encode when needed
+    return len(text) if text.isascii() else len(text.encode('utf-8'))
+
+
+def row_payload_size(row: Any) -> int:
+    """
+    Estimate the serialized JSON size of a Row without serializing it.
+
+    Serializing an SDK Row walks every model attribute and costs several
+    milliseconds, and the SDK serializes each row again when sending it.
+    Summing the cell values plus a fixed per-cell overhead is orders of
+    magnitude cheaper and close enough to size batches.
+
+    Args:
+        row: Row object built by the migrator, or a RowPayload (exact size)
+
+    Returns:
+        Approximate size in bytes
+    """
+    if isinstance(row, RowPayload):
+        return row.size
+    size = CELL_OVERHEAD_BYTES
+    for cell in row.cells:
+        size += CELL_OVERHEAD_BYTES + _text_size(cell.value)
+        object_value = cell.object_value
+        if object_value is not None:
+            for entry in getattr(object_value, 'values', None) or []:
+                size += OBJECT_VALUE_ENTRY_OVERHEAD_BYTES
+                if isinstance(entry, str):
+                    size += _text_size(entry)
+                else:
+                    size += _text_size(getattr(entry, 'name', None)) + _text_size(getattr(entry, 'email', None))
+    return size
+
+
+class AdaptiveBatcher:
+    """Split items into batches sized by count, payload bytes and observed latency."""
+
+    def __init__(
+        self,
+        name: str = 'items',
+        initial_size: int = 100,
+        min_size: int = 1,
+        max_size: int = 500,
+        max_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+        growth_factor: float = 1.5,
+        latency_tolerance: float = 1.5,
+        size_of: Callable[[Any], int] = json_payload_size
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            name: Label used in log messages and the summary
+            initial_size: Item count of the first batch
+            min_size: Smallest batch; a failing batch of this size is re-raised
+            max_size: Largest batch the endpoint accepts
+            max_bytes: Maximum serialized payload size of one batch
+            growth_factor: Multiplier applied when growing or shrinking
+            latency_tolerance: Per-item latency ratio (vs. the best seen) above
+                which the batch size is reduced
+            size_of: Callable returning the serialized size of one item
+        """
+        self.name = name
+        self.size = max(min_size, min(initial_size, max_size))
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.max_bytes_limit = max_bytes
+        self.rejected_bytes = None      # smallest payload rejected as too large
+        self.growth_factor = growth_factor
+        self.latency_tolerance = latency_tolerance
+        self.size_of = size_of
+
+        self.best_latency_per_item = None
+        self.stats = {
+            'requests': 0,
+            'items': 0,
+            'bytes': 0,
+            'retries': 0,
+            'grown': 0,
+            'shrunk': 0,
+            'seconds': 0.0
+        }
+
+    def _adjust(self, batch_len: int, elapsed: float):
+        """Grow or shrink the next batch from the latency of the last one."""
+        per_item = elapsed / max(batch_len, 1)
+        if self.best_latency_per_item is None or per_item < self.best_latency_per_item:
+            self.best_latency_per_item = per_item
+
+        if per_item > self.best_latency_per_item * self.latency_tolerance:
+            new_size = max(self.min_size, int(self.size / self.growth_factor))
+            if new_size < self.size:
+                self.stats['shrunk'] += 1
+            self.size = new_size
+        elif batch_len >= self.size:
+            # Only grow when the batch was limited by count, not by bytes
+            new_size = min(self.max_size, max(self.size + 1, int(self.size * self.growth_factor)))
+            if new_size > self.size:
+                self.stats['grown'] += 1
+            self.size = new_size
+
+    def _recover_bytes(self):
+        """Grow the byte cap back after a successful batch."""
+        ceiling = self.max_bytes_limit
+        if self.rejected_bytes is not None:
+            ceiling = min(ceiling, self.rejected_bytes - 1)
+        if self.max_bytes < ceiling:
+            self.max_bytes = min(ceiling, int(self.max_bytes * self.growth_factor) + 1)
+
+    def run(
+        self,
+        items: Iterable[Any],
+        send: Callable[[List[Any]], Any],
+        confirm: Optional[Callable[[List[Any]], Any]] = None
+    ) -> Iterator[Tuple[List[Any], Any]]:
+        """
+        Send all items in adaptive batches.
+
+        Items are pulled from the iterable lazily, so callers can pass a
+        generator and avoid materializing every payload up front.
+
+        Args:
+            items: Payload items to send
+            send: Callable uploading one batch and returning its result
+            confirm: Callable called with a batch whose request timed out or
+                lost its connection; returns the result send would have
+                returned if the batch was applied, or None to resend it
+                (resend for idempotent requests). Without it such errors
+                are raised.
+
+        Yields:
+            (batch, result) pairs in input order
+
+        Raises:
+            Exception: Errors from send that are not size related, timeouts
+                and connection errors without confirm, or errors for a batch
+                that is already at the minimum size
+        """
+        iterator = iter(items)
+        pending = deque()   # (item, size) pairs pulled but not yet sent
+        exhausted = False
+
+        while True:
+            # Fill the next batch up to the current count and byte limits
+            batch = []
+            batch_bytes = 0
+            while len(batch) < self.size:
+                if not pending:
+                    if exhausted:
+                        break
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending.append((item, self.size_of(item)))
+                item, item_bytes = pending[0]
+                if batch and batch_bytes + item_bytes > self.max_bytes:
+                    break
+                pending.popleft()
+                batch.append((item, item_bytes))
+                batch_bytes += item_bytes
+
+            if not batch:
+                return
+
+            payload = [item for item, _ in batch]
+            start = time.monotonic()
+            try:
+                result = send(payload)
+                elapsed = time.monotonic() - start
+            except Exception as e:
+                # Latency of the request alone, without the confirm callback
+                elapsed = time.monotonic() - start
+                if is_batch_too_large_error(e):
+                    result = None
+                    if self.rejected_bytes is None or batch_bytes < self.rejected_bytes:
+                        self.rejected_bytes = batch_bytes
+                elif is_uncertain_error(e) and confirm is not None:
+                    # Never resend a batch that was applied before the error
+                    result = confirm(payload)
+                else:
+                    raise
+                if result is not None:
+                    log.warning(f"[WARN] {self.name}: batch of {len(batch)} was applied despite an error ({e})",
+                                extra={'repeat_key': f"{self.name} batch confirmed"})
+                elif len(batch) <= self.min_size:
+                    raise
+                else:
+                    # Put the batch back and retry with half the items
+                    self.stats['retries'] += 1
+                    self.stats['shrunk'] += 1
+                    self.size = max(self.min_size, len(batch) // 2)
+                    self.max_bytes = max(min(self.max_bytes, batch_bytes // 2), 1)
+                    pending.extendleft(reversed(batch))
+                    log.warning(f"[WARN] {self.name}: batch of {len(batch)} failed ({e}), "
+                                f"retrying with {self.size}", extra={'repeat_key': f"{self.name} batch failed"})
+                    continue
+
+            self.stats['requests'] += 1
+            self.stats['items'] += len(batch)
+            self.stats['bytes'] += batch_bytes
+            self.stats['seconds'] += elapsed
+            self._adjust(len(batch), elapsed)
+            self._recover_bytes()
+
+            yield payload, result
+
+    def summary(self) -> str:
+        """Return a one-line summary of the batches sent."""
+        stats = self.stats
+        average = stats['items'] / stats['requests'] if stats['requests'] else 0
+        return (f"{stats['items']} {self.name} in {stats['requests']} requests "
+                f"(avg {average:.0f}/batch, {stats['bytes'] / 1024:.0f} KiB, "
+                f"{stats['retries']} retries, final batch size {self.size})")
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return a copy of the counters collected so far."""
+        return dict(self.stats, name=self.name, batch_size=self.size)
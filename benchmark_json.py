@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Compare the installed JSON backends on a large synthetic Trello export.
+
+For every backend available to json_backend, measures parsing the export
+file and encoding the row payloads the migrator would send for it. Speedups
+are relative to the previous code path: json.load on a text file with the
+garbage collector running, and the stdlib encoder requests uses. Runs
+offline; no API token is needed.
+
+Usage:
+    python benchmark_json.py [--cards=20000] [--comments=50000] [--repeat=3]
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from smartsheet.util import serialize
+
+import json_backend
+from trello_to_smartsheet_kanban import TrelloToSmartsheetMigrator, parse_cli_args
+
+
+def make_synthetic_export(cards: int, comments: int, seed: int = 1) -> dict:
+    """
+    Build a Trello export with realistic field shapes.
+
+    Args:
+        cards: Number of cards
+        comments: Number of comment actions
+        seed: Random seed, so every run measures the same document
+
+    Returns:
+        Board data in the Trello JSON export structure
+    """
+    rnd = random.Random(seed)
+    words = ['migration', 'sheet', 'review', 'deploy', 'fix', 'client', 'résumé', 'équipe', 'data', 'sprint']
+
+    def text(count):
+        return ' '.join(rnd.choice(words) for _ in range(count))
+
+    lists = [{'id': f"list{i:020d}", 'name': f"List {i}", 'closed': False, 'pos': i} for i in range(12)]
+    labels = [{'id': f"label{i:019d}", 'name': f"Label {i}", 'color': 'green'} for i in range(20)]
+    members = [{'id': f"member{i:018d}", 'fullName': f"Prénom{i} Nom{i}", 'username': f"user{i}"}
+               for i in range(40)]
+
+    board_cards = []
+    for i in range(cards):
+        board_cards.append({
+            'id': f"card{i:020d}",
+            'name': text(6),
+            'desc': text(rnd.randint(0, 120)),
+            'idList': rnd.choice(lists)['id'],
+            'idMembers': [member['id'] for member in rnd.sample(members, rnd.randint(0, 3))],
+            'idLabels': [label['id'] for label in rnd.sample(labels, rnd.randint(0, 3))],
+            'shortUrl': f"https://trello.com/c/{i:08d}",
+            'url': f"https://trello.com/c/{i:08d}/card-{i}",
+            'shortLink': f"{i:08d}",
+            'due': '2024-05-01T10:00:00.000Z' if i % 3 == 0 else None,
+            'dateLastActivity': f"2024-0{1 + i % 9}-15T08:30:00.000Z",
+            'closed': i % 25 == 0,
+            'badges': {'votes': 0, 'comments': 0, 'attachments': 0, 'checkItems': 0},
+            'labels': [],
+            'customFieldItems': []
+        })
+
+    actions = []
+    for i in range(comments):
+        card = rnd.choice(board_cards)
+        member = rnd.choice(members)
+        actions.append({
+            'id': f"action{i:018d}",
+            'type': 'commentCard',
+            'date': '2024-03-02T09:00:00.000Z',
+            'data': {'text': text(rnd.randint(5, 60)), 'card': {'id': card['id'], 'name': card['name']}},
+            'memberCreator': {'id': member['id'], 'fullName': member['fullName']}
+        })
+
+    return {
+        'id': 'board', 'name': 'Synthetic board', 'url': 'https://trello.com/b/synthetic',
+        'lists': lists, 'labels': labels, 'members': members,
+        'cards': board_cards, 'actions': actions, 'customFields': []
+    }
+
+
+def best_time(func, repeat: int) -> float:
+    """Return the fastest of several runs of func, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    args, options = parse_cli_args(sys.argv[1:])
+    cards = int(options.get('cards', 20000))
+    comments = int(options.get('comments', 50000))
+    repeat = int(options.get('repeat', 3))
+
+    backends = [name for name in json_backend.BACKEND_ORDER if name in json_backend.AVAILABLE_BACKENDS]
+    print(f"[*] Backends: {', '.join(backends)}")
+    print(f"[*] Building synthetic export: {cards} cards, {comments} comments")
+
+    json_backend.set_backend('stdlib')
+    export = make_synthetic_export(cards, comments)
+
+    with tempfile.TemporaryDirectory(prefix='json_bench_') as tmp_dir:
+        export_path = os.path.join(tmp_dir, 'export.json')
+        with open(export_path, 'wb') as f:
+            f.write(json_backend.dumps(export))
+        size_mb = os.path.getsize(export_path) / (1024 * 1024)
+        print(f"[OK] Export file: {size_mb:.1f} MiB")
+
+        # Row payloads exactly as the SDK serializes them before encoding
+        migrator = TrelloToSmartsheetMigrator('benchmark')
+        data = json_backend.load_file(export_path)
+        data['cards'] = migrator.compact_cards(data['cards'])
+        titles = [col.title for col in migrator.create_smartsheet_columns()]
+        positions = {title: index for index, title in enumerate(titles)}
+        payloads = [serialize(row) for _, row in migrator.iter_card_rows(data, positions)]
+        batches = [payloads[i:i + 500] for i in range(0, len(payloads), 500)]
+        print(f"[OK] Row payloads: {len(payloads)} rows in {len(batches)} batches of 500")
+
+        def legacy_parse():
+            with open(export_path, 'r', encoding='utf-8') as f:
+                json.load(f)
+
+        # requests encodes json= bodies with json.dumps defaults
+        results = [('legacy', best_time(legacy_parse, repeat),
+                    best_time(lambda: [json.dumps(batch).encode('utf-8') for batch in batches], repeat))]
+        for name in backends:
+            json_backend.set_backend(name)
+            parse = best_time(lambda: json_backend.load_file(export_path), repeat)
+            encode = best_time(lambda: [json_backend.dumps(batch) for batch in batches], repeat)
+            results.append((name, parse, encode))
+
+    baseline_parse, baseline_encode = results[0][1], results[0][2]
+    print(f"\n{'Backend':<10} {'Parse (s)':>10} {'MiB/s':>8} {'Speedup':>8} {'Encode (s)':>11} {'Speedup':>8}")
+    for name, parse, encode in results:
+        print(f"{name:<10} {parse:>10.3f} {size_mb / parse:>8.1f} {baseline_parse / parse:>7.1f}x "
+              f"{encode:>11.3f} {baseline_encode / encode:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the board transform functions.
+
+Times the functions every migration runs once per card or comment
+(load_trello_data, build_member_lookup, extract_comments_for_cards,
+create_row_from_card, parse_trello_date and format_comment) on synthetic
+boards of several sizes. Each benchmark processes the whole board, so the
+per-item time is comparable across sizes.
+
+Results can be saved as JSON and compared with a saved baseline; a
+benchmark slower than the baseline by more than the threshold is reported
+as a regression and makes the run exit with status 1. Runs fully offline:
+the migrator's Smartsheet client is replaced by one that refuses any call.
+
+Usage:
+    python benchmark_transform.py [--sizes=500,5000,20000] [--repeat=5]
+                                  [--output=results.json] [--baseline=baseline.json]
+                                  [--threshold=0.10] [--only=NAME,NAME]
+"""
+
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import json_backend
+from benchmark_json import make_synthetic_export
+from migration_log import configure_logging
+from trello_to_smartsheet_kanban import TrelloToSmartsheetMigrator, __version__, parse_cli_args
+
+DEFAULT_SIZES = (500, 5000, 20000)
+
+# Comment actions generated per card
+COMMENTS_PER_CARD = 2.5
+
+# A measurement repeats the function until it has run at least this long (s)
+MIN_MEASURE_TIME = 0.2
+
+# Relative slowdown over the baseline reported as a regression
+DEFAULT_THRESHOLD = 0.10
+
+
+class OfflineClient:
+    """Stand-in Smartsheet client that fails on any API use."""
+
+    def __getattr__(self, name: str):
+        raise RuntimeError(f"Benchmarks must not call the Smartsheet API (accessed client.{name})")
+
+
+def measure(func: Callable[[], Any], repeat: int, min_time: float = MIN_MEASURE_TIME) -> Dict[str, float]:
+    """
+    Time a function, repeating fast functions to get above the timer noise.
+
+    Args:
+        func: Function to time
+        repeat: Number of measurements
+        min_time: Minimum duration of one measurement (seconds)
+
+    Returns:
+        Best and mean time of one call, in seconds, and the loops per measurement
+    """
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1_000_000:
+            break
+        loops *= 10 if elapsed < min_time / 10 else 2
+
+    timings = [elapsed / loops]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        timings.append((time.perf_counter() - start) / loops)
+    return {'best': min(timings), 'mean': sum(timings) / len(timings), 'loops': loops}
+
+
+def build_cases(migrator: TrelloToSmartsheetMigrator, export_path: str) -> Dict[str, tuple]:
+    """
+    Prepare the inputs of every benchmark for one board.
+
+    Args:
+        migrator: Migrator with an offline client
+        export_path: Path of the synthetic export file
+
+    Returns:
+        Dictionary mapping benchmark names to (function, items processed)
+    """
+    data = migrator.load_trello_data(export_path)
+    cards = [card for card in data['cards'] if migrator.is_migrated_card(card)]
+
+    titles = [col.title for col in migrator.create_smartsheet_columns()]
+    column_map = {title: index for index, title in enumerate(titles)}
+    list_lookup = migrator.build_list_lookup(data)
+    member_lookup = migrator.build_member_lookup(data)
+    label_lookup = migrator.build_label_lookup(data)
+
+    comments_by_card = migrator.extract_comments_for_cards(data)
+    comments = [comment for card_comments in comments_by_card.values() for comment in card_comments]
+    dates = [card.get(key) for card in cards for key in ('due', 'dateLastActivity')]
+
+    def create_rows():
+        for card in cards:
+            migrator.create_row_from_card(card, column_map, list_lookup, member_lookup, label_lookup)
+
+    def parse_dates():
+        for date_str in dates:
+            migrator.parse_trello_date(date_str)
+
+    def format_comments():
+        for comment in comments:
+            migrator.format_comment(comment, member_lookup)
+
+    return {
+        'load_trello_data': (lambda: migrator.load_trello_data(export_path), len(data['cards'])),
+        'build_member_lookup': (lambda: migrator.build_member_lookup(data), len(data['members'])),
+        'extract_comments_for_cards': (lambda: migrator.extract_comments_for_cards(data), len(data['actions'])),
+        'create_row_from_card': (create_rows, len(cards)),
+        'parse_trello_date': (parse_dates, len(dates)),
+        'format_comment': (format_comments, len(comments))
+    }
+
+
+def run_suite(sizes: List[int], repeat: int, only: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Run every benchmark at every board size.
+
+    Args:
+        sizes: Board sizes, in cards
+        repeat: Measurements per benchmark
+        only: Optional benchmark names to run
+
+    Returns:
+        Results document: run metadata and one entry per benchmark and size
+    """
+    # The migrator's progress output is not part of the measurement
+    configure_logging(level='warning')
+    migrator = TrelloToSmartsheetMigrator('benchmark')
+    migrator.smartsheet_client = OfflineClient()
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='transform_bench_') as tmp_dir:
+        for cards in sizes:
+            comments = int(cards * COMMENTS_PER_CARD)
+            print(f"[*] Board with {cards} cards, {comments} comments")
+            export_path = os.path.join(tmp_dir, f"export_{cards}.json")
+            with open(export_path, 'wb') as f:
+                f.write(json_backend.dumps(make_synthetic_export(cards, comments)))
+
+            cases = build_cases(migrator, export_path)
+            for name, (func, items) in cases.items():
+                if only and name not in only:
+                    continue
+                timing = measure(func, repeat)
+                key = f"{name}[{cards}]"
+                results[key] = {
+                    'name': name,
+                    'cards': cards,
+                    'items': items,
+                    'best': timing['best'],
+                    'mean': timing['mean'],
+                    'loops': timing['loops'],
+                    'per_item_us': timing['best'] / items * 1e6 if items else 0.0
+                }
+                print(f"   {name:<28} {timing['best'] * 1000:>10.2f} ms  "
+                      f"{results[key]['per_item_us']:>8.2f} us/item")
+
+    return {
+        'meta': {
+            'version': __version__,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'json_backend': json_backend.BACKEND,
+            'repeat': repeat,
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds')
+        },
+        'results': results
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Print a comparison with a baseline run.
+
+    Args:
+        results: Current results document
+        baseline: Baseline results document
+        threshold: Relative slowdown reported as a regression
+
+    Returns:
+        Keys of the benchmarks that regressed
+    """
+    regressions = []
+    print(f"\n{'Benchmark':<36} {'Baseline (ms)':>14} {'Now (ms)':>10} {'Change':>8}")
+    for key, result in results['results'].items():
+        base = baseline.get('results', {}).get(key)
+        if not base:
+            print(f"{key:<36} {'-':>14} {result['best'] * 1000:>10.2f} {'new':>8}")
+            continue
+        change = result['best'] / base['best'] - 1
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions.append(key)
+        print(f"{key:<36} {base['best'] * 1000:>14.2f} {result['best'] * 1000:>10.2f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    """Run the suite, save and compare results."""
+    args, options = parse_cli_args(sys.argv[1:])
+    sizes = [int(size) for size in str(options.get('sizes', '')).split(',') if size] or list(DEFAULT_SIZES)
+    repeat = int(options.get('repeat', 5))
+    threshold = float(options.get('threshold', DEFAULT_THRESHOLD))
+    only = [name for name in str(options.get('only', '')).split(',') if name] or None
+
+    print(f"[*] JSON backend: {json_backend.BACKEND}")
+    results = run_suite(sizes, repeat, only)
+
+    if options.get('output'):
+        with open(options['output'], 'wb') as f:
+            f.write(json_backend.dumps(results))
+        print(f"[OK] Results saved to {options['output']}")
+
+    if options.get('baseline'):
+        baseline = json_backend.load_file(options['baseline'])
+        print(f"[*] Baseline: {options['baseline']} ({baseline['meta'].get('created_at', 'unknown date')})")
+        regressions = compare(results, baseline, threshold)
+        if regressions:
+            print(f"\n[WARN] {len(regressions)} benchmark(s) slower than the baseline by more than {threshold:.0%}")
+            sys.exit(1)
+        print(f"\n[OK] No regression over {threshold:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,209 @@
+"""
+Board index for previewing an export before it is migrated.
+
+build_board_index parses an export and keeps only what a preview shows:
+the lists in board order, and for every card that would be migrated its ID,
+name and comment count. On a 20,000-card board that is a few megabytes
+instead of the full parsed export, and the index pickles quickly, so the GUI
+builds it in a worker process and the Tk event loop never waits on parsing.
+
+estimate_migration turns a selection of lists into the number of API
+requests a migration would send and a rough duration, following how the
+migrator uploads: one request to create the sheet, adaptive row batches, and
+one request per comment.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from export_reader import load_export
+from token_pool import DEFAULT_REQUESTS_PER_MINUTE
+
+# Row batches start at this size and grow by BATCH_GROWTH_FACTOR per request,
+# as the adaptive batcher does while latency stays flat
+INITIAL_BATCH_ROWS = 100
+BATCH_GROWTH_FACTOR = 1.5
+
+# Typical round trip of one API request, used for the duration estimate (seconds)
+ESTIMATED_REQUEST_SECONDS = 0.4
+
+
+class ListSummary:
+    """One list of the board with the cards that would be migrated from it."""
+
+    __slots__ = ('id', 'name', 'closed', 'on_board', 'cards', 'comments')
+
+    def __init__(self, list_id: str, name: str, closed: bool = False, on_board: bool = True):
+        self.id = list_id
+        self.name = name
+        self.closed = closed
+        self.on_board = on_board    # False for cards whose list is not in the export
+        self.cards = []     # (card ID, card name, comment count)
+        self.comments = 0
+
+
+class BoardIndex:
+    """Lists, cards and comment counts of one board."""
+
+    def __init__(self, path: str, name: str, lists: List[ListSummary], archived_cards: int = 0):
+        """
+        Initialize the index.
+
+        Args:
+            path: Export the index was built from
+            name: Board name
+            lists: Lists in board order
+            archived_cards: Archived cards left out of the index
+        """
+        self.path = path
+        self.name = name
+        self.lists = lists
+        self.archived_cards = archived_cards
+
+    @property
+    def card_count(self) -> int:
+        """Number of cards that would be migrated."""
+        return sum(len(trello_list.cards) for trello_list in self.lists)
+
+    @property
+    def comment_count(self) -> int:
+        """Number of comments on those cards."""
+        return sum(trello_list.comments for trello_list in self.lists)
+
+    def selected(self, list_ids: Iterable[str]) -> Tuple[int, int]:
+        """
+        Count the cards and comments of some lists.
+
+        Args:
+            list_ids: IDs of the selected lists
+
+        Returns:
+            Tuple of (cards, comments)
+        """
+        wanted = set(list_ids)
+        lists = [trello_list for trello_list in self.lists if trello_list.id in wanted]
+        return sum(len(trello_list.cards) for trello_list in lists), sum(trello_list.comments for trello_list in lists)
+
+    def included_lists(self, excluded: Set[str]) -> List[ListSummary]:
+        """
+        Return the lists migrated when some lists are excluded.
+
+        Cards whose list is not on the board cannot be selected by a list
+        filter, so they are only migrated when no list is excluded.
+
+        Args:
+            excluded: IDs of the excluded lists
+
+        Returns:
+            Included lists in board order
+        """
+        return [
+            trello_list for trello_list in self.lists
+            if trello_list.id not in excluded and (trello_list.on_board or not excluded)
+        ]
+
+    def filter_list_ids(self, excluded: Set[str]) -> Optional[List[str]]:
+        """
+        Return the list IDs for a CardFilter keeping the included lists.
+
+        Args:
+            excluded: IDs of the excluded lists
+
+        Returns:
+            IDs of the included lists of the board, or None to migrate all cards
+        """
+        if not excluded:
+            return None
+        return [trello_list.id for trello_list in self.included_lists(excluded)]
+
+
+def build_board_index(path: str, entry: Optional[str] = None, include_archived: bool = False) -> BoardIndex:
+    """
+    Parse an export and index its lists, cards and comment counts.
+
+    Args:
+        path: Export file (plain, gzip, zstd or zip)
+        entry: Board entry to read from a multi-board zip archive
+        include_archived: Index archived cards too, as the migrator does
+            when asked to migrate them
+
+    Returns:
+        BoardIndex of the board
+    """
+    data = load_export(path, entry)
+
+    comment_counts = {}
+    for action in data.get('actions', []):
+        if action.get('type') == 'commentCard':
+            card_id = action.get('data', {}).get('card', {}).get('id')
+            if card_id:
+                comment_counts[card_id] = comment_counts.get(card_id, 0) + 1
+
+    lists = {}
+    for trello_list in data.get('lists', []):
+        lists[trello_list['id']] = ListSummary(
+            trello_list['id'], trello_list.get('name', ''), trello_list.get('closed', False)
+        )
+
+    archived = 0
+    for card in data.get('cards', []):
+        if card.get('closed', False) and not include_archived:
+            archived += 1
+            continue
+        list_id = card.get('idList')
+        if list_id not in lists:
+            # The migrator keeps these cards; show them, but a list filter
+            # cannot name their list (see BoardIndex.included_lists)
+            lists[list_id] = ListSummary(list_id, f"(unknown list {list_id})", on_board=False)
+        comments = comment_counts.get(card['id'], 0)
+        lists[list_id].cards.append((card['id'], card.get('name', ''), comments))
+        lists[list_id].comments += comments
+
+    return BoardIndex(path, data.get('name', 'Unknown'), list(lists.values()), archived)
+
+
+def estimate_migration(
+    cards: int,
+    comments: int,
+    max_batch_rows: int = 500,
+    requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE
+) -> Dict[str, Any]:
+    """
+    Estimate the API requests and time a migration takes.
+
+    The duration assumes requests are sent one after the other at
+    ESTIMATED_REQUEST_SECONDS each, but never faster than the rate limit.
+
+    Args:
+        cards: Cards to migrate
+        comments: Comments on those cards
+        max_batch_rows: Upper bound of row batch sizes
+        requests_per_minute: API rate limit
+
+    Returns:
+        Dictionary with row_requests, comment_requests, requests and seconds
+    """
+    row_requests = 0
+    remaining = cards
+    batch = float(min(INITIAL_BATCH_ROWS, max_batch_rows))
+    while remaining > 0:
+        remaining -= int(batch)
+        row_requests += 1
+        batch = min(batch * BATCH_GROWTH_FACTOR, max_batch_rows)
+
+    requests = 1 + row_requests + comments
+    seconds = max(requests * ESTIMATED_REQUEST_SECONDS, requests * 60.0 / requests_per_minute)
+    return {
+        'row_requests': row_requests,
+        'comment_requests': comments,
+        'requests': requests,
+        'seconds': seconds
+    }
+
+
+def format_duration(seconds: float) -> str:
+    """Format an estimated duration as seconds, minutes or hours."""
+    if seconds < 90:
+        return f"{seconds:.0f} s"
+    if seconds < 90 * 60:
+        return f"{seconds / 60:.0f} min"
+    return f"{seconds / 3600:.1f} h"
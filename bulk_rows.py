@@ -0,0 +1,242 @@
+"""
+Lean bulk row requests for the Smartsheet SDK.
+
+Sheets.add_rows sends its JSON body uncompressed and turns the response,
+which echoes every row with all its cells, into SDK Row objects, although
+the migration only needs the new row IDs. BulkRows sends the same request
+through the SDK's own retry logic, but:
+
+- optionally gzip-compresses the body (Content-Encoding: gzip) once it is
+  large enough to be worth it; if the API rejects a compressed body, the
+  request is resent uncompressed and compression is turned off
+- parses the response with the fast JSON backend and keeps only the row IDs,
+  without building SDK model objects
+
+Rows can also be passed as RowPayload objects, already serialized (e.g. by
+the parallel row builder); their JSON is joined into the request body as is.
+
+WireStats records the request bytes before and after compression and the
+response bytes, for the run metrics.
+"""
+
+import gzip
+import importlib
+import threading
+from typing import Any, Dict, List, Optional
+
+from smartsheet.smartsheet import OperationErrorResult
+from smartsheet.util import fresh_operation
+
+import json_backend
+from migration_log import get_logger
+
+log = get_logger('bulk_rows')
+
+# Bodies smaller than this are sent uncompressed (bytes)
+MIN_COMPRESS_SIZE = 4096
+
+# gzip level: most of the size gain at a fraction of the CPU cost of level 9
+COMPRESS_LEVEL = 5
+
+# Status codes meaning the server does not accept the compressed body
+COMPRESSION_REJECTED_STATUSES = (400, 415)
+
+
+class WireStats:
+    """Thread-safe counters of bytes sent and received by bulk requests."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.compressed_requests = 0
+        self.payload_bytes = 0      # request bodies before compression
+        self.wire_bytes = 0         # request bodies as sent
+        self.response_bytes = 0
+
+    def record(self, payload_bytes: int, wire_bytes: int, response_bytes: int, compressed: bool):
+        """Add one request to the counters."""
+        with self.lock:
+            self.requests += 1
+            self.compressed_requests += int(compressed)
+            self.payload_bytes += payload_bytes
+            self.wire_bytes += wire_bytes
+            self.response_bytes += response_bytes
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return the counters as a dictionary."""
+        return {
+            'requests': self.requests,
+            'compressed_requests': self.compressed_requests,
+            'payload_bytes': self.payload_bytes,
+            'wire_bytes': self.wire_bytes,
+            'response_bytes': self.response_bytes
+        }
+
+    def summary(self) -> str:
+        """Return a one-line summary of the traffic."""
+        ratio = self.wire_bytes / self.payload_bytes if self.payload_bytes else 1.0
+        return (f"Wire: {self.requests} bulk requests, {self.payload_bytes / 1024:.0f} KiB payload, "
+                f"{self.wire_bytes / 1024:.0f} KiB sent ({ratio:.0%}), "
+                f"{self.response_bytes / 1024:.0f} KiB received")
+
+
+class RowPayload:
+    """A row already serialized to its JSON request form."""
+
+    __slots__ = ('data',)
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    @property
+    def size(self) -> int:
+        """Serialized size in bytes."""
+        return len(self.data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Decode the row, for code expecting SDK models."""
+        return json_backend.loads(self.data)
+
+
+def row_cell_value(row: Any, column_id: int) -> Any:
+    """
+    Return the value of one cell of a row.
+
+    Args:
+        row: Row object or RowPayload
+        column_id: Column of the cell
+
+    Returns:
+        The cell value, or None if the row has no cell in that column
+    """
+    if isinstance(row, RowPayload):
+        for cell in row.to_dict().get('cells', []):
+            if cell.get('columnId') == column_id:
+                return cell.get('value')
+        return None
+    for cell in row.cells:
+        if cell.column_id == column_id:
+            return cell.value
+    return None
+
+
+class BulkRows:
+    """add_rows / update_rows returning only row IDs, with optional gzip bodies."""
+
+    def __init__(self, client: Any, compress: bool = False, stats: Optional[WireStats] = None):
+        """
+        Initialize the bulk API for one SDK client.
+
+        Args:
+            client: smartsheet.Smartsheet instance
+            compress: gzip request bodies of at least MIN_COMPRESS_SIZE bytes
+            stats: WireStats to record traffic in
+        """
+        self.client = client
+        self.compress = compress
+        self.stats = stats or WireStats()
+
+    def _raise_error(self, result: Any):
+        # Same exception classes the SDK raises, so callers' handling applies
+        native = result.native('Error')
+        exceptions = importlib.import_module('smartsheet.exceptions')
+        error_class = getattr(exceptions, native.result.name)
+        raise error_class(native, f"{native.result.code}: {native.result.message or 'Unknown error'}")
+
+    def _send_rows(self, method: str, sheet_id: int, rows: List[Any]) -> List[int]:
+        _op = fresh_operation(f"{method.lower()}_rows")
+        _op['method'] = method
+        _op['path'] = f"/sheets/{sheet_id}/rows"
+        if rows and isinstance(rows[0], RowPayload):
+            # Serialized elsewhere: join the rows instead of encoding them again
+            _op['form_data'] = b'[' + b','.join(row.data for row in rows) + b']'
+            _op['headers']['Content-Type'] = 'application/json'
+        else:
+            _op['json'] = rows
+        prepped_request = self.client.prepare_request(_op)
+
+        payload = prepped_request.body or b''
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+        compressed = self.compress and len(payload) >= MIN_COMPRESS_SIZE
+        if compressed:
+            plain_request = prepped_request.copy()
+            prepped_request.body = gzip.compress(payload, COMPRESS_LEVEL)
+            prepped_request.headers['Content-Encoding'] = 'gzip'
+            prepped_request.headers['Content-Length'] = str(len(prepped_request.body))
+
+        result = self.client.request_with_retry(prepped_request, _op)
+        if compressed and result.resp.status_code in COMPRESSION_REJECTED_STATUSES:
+            # A 400 may also be a genuine validation error: only give up on
+            # compression if the same rows go through uncompressed
+            plain_result = self.client.request_with_retry(plain_request, _op)
+            if not isinstance(plain_result, OperationErrorResult):
+                log.warning(f"[WARN] Compressed request rejected (HTTP {result.resp.status_code}), "
+                            f"sending uncompressed from now on")
+                self.compress = False
+                compressed = False
+                prepped_request = plain_request
+            result = plain_result
+
+        self.stats.record(len(payload), len(prepped_request.body or b''), len(result.resp.content), compressed)
+        if isinstance(result, OperationErrorResult):
+            self._raise_error(result)
+        return [row['id'] for row in json_backend.loads(result.resp.content).get('result', [])]
+
+    def add_rows(self, sheet_id: int, rows: List[Any]) -> List[int]:
+        """
+        Insert rows and return their IDs in request order.
+
+        Args:
+            sheet_id: Target sheet
+            rows: Row objects or RowPayloads
+
+        Returns:
+            IDs of the created rows
+        """
+        return self._send_rows('POST', sheet_id, rows)
+
+    def update_rows(self, sheet_id: int, rows: List[Any]) -> List[int]:
+        """
+        Update rows and return their IDs in request order.
+
+        Args:
+            sheet_id: Target sheet
+            rows: Row objects (or RowPayloads) with their IDs set
+
+        Returns:
+            IDs of the updated rows
+        """
+        return self._send_rows('PUT', sheet_id, rows)
+
+
+def install_bulk_api(client: Any, compress: bool = False, stats: Optional[WireStats] = None) -> BulkRows:
+    """
+    Attach a BulkRows instance to a client as ``client.Bulk``.
+
+    Request logging of the SDK decodes request bodies as text, so it is
+    skipped for gzip-compressed requests. Installing on a client that already
+    has one (e.g. a token pool shared by several migrators) only updates its
+    compression setting and keeps its stats.
+
+    Args:
+        client: smartsheet.Smartsheet instance
+        compress: gzip large request bodies
+        stats: WireStats to record traffic in
+
+    Returns:
+        The installed BulkRows
+    """
+    if 'Bulk' in vars(client):
+        client.Bulk.compress = compress
+        return client.Bulk
+
+    log_request = client._log_request
+
+    def log_plain_request(operation, response):
+        if response.request.headers.get('Content-Encoding') != 'gzip':
+            log_request(operation, response)
+
+    client._log_request = log_plain_request
+    client.Bulk = BulkRows(client, compress, stats)
+    return client.Bulk
@@ -0,0 +1,138 @@
+"""
+Card filters for partial migrations.
+
+A CardFilter selects the cards to migrate by list, label, member, last
+activity date and archived state. It is applied while the board is loaded,
+before cards are compacted and comments are grouped, so excluded cards and
+their actions are dropped before any later phase sees them.
+
+Lists, labels and members can be given by ID or by name (members also by
+username); names are resolved against the board with bind(), which rejects
+names the board does not have instead of silently selecting no card.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+
+class CardFilter:
+    """Predicate over Trello cards built from a filter specification."""
+
+    def __init__(
+        self,
+        lists: Optional[Iterable[str]] = None,
+        labels: Optional[Iterable[str]] = None,
+        members: Optional[Iterable[str]] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        include_archived: bool = False
+    ):
+        """
+        Initialize the filter. Criteria left empty do not restrict the selection.
+
+        Args:
+            lists: List IDs or names; a card must be in one of them
+            labels: Label IDs or names; a card must carry at least one
+            members: Member IDs, full names or usernames; a card must have
+                at least one of them assigned
+            since: Keep cards last active on or after this date (YYYY-MM-DD)
+            until: Keep cards last active on or before this date (YYYY-MM-DD)
+            include_archived: Also migrate archived (closed) cards
+        """
+        self.lists = set(lists or [])
+        self.labels = set(labels or [])
+        self.members = set(members or [])
+        self.since = since
+        self.until = until
+        self.include_archived = include_archived
+
+        self.list_ids = None
+        self.label_ids = None
+        self.member_ids = None
+
+    @property
+    def is_empty(self) -> bool:
+        """True when the filter only applies the default archived rule."""
+        return not (self.lists or self.labels or self.members or self.since or self.until)
+
+    @staticmethod
+    def _resolve(kind: str, wanted: Set[str], items: List[Dict[str, Any]], name_keys: Iterable[str]) -> Set[str]:
+        ids = set()
+        found = set()
+        for item in items:
+            names = {item.get('id')} | {item.get(key) for key in name_keys}
+            matched = names & wanted
+            if matched:
+                ids.add(item['id'])
+                found |= matched
+        unknown = wanted - found
+        if unknown:
+            names = ', '.join(repr(name) for name in sorted(unknown))
+            raise ValueError(f"Card filter: no {kind} named {names} on this board")
+        return ids
+
+    def bind(self, trello_data: Dict[str, Any]) -> 'CardFilter':
+        """
+        Resolve list, label and member names to IDs for a board.
+
+        Args:
+            trello_data: Board data with lists, labels and members
+
+        Returns:
+            This filter, ready for matches()
+
+        Raises:
+            ValueError: If a list, label or member matches nothing on the board
+        """
+        if self.lists:
+            self.list_ids = self._resolve('list', self.lists, trello_data.get('lists', []), ('name',))
+        if self.labels:
+            self.label_ids = self._resolve(
+                'label', self.labels, trello_data.get('labels', []), ('name', 'color'))
+        if self.members:
+            self.member_ids = self._resolve(
+                'member', self.members, trello_data.get('members', []), ('fullName', 'username'))
+        return self
+
+    def matches(self, card: Any) -> bool:
+        """
+        Check whether a card is selected.
+
+        Args:
+            card: Raw Trello card dict or CompactCard
+
+        Returns:
+            True if the card should be migrated
+        """
+        if card.get('closed', False) and not self.include_archived:
+            return False
+        if self.list_ids is not None and card.get('idList') not in self.list_ids:
+            return False
+        if self.label_ids is not None and not self.label_ids.intersection(card.get('idLabels') or ()):
+            return False
+        if self.member_ids is not None and not self.member_ids.intersection(card.get('idMembers') or ()):
+            return False
+        if self.since or self.until:
+            # ISO timestamps compare correctly as strings
+            activity = (card.get('dateLastActivity') or '')[:10]
+            if self.since and activity < self.since:
+                return False
+            if self.until and activity > self.until:
+                return False
+        return True
+
+    def describe(self) -> str:
+        """Return a short human-readable description of the criteria."""
+        parts = []
+        if self.lists:
+            parts.append(f"lists={', '.join(sorted(self.lists))}")
+        if self.labels:
+            parts.append(f"labels={', '.join(sorted(self.labels))}")
+        if self.members:
+            parts.append(f"members={', '.join(sorted(self.members))}")
+        if self.since:
+            parts.append(f"since={self.since}")
+        if self.until:
+            parts.append(f"until={self.until}")
+        if self.include_archived:
+            parts.append("including archived")
+        return '; '.join(parts) or 'all active cards'
@@ -0,0 +1,185 @@
+"""
+Rewriting of links between Trello cards to the migrated Smartsheet rows.
+
+Card descriptions and comments often link to other cards
+(``https://trello.com/c/<shortLink>/12-card-name``). When several boards are
+migrated together, CardLinkIndex maps every migrated card's short link (and
+card ID) to its sheet and row, so those links can point at the row
+permalinks instead of Trello.
+
+Descriptions are sent with the rows, before the rows of later boards exist,
+so the index remembers the descriptions containing card links and the
+workspace migration rewrites them in a final pass with batched row updates.
+Row permalinks are longer than card links, so a rewritten description can
+go over the cell length limit; the text pushed out of the cell is posted as
+a discussion, like the text cut from other long cells. Comments are
+rewritten as they are posted, with the rows known at that time.
+
+All text goes through one compiled pattern, in a single scan per text;
+texts without "trello.com/c/" are skipped with a substring test.
+"""
+
+import re
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from row_validator import MAX_CELL_LENGTH
+
+# Substring every card link contains; texts without it are not scanned
+CARD_LINK_MARKER = 'trello.com/c/'
+
+# Card link with its optional "/<number>-<slug>" tail; the key is a short
+# link (8 characters) or a full card ID (24 hex digits)
+CARD_LINK_PATTERN = re.compile(
+    r'https?://(?:www\.)?trello\.com/c/([A-Za-z0-9]{8}|[0-9a-f]{24})(?![A-Za-z0-9])(?:/[^\s()\[\]<>"\']*)?'
+)
+
+
+def short_link_from_url(url: Optional[str]) -> Optional[str]:
+    """
+    Extract the short link of a card from its URL.
+
+    Args:
+        url: Card shortUrl or url
+
+    Returns:
+        The short link, or None if the URL is not a card link
+    """
+    match = CARD_LINK_PATTERN.match(url or '')
+    return match.group(1) if match else None
+
+
+def row_permalink(sheet_permalink: str, row_id: int) -> str:
+    """Return the permalink of a row from the permalink of its sheet."""
+    return f"{sheet_permalink}?rowId={row_id}"
+
+
+class CardLinkIndex:
+    """Migrated cards by short link, and the descriptions waiting for a link rewrite."""
+
+    def __init__(self):
+        self.rows = {}          # short link or card ID -> (sheet ID, row ID)
+        self.permalinks = {}    # sheet ID -> sheet permalink
+        self.pending = {}       # sheet ID -> [(row ID, column ID, description cell text)]
+        self.lock = threading.Lock()
+        self.stats = {'cards': 0, 'links': 0, 'rewritten': 0, 'unresolved': 0}
+
+    def add_sheet(
+        self,
+        sheet_id: int,
+        sheet_permalink: str,
+        description_column_id: Optional[int],
+        cards: Iterable[Any],
+        card_to_row_map: Dict[str, int]
+    ):
+        """
+        Register the rows of a migrated sheet.
+
+        Args:
+            sheet_id: Sheet the cards were migrated to
+            sheet_permalink: Permalink of the sheet
+            description_column_id: ID of the Description column
+            cards: Cards of the sheet (dicts or CompactCard)
+            card_to_row_map: Card ID -> row ID mapping of the sheet
+        """
+        self.permalinks[sheet_id] = sheet_permalink
+        for card in cards:
+            row_id = card_to_row_map.get(card['id'])
+            if row_id is None:
+                continue
+            self.rows[card['id']] = (sheet_id, row_id)
+            short_link = card.get('shortLink') or short_link_from_url(card.get('shortUrl'))
+            if short_link:
+                self.rows[short_link] = (sheet_id, row_id)
+            self.stats['cards'] += 1
+
+            # The cell holds the start of the description; the rest was
+            # posted as a discussion with the sheet's comments
+            description = (card.get('desc') or '')[:MAX_CELL_LENGTH]
+            if description_column_id and CARD_LINK_MARKER in description:
+                self.pending.setdefault(sheet_id, []).append((row_id, description_column_id, description))
+
+    def add_rows(self, sheet_id: int, sheet_permalink: str, rows: Iterable[Tuple[str, int]]):
+        """
+        Register rows of an already migrated sheet by card short link.
+
+        Args:
+            sheet_id: Sheet holding the rows
+            sheet_permalink: Permalink of the sheet
+            rows: (short link, row ID) pairs
+        """
+        self.permalinks[sheet_id] = sheet_permalink
+        for short_link, row_id in rows:
+            self.rows[short_link] = (sheet_id, row_id)
+            self.stats['cards'] += 1
+
+    def resolve(self, key: str) -> Optional[str]:
+        """
+        Return the row permalink of a migrated card.
+
+        Args:
+            key: Card short link or ID
+
+        Returns:
+            Row permalink, or None if the card was not migrated
+        """
+        location = self.rows.get(key)
+        if location is None:
+            return None
+        sheet_id, row_id = location
+        return row_permalink(self.permalinks[sheet_id], row_id)
+
+    def _replace(self, match: re.Match) -> str:
+        link = self.resolve(match.group(1))
+        with self.lock:
+            self.stats['links'] += 1
+            self.stats['rewritten' if link else 'unresolved'] += 1
+        return link or match.group(0)
+
+    def rewrite(self, text: str) -> str:
+        """
+        Replace links to migrated cards in a text by row permalinks.
+
+        Args:
+            text: Description or comment text
+
+        Returns:
+            The text with known card links rewritten; links to cards that
+            were not migrated are left as they are
+        """
+        if not text or CARD_LINK_MARKER not in text:
+            return text
+        return CARD_LINK_PATTERN.sub(self._replace, text)
+
+    def rewrite_cell(self, text: str) -> Tuple[str, str]:
+        """
+        Rewrite the links in the text of a cell and cut it to the length limit.
+
+        Args:
+            text: Cell text, at most MAX_CELL_LENGTH characters
+
+        Returns:
+            Tuple of (new cell text, text pushed out of the cell)
+        """
+        rewritten = self.rewrite(text)
+        return rewritten[:MAX_CELL_LENGTH], rewritten[MAX_CELL_LENGTH:]
+
+    def pending_updates(self) -> Iterator[Tuple[int, List[Tuple[int, int, str, str]]]]:
+        """
+        Rewrite the remembered descriptions, sheet by sheet.
+
+        Only descriptions that changed are returned, cut to the cell length
+        limit as by rewrite_cell.
+
+        Yields:
+            (sheet ID, [(row ID, column ID, new description, text pushed
+            out of the cell)]) pairs
+        """
+        for sheet_id, descriptions in self.pending.items():
+            updates = []
+            for row_id, column_id, description in descriptions:
+                text, overflow = self.rewrite_cell(description)
+                if text != description:
+                    updates.append((row_id, column_id, text, overflow))
+            if updates:
+                yield sheet_id, updates
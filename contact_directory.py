@@ -0,0 +1,197 @@
+"""
+Smartsheet contact directory for validating member emails.
+
+Member emails are guessed from Trello names unless a mapping file provides
+them, and a wrong guess only shows up after migration as an unknown contact.
+ContactDirectory fetches the organization's user list once (paginated
+Users.list_users), keeps it in a JSON cache file that expires after a TTL,
+and indexes it by email and by normalized name so each member is checked in
+constant time.
+
+The cache file is keyed by the Smartsheet account of the token and shared
+by every run using the same cache directory, so a batch of boards fetches
+the user list at most once per TTL and per account. Listing users needs
+admin rights; without them the directory is unavailable and the emails of
+the mapping (or generated from names) are used unchecked.
+"""
+
+import json
+import os
+import tempfile
+import time
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+from smartsheet.exceptions import ApiError
+
+from migration_log import get_logger
+
+log = get_logger('contacts')
+
+# Largest page Users.list_users returns
+USERS_PAGE_SIZE = 100
+
+# How long a fetched user list is reused (seconds)
+DEFAULT_CONTACTS_TTL = 24 * 3600
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'trello_to_smartsheet')
+
+# Cache file name, per Smartsheet account
+CONTACTS_CACHE_FILE = 'smartsheet_users_{account_id}.json'
+
+# Status of Users.list_users for a token without admin rights
+FORBIDDEN_STATUS = 403
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """Fold a person's name for matching (case, accents, extra spaces)."""
+    ascii_name = unicodedata.normalize('NFKD', name or '').encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(ascii_name.casefold().split())
+
+
+class ContactDirectory:
+    """Index of the Smartsheet organization's users, cached on disk."""
+
+    def __init__(
+        self,
+        client: Any,
+        cache_dir: Optional[str] = None,
+        ttl: float = DEFAULT_CONTACTS_TTL
+    ):
+        """
+        Initialize the directory. The user list is loaded on first use.
+
+        Args:
+            client: Smartsheet client (or PooledSmartsheetClient)
+            cache_dir: Directory for the cached user list
+            ttl: Seconds before the cached user list is fetched again
+        """
+        self.client = client
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.cache_file = None
+        self.ttl = ttl
+        self.by_email = None
+        self.by_name = {}
+        self.available = True
+
+    def fetch_users(self) -> List[Dict[str, Any]]:
+        """
+        Fetch all users of the organization from the API.
+
+        Returns:
+            List of {'email', 'name', 'alternate_emails'} dictionaries
+        """
+        users = []
+        page = 1
+        while True:
+            result = self.client.Users.list_users(page_size=USERS_PAGE_SIZE, page=page)
+            for user in result.data:
+                name = user.name or ' '.join(part for part in (user.first_name, user.last_name) if part)
+                users.append({
+                    'email': user.email,
+                    'name': name,
+                    'alternate_emails': [alt.email for alt in user.alternate_emails or [] if alt.email]
+                })
+            if page >= (result.total_pages or 1):
+                return users
+            page += 1
+
+    def account_cache_file(self) -> str:
+        """Return the cache file of the token's Smartsheet account."""
+        profile = self.client.Users.get_current_user()
+        account_id = profile.account.id if profile.account else f"user{profile.id}"
+        return os.path.join(self.cache_dir, CONTACTS_CACHE_FILE.format(account_id=account_id))
+
+    def _read_cache(self) -> Optional[List[Dict[str, Any]]]:
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - payload.get('fetched_at', 0) > self.ttl:
+            return None
+        return payload.get('users')
+
+    def _write_cache(self, users: List[Dict[str, Any]]):
+        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.cache_file), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'fetched_at': time.time(), 'users': users}, f)
+            os.replace(tmp_path, self.cache_file)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def load(self) -> int:
+        """
+        Load the user list from the cache, or fetch it when stale or missing.
+
+        Calling load again on a loaded directory does nothing. If the token
+        may not list users, the directory stays empty and available is False.
+
+        Returns:
+            Number of users in the directory
+        """
+        if self.by_email is not None:
+            return len(self.by_email)
+
+        self.cache_file = self.account_cache_file()
+        users = self._read_cache()
+        if users is None:
+            log.info("[*] Fetching Smartsheet user directory...")
+            try:
+                users = self.fetch_users()
+            except ApiError as e:
+                if getattr(getattr(e.error, 'result', None), 'status_code', None) != FORBIDDEN_STATUS:
+                    raise
+                log.warning("[WARN] This token may not list Smartsheet users (System Admin rights needed); "
+                            "member emails are not checked")
+                self.available = False
+                self.by_email = {}
+                self.by_name = {}
+                return 0
+            try:
+                self._write_cache(users)
+            except OSError as e:
+                log.warning(f"[WARN] Failed to write user directory cache: {e}")
+        else:
+            log.info(f"[*] Using cached Smartsheet user directory: {self.cache_file}")
+
+        self.by_email = {}
+        self.by_name = {}
+        for user in users:
+            for email in [user.get('email')] + user.get('alternate_emails', []):
+                if email:
+                    self.by_email[email.lower()] = user
+            name = normalize_name(user.get('name'))
+            if name:
+                # Several users sharing a name are ambiguous: keep None
+                self.by_name[name] = None if name in self.by_name else user['email']
+
+        log.info(f"[OK] User directory: {len(users)} users")
+        return len(self.by_email)
+
+    def resolve(self, name: str, email: Optional[str]) -> Tuple[Optional[str], str]:
+        """
+        Check a member's email against the directory.
+
+        Args:
+            name: Member full name
+            email: Email from the mapping file or generated from the name
+
+        Returns:
+            Tuple of (email to use, status) where status is 'known' (the email
+            belongs to a user), 'matched' (found by name, returned email is the
+            user's), 'unknown' (original email returned unchanged) or
+            'unchecked' (the directory is unavailable, original email returned)
+        """
+        self.load()
+        if not self.available:
+            return email, 'unchecked'
+        if email and email.lower() in self.by_email:
+            return self.by_email[email.lower()]['email'], 'known'
+        matched = self.by_name.get(normalize_name(name))
+        if matched:
+            return matched, 'matched'
+        return email, 'unknown'
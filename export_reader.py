@@ -0,0 +1,148 @@
+"""
+Read Trello exports stored compressed or in zip archives.
+
+Exports are often archived as .json.gz, .json.zst or .zip. The format is
+detected from the file's magic bytes (not its extension) and the content is
+decompressed as a stream straight into memory for the JSON parser, with no
+temporary file. A zip archive may hold several boards; each .json entry is
+read on its own, so only one board is in memory at a time.
+
+zstd support needs the optional ``zstandard`` package.
+"""
+
+import gzip
+import zipfile
+from typing import Any, BinaryIO, List, Optional, Union
+
+import json_backend
+
+try:
+    import zstandard
+    ZSTANDARD_AVAILABLE = True
+except ImportError:
+    ZSTANDARD_AVAILABLE = False
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+ZIP_MAGICS = (b'PK\x03\x04', b'PK\x05\x06')
+
+# Decompressed bytes read per call
+READ_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def detect_format(file_path: str) -> str:
+    """
+    Detect the container format of an export from its magic bytes.
+
+    Args:
+        file_path: Path of the export
+
+    Returns:
+        'gzip', 'zstd', 'zip' or 'json'
+    """
+    with open(file_path, 'rb') as f:
+        magic = f.read(4)
+    if magic.startswith(GZIP_MAGIC):
+        return 'gzip'
+    if magic == ZSTD_MAGIC:
+        return 'zstd'
+    if magic in ZIP_MAGICS:
+        return 'zip'
+    return 'json'
+
+
+def list_export_entries(file_path: str) -> List[str]:
+    """
+    List the boards in an export file.
+
+    Args:
+        file_path: Path of the export
+
+    Returns:
+        Names of the .json entries of a zip archive, or an empty list for
+        single-board files
+    """
+    if detect_format(file_path) != 'zip':
+        return []
+    with zipfile.ZipFile(file_path) as archive:
+        return [
+            info.filename for info in archive.infolist()
+            if not info.is_dir() and info.filename.lower().endswith('.json')
+            and not info.filename.startswith('__MACOSX/')
+        ]
+
+
+def _read_stream(stream: BinaryIO) -> bytearray:
+    # Returned as is: every JSON backend parses a bytearray, and converting
+    # it to bytes would copy the whole document
+    buffer = bytearray()
+    while True:
+        chunk = stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            return buffer
+        buffer += chunk
+
+
+def read_export_bytes(file_path: str, entry: Optional[str] = None) -> Union[bytes, bytearray]:
+    """
+    Return the JSON bytes of an export, decompressing it on the fly.
+
+    Compressed exports are decompressed into one growing bytearray, which
+    is returned without a copy, so the peak memory is about the size of the
+    document rather than twice it.
+
+    Args:
+        file_path: Path of the export (plain, gzip, zstd or zip)
+        entry: Entry to read from a zip archive; may be omitted when the
+            archive holds a single board
+
+    Returns:
+        Uncompressed JSON document
+
+    Raises:
+        ValueError: If a zip entry is needed and missing or ambiguous, or
+            zstandard is not installed for a .zst export
+    """
+    file_format = detect_format(file_path)
+
+    if file_format == 'json':
+        with open(file_path, 'rb') as f:
+            return f.read()
+
+    if file_format == 'gzip':
+        with gzip.open(file_path, 'rb') as stream:
+            return _read_stream(stream)
+
+    if file_format == 'zstd':
+        if not ZSTANDARD_AVAILABLE:
+            raise ValueError(f"{file_path} is zstd-compressed; install 'zstandard' to read it")
+        with open(file_path, 'rb') as f:
+            with zstandard.ZstdDecompressor().stream_reader(f) as stream:
+                return _read_stream(stream)
+
+    entries = list_export_entries(file_path)
+    if entry is None:
+        if len(entries) != 1:
+            raise ValueError(
+                f"{file_path} holds {len(entries)} boards; choose one of: {', '.join(entries) or '(none)'}"
+            )
+        entry = entries[0]
+    elif entry not in entries:
+        raise ValueError(f"{file_path} has no board entry named {entry}")
+    with zipfile.ZipFile(file_path) as archive:
+        with archive.open(entry) as stream:
+            return _read_stream(stream)
+
+
+def load_export(file_path: str, entry: Optional[str] = None) -> Any:
+    """
+    Parse an export, whatever its container format.
+
+    Args:
+        file_path: Path of the export (plain, gzip, zstd or zip)
+        entry: Entry to read from a multi-board zip archive
+
+    Returns:
+        Decoded board data
+    """
+    return json_backend.parse_document(read_export_bytes(file_path, entry))
@@ -0,0 +1,325 @@
+"""
+Record and replay of Smartsheet API traffic.
+
+A cassette is a gzip-compressed JSON-lines file holding every request the
+migrator sent and the response it got, with the time the response took. It
+plugs into the SDK as a requests transport adapter, below the SDK's retry
+logic, so everything above it (retries, rate limit handling, token pool,
+bulk uploads) runs unchanged:
+
+- record mode sends requests as usual and appends each exchange to the
+  cassette as soon as it completes; a run killed halfway still leaves a
+  readable cassette
+- replay mode never touches the network: responses are served from the
+  cassette, either after the recorded latency (to reproduce the timing of
+  the recorded run) or immediately (to measure client-side cost alone)
+
+Requests are matched on method, path with query string and a digest of the
+body. Identical requests are answered in recorded order, so retried 429s
+replay as they happened. A request whose body changed (e.g. a different
+batch size) falls back to the next unused response for the same method and
+path; such loose matches are counted in the summary, since the replayed run
+no longer mirrors the recorded one exactly.
+
+Cassettes never store the access token or request bodies, only their
+digests; response bodies are stored as received.
+"""
+
+import base64
+import gzip
+import hashlib
+import threading
+import time
+import zlib
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+import json_backend
+from migration_log import get_logger
+
+log = get_logger('cassette')
+
+CASSETTE_FORMAT_VERSION = 1
+
+CASSETTE_MODES = ('record', 'replay')
+
+# Response headers kept in the cassette; the body is stored decoded, so
+# transfer headers (Content-Encoding, Content-Length) must not be replayed
+RECORDED_HEADERS = ('Content-Type', 'Retry-After')
+
+
+class CassetteMissError(requests.exceptions.RequestException):
+    """Raised in replay mode for a request the cassette has no response for."""
+
+
+def request_key(request: requests.PreparedRequest) -> tuple:
+    """
+    Return the key a request is matched on.
+
+    Args:
+        request: Prepared request
+
+    Returns:
+        Tuple of (method, path with query string, body digest or None)
+    """
+    parts = urlsplit(request.url)
+    path = parts.path + (f"?{parts.query}" if parts.query else '')
+    body = request.body
+    if body is None:
+        return request.method, path, None
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    elif not isinstance(body, bytes):
+        # Streamed uploads (file imports) cannot be read twice
+        return request.method, path, 'stream'
+    if request.headers.get('Content-Type', '').startswith('multipart/'):
+        # The multipart boundary is random
+        return request.method, path, 'multipart'
+    if request.headers.get('Content-Encoding') == 'gzip':
+        # gzip output embeds a timestamp: match on the uncompressed body
+        body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+    return request.method, path, hashlib.sha256(body).hexdigest()[:32]
+
+
+class Cassette:
+    """Recorded API exchanges, shared by all clients of a run."""
+
+    def __init__(self, path: str, mode: str = 'replay', latency_scale: float = 1.0):
+        """
+        Open a cassette for recording or replay.
+
+        Args:
+            path: Cassette file; overwritten in record mode
+            mode: 'record' or 'replay'
+            latency_scale: Replay only: factor applied to the recorded
+                latency of each response (1.0 replays at recorded speed,
+                0 serves responses immediately)
+
+        Raises:
+            ValueError: If the mode is unknown or the file is not a cassette
+            FileNotFoundError: If the cassette to replay does not exist
+        """
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode '{mode}' (expected one of: {', '.join(CASSETTE_MODES)})")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'exact': 0, 'loose': 0, 'missed': 0, 'latency': 0.0}
+        self.file = None
+        self.exact = {}     # request key -> deque of unused entries
+        self.loose = {}     # (method, path) -> deque of entries, used or not
+
+        if mode == 'record':
+            self.file = gzip.open(path, 'wt', encoding='utf-8')
+            self._write({
+                'cassette': CASSETTE_FORMAT_VERSION,
+                'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds')
+            })
+            log.info(f"[*] Recording API traffic to {path}")
+        else:
+            entries = self._read(path)
+            for entry in entries:
+                key = (entry['method'], entry['url'], entry['body'])
+                self.exact.setdefault(key, deque()).append(entry)
+                self.loose.setdefault(key[:2], deque()).append(entry)
+            speed = 'recorded latency' if latency_scale == 1 else (
+                'full speed' if latency_scale == 0 else f"{latency_scale:g}x recorded latency")
+            log.info(f"[*] Replaying {len(entries)} recorded API responses from {path} ({speed})")
+
+    def _read(self, path: str) -> list:
+        entries = []
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            try:
+                header = json_backend.loads(f.readline() or '{}')
+                if header.get('cassette') != CASSETTE_FORMAT_VERSION:
+                    raise ValueError(f"Not a cassette file (or unsupported version): {path}")
+                for line in f:
+                    entries.append(json_backend.loads(line))
+            except (EOFError, gzip.BadGzipFile, ValueError) as e:
+                if not entries and not isinstance(e, EOFError):
+                    raise ValueError(f"Not a cassette file (or unsupported version): {path}") from e
+                # Recording interrupted: keep the complete exchanges
+                log.warning(f"[WARN] Cassette {path} is truncated, using its first {len(entries)} responses")
+        return entries
+
+    def _write(self, entry: Dict[str, Any]):
+        self.file.write(json_backend.dumps(entry).decode('utf-8') + '\n')
+
+    def record(self, request: requests.PreparedRequest, response: requests.Response, latency: float):
+        """
+        Append one exchange to the cassette.
+
+        Args:
+            request: Request as sent
+            response: Response received, with its content read
+            latency: Time from sending the request to reading the response (seconds)
+        """
+        method, url, body = request_key(request)
+        try:
+            content, encoded = response.content.decode('utf-8'), None
+        except UnicodeDecodeError:
+            content, encoded = base64.b64encode(response.content).decode('ascii'), 'base64'
+        entry = {
+            'method': method,
+            'url': url,
+            'body': body,
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers},
+            'content': content,
+            'latency': round(latency, 4)
+        }
+        if encoded:
+            entry['encoding'] = encoded
+        with self.lock:
+            self.stats['requests'] += 1
+            self.stats['latency'] += latency
+            if self.file is not None:
+                self._write(entry)
+                self.file.flush()
+
+    def lookup(self, request: requests.PreparedRequest) -> Optional[Dict[str, Any]]:
+        """
+        Take the recorded response for a request.
+
+        Args:
+            request: Request to answer
+
+        Returns:
+            The recorded entry, or None when the cassette has none left
+        """
+        key = request_key(request)
+        with self.lock:
+            self.stats['requests'] += 1
+            entries = self.exact.get(key)
+            while entries:
+                entry = entries.popleft()
+                if not entry.get('used'):
+                    entry['used'] = True
+                    self.stats['exact'] += 1
+                    self.stats['latency'] += entry['latency']
+                    return entry
+            candidates = self.loose.get(key[:2], ())
+            while candidates and candidates[0].get('used'):
+                candidates.popleft()
+            for entry in candidates:
+                if not entry.get('used'):
+                    entry['used'] = True
+                    self.stats['loose'] += 1
+                    self.stats['latency'] += entry['latency']
+                    log.warning(f"[WARN] Request body of {key[0]} {key[1]} differs from the recording, "
+                                f"replaying the next recorded response",
+                                extra={'repeat_key': 'cassette body mismatch'})
+                    return entry
+            self.stats['missed'] += 1
+            return None
+
+    def close(self):
+        """Finish writing the cassette (record mode)."""
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+                log.info(f"[OK] Recorded {self.stats['requests']} API requests to {self.path}")
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return the request counters."""
+        return {'mode': self.mode, 'path': self.path, **self.stats}
+
+    def summary(self) -> str:
+        """Return a one-line summary of the recorded or replayed traffic."""
+        if self.mode == 'record':
+            return (f"Cassette: {self.stats['requests']} requests recorded, "
+                    f"{self.stats['latency']:.1f}s of API latency")
+        text = (f"Cassette: {self.stats['requests']} requests replayed, "
+                f"{self.stats['latency']:.1f}s of recorded API latency")
+        if self.stats['loose']:
+            text += f", {self.stats['loose']} with a changed body"
+        if self.stats['missed']:
+            text += f", {self.stats['missed']} not in the cassette"
+        return text
+
+
+class RecordingAdapter(BaseAdapter):
+    """Transport adapter sending requests through another adapter and recording them."""
+
+    def __init__(self, cassette: Cassette, adapter: BaseAdapter):
+        super().__init__()
+        self.cassette = cassette
+        self.adapter = adapter
+
+    def send(self, request, **kwargs):
+        start = time.perf_counter()
+        response = self.adapter.send(request, **kwargs)
+        # Reading the content here makes the latency cover the whole body
+        response.content
+        self.cassette.record(request, response, time.perf_counter() - start)
+        return response
+
+    def close(self):
+        self.adapter.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    """Transport adapter answering requests from a cassette, without network access."""
+
+    def __init__(self, cassette: Cassette):
+        super().__init__()
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        entry = self.cassette.lookup(request)
+        if entry is None:
+            method, url, _ = request_key(request)
+            log.warning(f"[WARN] No recorded response for {method} {url}",
+                        extra={'repeat_key': 'cassette miss'})
+            raise CassetteMissError(f"No recorded response for {method} {url}", request=request)
+
+        delay = entry['latency'] * self.cassette.latency_scale
+        if delay > 0:
+            time.sleep(delay)
+
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.reason = entry['reason']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        if entry.get('encoding') == 'base64':
+            response._content = base64.b64decode(entry['content'])
+        else:
+            response._content = entry['content'].encode('utf-8')
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(seconds=delay)
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
+
+
+def install_cassette(client: Any, cassette: Cassette):
+    """
+    Route the requests of an SDK client through a cassette.
+
+    Args:
+        client: smartsheet.Smartsheet instance
+        cassette: Cassette to record to or replay from
+    """
+    session = client._session
+    for prefix in ('https://', 'http://'):
+        adapter = session.get_adapter(prefix)
+        if isinstance(adapter, (RecordingAdapter, ReplayAdapter)):
+            continue
+        if cassette.mode == 'record':
+            session.mount(prefix, RecordingAdapter(cassette, adapter))
+        else:
+            session.mount(prefix, ReplayAdapter(cassette))
@@ -0,0 +1,540 @@
+#!/usr/bin/env python3
+"""
+Headless migration job server.
+
+Several people starting migrations from their own machines all draw on the
+same Smartsheet quota and trip over each other's rate limits. The job server
+centralizes them: exports are uploaded over a small HTTP API, jobs are kept
+in a local SQLite queue, and a fixed number of worker threads run them with
+TrelloToSmartsheetMigrator through one shared TokenPool, so the combined
+request rate stays at the quota.
+
+HTTP API (JSON responses):
+    POST /jobs?name=...&folder_id=...&shard=...&upload_mode=...
+        Body: Trello export (JSON, gzip, zstd or single-board zip),
+        streamed to disk. Returns the new job (202); an unreadable
+        export fails its job.
+    GET  /jobs              Latest jobs
+    GET  /jobs/<id>         One job, with its log
+    GET  /metrics           Queue counts, workers, per-token request counters
+                            and row upload bytes on the wire
+
+Jobs left running by a crash are queued again when the server restarts.
+Uploaded exports are kept in DIR/uploads until their job is done or failed.
+
+Usage:
+    python job_server.py [api_token] [--port=8080] [--host=127.0.0.1] [--workers=2]
+                         [--data-dir=DIR] [--tokens=TOKEN2,...] [--rpm=300]
+                         [--folder-id=ID] [--email-mapping=FILE] [--auth-key=KEY]
+                         [--compress]
+"""
+
+import io
+import json
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, BinaryIO, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from bulk_rows import WireStats, install_bulk_api
+from migration_log import ConsoleHandler, configure_logging, ensure_logging, flush_logging, get_logger
+from token_pool import DEFAULT_REQUESTS_PER_MINUTE, TokenPool
+from trello_to_smartsheet_kanban import SHARD_STRATEGIES, UPLOAD_MODES, TrelloToSmartsheetMigrator, parse_cli_args
+
+log = get_logger('job_server')
+
+JOB_STATES = ('queued', 'running', 'done', 'failed')
+
+# Largest accepted export upload (bytes)
+MAX_UPLOAD_SIZE = 1024 * 1024 * 1024
+
+# Upload bytes read from the connection per write to disk
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Log kept per job in the database (characters, most recent)
+MAX_JOB_LOG = 200_000
+
+# How often idle workers look for new jobs (seconds)
+POLL_INTERVAL = 1.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    options TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    worker TEXT,
+    sheet_id INTEGER,
+    error TEXT,
+    log TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+"""
+
+JOB_COLUMNS = ('id', 'name', 'status', 'worker', 'sheet_id', 'error', 'options',
+               'created_at', 'started_at', 'finished_at')
+
+
+class JobQueue:
+    """SQLite-backed queue of migration jobs, safe to use from several threads."""
+
+    def __init__(self, db_path: str):
+        """
+        Open (or create) the queue database.
+
+        Args:
+            db_path: Path of the SQLite file
+        """
+        self.db_path = db_path
+        self.lock = threading.RLock()
+        self.db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.executescript(SCHEMA)
+
+    def _job(self, row: Optional[sqlite3.Row], with_log: bool = False) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = {column: row[column] for column in JOB_COLUMNS}
+        job['options'] = json.loads(job['options'])
+        if with_log:
+            job['log'] = row['log']
+        return job
+
+    def submit(self, name: str, file_path: str, options: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Add a job to the queue.
+
+        Args:
+            name: Display name (usually the export file name)
+            file_path: Path of the stored export
+            options: Migrator options for this job
+
+        Returns:
+            The queued job
+        """
+        with self.lock:
+            cursor = self.db.execute(
+                'INSERT INTO jobs (name, file_path, options, created_at) VALUES (?, ?, ?, ?)',
+                (name, file_path, json.dumps(options), time.time())
+            )
+            return self.get(cursor.lastrowid)
+
+    def claim(self, worker: str) -> Optional[Dict[str, Any]]:
+        """
+        Take the oldest queued job and mark it running.
+
+        Args:
+            worker: Name of the claiming worker
+
+        Returns:
+            The job, with its file_path, or None if the queue is empty
+        """
+        with self.lock:
+            self.db.execute('BEGIN IMMEDIATE')
+            try:
+                row = self.db.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1").fetchone()
+                if row is None:
+                    self.db.execute('COMMIT')
+                    return None
+                self.db.execute(
+                    "UPDATE jobs SET status = 'running', worker = ?, started_at = ? WHERE id = ?",
+                    (worker, time.time(), row['id'])
+                )
+                self.db.execute('COMMIT')
+            except BaseException:
+                self.db.execute('ROLLBACK')
+                raise
+        job = self._job(row)
+        job['status'] = 'running'
+        job['worker'] = worker
+        job['file_path'] = row['file_path']
+        return job
+
+    def finish(self, job_id: int, sheet_id: Optional[int], log: str):
+        """Mark a job done."""
+        with self.lock:
+            self.db.execute(
+                "UPDATE jobs SET status = 'done', sheet_id = ?, log = ?, finished_at = ? WHERE id = ?",
+                (sheet_id, log[-MAX_JOB_LOG:], time.time(), job_id)
+            )
+
+    def fail(self, job_id: int, error: str, log: str):
+        """Mark a job failed."""
+        with self.lock:
+            self.db.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, log = ?, finished_at = ? WHERE id = ?",
+                (error, log[-MAX_JOB_LOG:], time.time(), job_id)
+            )
+
+    def requeue_running(self) -> int:
+        """
+        Put jobs interrupted by a server stop back in the queue.
+
+        Returns:
+            Number of jobs requeued
+        """
+        with self.lock:
+            cursor = self.db.execute(
+                "UPDATE jobs SET status = 'queued', worker = NULL, started_at = NULL "
+                "WHERE status = 'running'")
+            return cursor.rowcount
+
+    def get(self, job_id: int, with_log: bool = False) -> Optional[Dict[str, Any]]:
+        """Return one job, or None if it does not exist."""
+        with self.lock:
+            row = self.db.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return self._job(row, with_log)
+
+    def list(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Return the most recent jobs, newest first."""
+        with self.lock:
+            rows = self.db.execute('SELECT * FROM jobs ORDER BY id DESC LIMIT ?', (limit,)).fetchall()
+        return [self._job(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """Return the number of jobs in each state."""
+        counts = dict.fromkeys(JOB_STATES, 0)
+        with self.lock:
+            rows = self.db.execute('SELECT status, COUNT(*) AS n FROM jobs GROUP BY status').fetchall()
+        for row in rows:
+            counts[row['status']] = row['n']
+        return counts
+
+
+class _JobLogHandler(logging.Handler):
+    """
+    Sends the log records of each worker thread to its job log and
+    everything else to the console.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.setFormatter(logging.Formatter('%(message)s'))
+        self.console = ConsoleHandler()
+        self.buffers = {}   # thread ID -> io.StringIO
+
+    def emit(self, record: logging.LogRecord):
+        buffer = self.buffers.get(record.thread)
+        if buffer is not None:
+            buffer.write(self.format(record) + '\n')
+        else:
+            self.console.emit(record)
+
+    def flush(self):
+        self.console.flush()
+
+
+class MigrationServer:
+    """Job queue, worker threads and HTTP API around TrelloToSmartsheetMigrator."""
+
+    def __init__(
+        self,
+        api_tokens: List[str],
+        data_dir: str,
+        workers: int = 2,
+        requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+        folder_id: Optional[int] = None,
+        email_mapping_file: Optional[str] = None,
+        auth_key: Optional[str] = None,
+        compress_requests: bool = False
+    ):
+        """
+        Initialize the server.
+
+        Args:
+            api_tokens: Smartsheet API tokens shared by all jobs
+            data_dir: Directory for the queue database, uploads and parse cache
+            workers: Number of jobs run concurrently
+            requests_per_minute: Rate limit of each token
+            folder_id: Default folder for new sheets
+            email_mapping_file: Optional member name to email mapping used by all jobs
+            auth_key: If set, requests must send 'Authorization: Bearer <key>'
+            compress_requests: gzip row upload bodies of every job
+        """
+        self.data_dir = data_dir
+        self.upload_dir = os.path.join(data_dir, 'uploads')
+        os.makedirs(self.upload_dir, exist_ok=True)
+
+        self.queue = JobQueue(os.path.join(data_dir, 'jobs.sqlite'))
+        # One pool for every worker: the quota is shared, not multiplied
+        self.token_pool = TokenPool(api_tokens, requests_per_minute, shared_access=folder_id is not None)
+        self.compress_requests = compress_requests
+        self.wire_stats = WireStats()
+        for token in self.token_pool.tokens:
+            install_bulk_api(token.client, compress_requests, self.wire_stats)
+        self.worker_count = workers
+        self.folder_id = folder_id
+        self.email_mapping_file = email_mapping_file
+        self.auth_key = auth_key
+
+        ensure_logging()
+        self.job_logs = _JobLogHandler()
+        self.running = {}   # worker name -> job ID
+        self.stop_event = threading.Event()
+        self.threads = []
+        self.started_at = time.time()
+
+    def submit(self, name: str, upload: BinaryIO, length: int, options: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Store an uploaded export and queue a job for it.
+
+        The upload is copied to disk as it arrives, without holding it in
+        memory. Its contents are only read when the job runs, so plain and
+        compressed exports are accepted alike and an unreadable export fails
+        its job. The file is deleted once the job is done or failed.
+
+        Args:
+            name: Display name of the job
+            upload: Stream of the export contents
+            length: Number of bytes to read from the stream
+            options: Migrator options (folder_id, shard, upload_mode, summary_sheet)
+
+        Returns:
+            The queued job
+
+        Raises:
+            ValueError: If an option is invalid or the upload ends early
+        """
+        if options.get('shard', 'list') not in SHARD_STRATEGIES:
+            raise ValueError(f"Invalid shard strategy: {options['shard']}")
+        if options.get('upload_mode', 'rows') not in UPLOAD_MODES:
+            raise ValueError(f"Invalid upload mode: {options['upload_mode']}")
+
+        # A unique file per upload, whatever thread or second it arrives in
+        fd, file_path = tempfile.mkstemp(
+            prefix=time.strftime('%Y%m%d-%H%M%S-'), suffix='.export', dir=self.upload_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                remaining = length
+                while remaining:
+                    chunk = upload.read(min(UPLOAD_CHUNK_SIZE, remaining))
+                    if not chunk:
+                        raise ValueError(f"Upload ended after {length - remaining} of {length} bytes")
+                    f.write(chunk)
+                    remaining -= len(chunk)
+        except BaseException:
+            os.remove(file_path)
+            raise
+        job = self.queue.submit(name, file_path, options)
+        log.info(f"[*] Queued job {job['id']}: {name}")
+        return job
+
+    def run_job(self, job: Dict[str, Any], worker: str):
+        """Run one claimed job, recording its log and outcome, then delete its uploaded export."""
+        buffer = io.StringIO()
+        self.job_logs.buffers[threading.get_ident()] = buffer
+        self.running[worker] = job['id']
+        options = job['options']
+        try:
+            migrator = TrelloToSmartsheetMigrator(
+                None,
+                options.get('folder_id', self.folder_id),
+                self.email_mapping_file,
+                shard_strategy=options.get('shard', 'list'),
+                create_summary_sheet=bool(options.get('summary_sheet', False)),
+                cache_dir=os.path.join(self.data_dir, 'cache'),
+                upload_mode=options.get('upload_mode', 'rows'),
+                token_pool=self.token_pool,
+                compress_requests=self.compress_requests
+            )
+            sheet_id = migrator.migrate_board(job['file_path'])
+            error = None
+        except Exception as e:
+            error = e
+        finally:
+            # Records are written in the background: wait for the whole job log
+            flush_logging()
+            del self.job_logs.buffers[threading.get_ident()]
+            self.running.pop(worker, None)
+
+        try:
+            if error is None:
+                self.queue.finish(job['id'], sheet_id, buffer.getvalue())
+                log.info(f"[OK] Job {job['id']} done: sheet {sheet_id}")
+            else:
+                self.queue.fail(job['id'], str(error), buffer.getvalue())
+                log.warning(f"[WARN] Job {job['id']} failed: {error}")
+        finally:
+            # The job is final and is never run again: drop its export
+            try:
+                os.remove(job['file_path'])
+            except OSError as e:
+                log.warning(f"[WARN] Failed to remove the export of job {job['id']}: {e}")
+
+    def worker_loop(self, worker: str):
+        """Claim and run jobs until the server stops."""
+        while not self.stop_event.is_set():
+            job = self.queue.claim(worker)
+            if job is None:
+                self.stop_event.wait(POLL_INTERVAL)
+                continue
+            self.run_job(job, worker)
+
+    def start_workers(self):
+        """Requeue interrupted jobs and start the worker threads."""
+        requeued = self.queue.requeue_running()
+        if requeued:
+            log.info(f"[*] Requeued {requeued} interrupted jobs")
+        # Worker output goes to the job logs from now on
+        configure_logging(console=False, handlers=[self.job_logs])
+        for index in range(1, self.worker_count + 1):
+            worker = f"worker-{index}"
+            thread = threading.Thread(target=self.worker_loop, args=(worker,), name=worker, daemon=True)
+            self.threads.append(thread)
+            thread.start()
+
+    def stop(self):
+        """Stop the workers after their current job."""
+        self.stop_event.set()
+        for thread in self.threads:
+            thread.join()
+        configure_logging()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return queue, worker and rate limit metrics."""
+        return {
+            'uptime': round(time.time() - self.started_at, 1),
+            'jobs': self.queue.counts(),
+            'workers': {
+                f"worker-{index}": self.running.get(f"worker-{index}")
+                for index in range(1, self.worker_count + 1)
+            },
+            'tokens': self.token_pool.metrics(),
+            'wire': self.wire_stats.metrics()
+        }
+
+    def make_handler(self):
+        """Build the request handler class bound to this server."""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def send_json(self, status: int, payload: Any):
+                body = json.dumps(payload, indent=2).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def authorized(self) -> bool:
+                if server.auth_key and self.headers.get('Authorization') != f"Bearer {server.auth_key}":
+                    self.send_json(401, {'error': 'unauthorized'})
+                    return False
+                return True
+
+            def do_GET(self):
+                if not self.authorized():
+                    return
+                path = urlparse(self.path).path.rstrip('/')
+                if path == '/jobs':
+                    self.send_json(200, server.queue.list())
+                elif path.startswith('/jobs/') and path[6:].isdigit():
+                    job = server.queue.get(int(path[6:]), with_log=True)
+                    if job is None:
+                        self.send_json(404, {'error': 'no such job'})
+                    else:
+                        self.send_json(200, job)
+                elif path == '/metrics':
+                    self.send_json(200, server.metrics())
+                else:
+                    self.send_json(404, {'error': 'not found'})
+
+            def do_POST(self):
+                if not self.authorized():
+                    return
+                url = urlparse(self.path)
+                if url.path.rstrip('/') != '/jobs':
+                    self.send_json(404, {'error': 'not found'})
+                    return
+                length = int(self.headers.get('Content-Length') or 0)
+                if not length or length > MAX_UPLOAD_SIZE:
+                    self.send_json(400, {'error': 'missing or oversized export upload'})
+                    return
+                params = {key: values[0] for key, values in parse_qs(url.query).items()}
+                options = {}
+                try:
+                    if params.get('folder_id'):
+                        options['folder_id'] = int(params['folder_id'])
+                    for key in ('shard', 'upload_mode'):
+                        if params.get(key):
+                            options[key] = params[key]
+                    if params.get('summary_sheet'):
+                        options['summary_sheet'] = params['summary_sheet'] not in ('0', 'false')
+                    job = server.submit(params.get('name') or 'upload', self.rfile, length, options)
+                except ValueError as e:
+                    self.send_json(400, {'error': str(e)})
+                    return
+                self.send_json(202, job)
+
+        return Handler
+
+    def serve(self, host: str = '127.0.0.1', port: int = 8080) -> ThreadingHTTPServer:
+        """
+        Start the workers and the HTTP server in background threads.
+
+        Args:
+            host: Interface to listen on
+            port: TCP port (0 picks a free one)
+
+        Returns:
+            The running HTTP server (call shutdown() to stop it)
+        """
+        self.start_workers()
+        httpd = ThreadingHTTPServer((host, port), self.make_handler())
+        threading.Thread(target=httpd.serve_forever, name='http', daemon=True).start()
+        return httpd
+
+
+def main():
+    """Command line entry point."""
+    args, options = parse_cli_args(sys.argv[1:])
+
+    api_token = args[0] if args else os.getenv('SMARTSHEET_ACCESS_TOKEN')
+    if not api_token:
+        print("Error: SMARTSHEET_ACCESS_TOKEN not provided")
+        print(__doc__.split('Usage:')[1])
+        sys.exit(1)
+    tokens = [api_token] + [token for token in str(options.get('tokens', '')).split(',') if token]
+
+    server = MigrationServer(
+        tokens,
+        options.get('data-dir') or 'migration_server_data',
+        workers=int(options.get('workers', 2)),
+        requests_per_minute=float(options.get('rpm', DEFAULT_REQUESTS_PER_MINUTE)),
+        folder_id=int(options['folder-id']) if options.get('folder-id') else None,
+        email_mapping_file=options.get('email-mapping') or None,
+        auth_key=options.get('auth-key') or None,
+        compress_requests=bool(options.get('compress', False))
+    )
+    host = options.get('host', '127.0.0.1')
+    port = int(options.get('port', 8080))
+    httpd = server.serve(host, port)
+    log.info(f"[OK] Job server listening on http://{host}:{httpd.server_port} "
+             f"with {server.worker_count} workers and {len(server.token_pool.tokens)} tokens")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        log.info("\n[*] Stopping after running jobs finish...")
+        httpd.shutdown()
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
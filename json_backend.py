@@ -0,0 +1,180 @@
+"""
+Pluggable JSON backend.
+
+Parsing large Trello exports and encoding row payloads both go through the
+stdlib json module by default, which is several times slower than the
+C-accelerated alternatives. This module picks the fastest installed backend
+(orjson, then simdjson for parsing, then ujson) and falls back to the stdlib,
+so none of them is a hard dependency.
+
+The choice can be forced with the TRELLO_JSON_BACKEND environment variable
+or set_backend(). install_sdk_serializer() makes a Smartsheet client encode
+its request bodies with the selected backend.
+"""
+
+import gc
+import json
+import logging
+import os
+from typing import Any, Callable, Dict, Tuple
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import simdjson
+    SIMDJSON_AVAILABLE = True
+except ImportError:
+    SIMDJSON_AVAILABLE = False
+
+try:
+    import ujson
+    UJSON_AVAILABLE = True
+except ImportError:
+    UJSON_AVAILABLE = False
+
+# Preference order when no backend is forced
+BACKEND_ORDER = ('orjson', 'simdjson', 'ujson', 'stdlib')
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _available_backends() -> Dict[str, Tuple[Callable[[bytes], Any], Callable[[Any], bytes]]]:
+    """Return (loads, dumps) for every installed backend; dumps returns UTF-8 bytes."""
+    backends = {}
+    if ORJSON_AVAILABLE:
+        backends['orjson'] = (orjson.loads, orjson.dumps)
+    if SIMDJSON_AVAILABLE:
+        # simdjson only parses; encoding falls back to the next best backend
+        simd_dumps = orjson.dumps if ORJSON_AVAILABLE else (
+            (lambda obj: ujson.dumps(obj, ensure_ascii=False).encode('utf-8')) if UJSON_AVAILABLE
+            else _stdlib_dumps)
+        backends['simdjson'] = (simdjson.loads, simd_dumps)
+    if UJSON_AVAILABLE:
+        backends['ujson'] = (ujson.loads, lambda obj: ujson.dumps(obj, ensure_ascii=False).encode('utf-8'))
+    backends['stdlib'] = (json.loads, _stdlib_dumps)
+    return backends
+
+
+AVAILABLE_BACKENDS = _available_backends()
+
+BACKEND = None
+_loads = json.loads
+_dumps = _stdlib_dumps
+
+
+def set_backend(name: str = None) -> str:
+    """
+    Select the JSON backend.
+
+    Args:
+        name: Backend name ('orjson', 'simdjson', 'ujson' or 'stdlib'), or
+            None for the fastest installed one
+
+    Returns:
+        Name of the selected backend
+
+    Raises:
+        ValueError: If the requested backend is unknown or not installed
+    """
+    global BACKEND, _loads, _dumps
+    if name is None:
+        name = next(backend for backend in BACKEND_ORDER if backend in AVAILABLE_BACKENDS)
+    if name not in AVAILABLE_BACKENDS:
+        installed = ', '.join(backend for backend in BACKEND_ORDER if backend in AVAILABLE_BACKENDS)
+        raise ValueError(f"JSON backend '{name}' is not available (installed: {installed})")
+    BACKEND = name
+    _loads, _dumps = AVAILABLE_BACKENDS[name]
+    return name
+
+
+def loads(data: Any) -> Any:
+    """Parse JSON from bytes or str with the selected backend."""
+    return _loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode an object as compact UTF-8 JSON bytes with the selected backend."""
+    return _dumps(obj)
+
+
+def parse_document(raw: bytes) -> Any:
+    """
+    Parse a large JSON document with the selected backend.
+
+    The garbage collector is paused while parsing: a large export creates
+    millions of containers, and the collections they trigger can take longer
+    than the parse itself.
+
+    Args:
+        raw: JSON document as bytes
+
+    Returns:
+        Decoded JSON document
+    """
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _loads(raw)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def load_file(file_path: str) -> Any:
+    """
+    Parse a JSON file with the selected backend.
+
+    The file is read as bytes in one call; the C backends parse bytes
+    directly without decoding to str first.
+
+    Args:
+        file_path: Path of the JSON file
+
+    Returns:
+        Decoded JSON document
+    """
+    with open(file_path, 'rb') as f:
+        return parse_document(f.read())
+
+
+def install_sdk_serializer(client: Any) -> Any:
+    """
+    Make a Smartsheet SDK client encode request bodies with the selected backend.
+
+    The SDK hands request bodies to requests as ``json=``, which encodes them
+    with the stdlib. The client's prepare_request is wrapped to encode the
+    body itself and pass the bytes as the request data.
+
+    Args:
+        client: smartsheet.Smartsheet instance
+
+    Returns:
+        The same client
+    """
+    from smartsheet.util import serialize
+
+    prepare_request = client.prepare_request
+
+    def prepare_fast_request(_op):
+        if _op.get('json') and BACKEND != 'stdlib':
+            _op['form_data'] = dumps(serialize(_op['json']))
+            _op['json'] = None
+            _op['headers']['Content-Type'] = 'application/json'
+        return prepare_request(_op)
+
+    client.prepare_request = prepare_fast_request
+    return client
+
+
+try:
+    set_backend(os.getenv('TRELLO_JSON_BACKEND') or None)
+except ValueError as e:
+    # migration_log imports this module: log through the logger it configures
+    logging.getLogger('trello_migration.json').warning(f"[WARN] TRELLO_JSON_BACKEND: {e}, using the fastest installed")
+    set_backend()
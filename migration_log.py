@@ -0,0 +1,341 @@
+"""
+Logging for the migration tools.
+
+Progress and warnings go through the 'trello_migration' logger instead of
+print(). A log call only puts the record on a queue: a background thread
+formats and writes records in batches, so logging never waits on console,
+file or GUI output while requests are in flight.
+
+- Console output keeps the "[*]", "[OK]", "[WARN]" lines of the tool; it is
+  written to whatever sys.stdout is at the time, so stdout redirections keep
+  working. Other outputs (the GUI's log area, the job server's job logs) are
+  plain logging handlers fed by the same background thread.
+- JSON-lines output writes one object per record for log shippers, with the
+  line prefix moved to a "tag" field and any extra= fields included.
+- Records logged with extra={'repeat_key': ...} are rate limited: after a
+  burst of messages with the same key, further ones are counted and
+  reported as "N more ... suppressed" when the window ends or the log is
+  flushed.
+"""
+
+import atexit
+import json
+import logging
+import queue
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import List, Optional
+
+import json_backend
+
+LOGGER_NAME = 'trello_migration'
+
+LOG_LEVELS = ('debug', 'info', 'warning', 'error')
+
+# Messages with the same repeat_key let through per window
+DEFAULT_REPEAT_BURST = 5
+
+# Length of a rate limiting window (seconds)
+DEFAULT_REPEAT_WINDOW = 60.0
+
+# Records written between two flushes of the output streams
+MAX_WRITE_BATCH = 500
+
+# How long flush_logging waits for queued records to be written (seconds)
+FLUSH_TIMEOUT = 10.0
+
+# Line prefixes used by the console output, e.g. "[OK]" or "[WARN]"
+TAG_PATTERN = re.compile(r'^\s*\[(\*|OK|WARN|ERROR|SUCCESS|NEXT STEPS)\]\s*')
+
+# Attributes every LogRecord has; anything else came from extra=
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+
+def get_logger(name: Optional[str] = None) -> logging.Logger:
+    """
+    Return the migration logger, or one of its children.
+
+    Args:
+        name: Optional child name (e.g. 'token_pool')
+
+    Returns:
+        Logger under 'trello_migration'
+    """
+    return logging.getLogger(f"{LOGGER_NAME}.{name}" if name else LOGGER_NAME)
+
+
+class ConsoleHandler(logging.StreamHandler):
+    """Writes messages as-is to the current sys.stdout, flushing once per batch."""
+
+    def __init__(self):
+        super().__init__()
+        self.setFormatter(logging.Formatter('%(message)s'))
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.getMessage()
+        match = TAG_PATTERN.match(message)
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'thread': record.threadName,
+            'tag': match.group(1) if match else None,
+            'message': message[match.end():] if match else message.strip()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        try:
+            return json_backend.dumps(entry).decode('utf-8')
+        except TypeError:
+            return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class BackgroundHandler(logging.Handler):
+    """
+    Queues records and writes them to its handlers from a background thread.
+
+    Repeated messages sharing a repeat_key are rate limited here, before
+    they are queued.
+    """
+
+    def __init__(
+        self,
+        handlers: List[logging.Handler],
+        repeat_burst: int = DEFAULT_REPEAT_BURST,
+        repeat_window: float = DEFAULT_REPEAT_WINDOW
+    ):
+        """
+        Initialize the handler and start its writer thread.
+
+        Args:
+            handlers: Handlers the records are written to
+            repeat_burst: Messages with the same repeat_key let through per window
+            repeat_window: Length of a rate limiting window (seconds)
+        """
+        super().__init__()
+        self.handlers = handlers
+        self.repeat_burst = repeat_burst
+        self.repeat_window = repeat_window
+        self.repeats = {}   # repeat_key -> [window start, messages, suppressed, level]
+        self.queue = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self._write_loop, name='log-writer', daemon=True)
+        self.thread.start()
+
+    def _suppressed_record(self, key: str, count: int, level: int) -> logging.LogRecord:
+        return logging.makeLogRecord({
+            'name': LOGGER_NAME,
+            'levelno': level,
+            'levelname': logging.getLevelName(level),
+            'msg': f"[WARN] {count} more '{key}' messages suppressed",
+            'repeat_key': key,
+            'suppressed': count
+        })
+
+    def _rate_limit(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, 'repeat_key', None)
+        if key is None:
+            return True
+        now = time.monotonic()
+        state = self.repeats.get(key)
+        if state is None or now - state[0] >= self.repeat_window:
+            if state is not None and state[2]:
+                self.queue.put(self._suppressed_record(key, state[2], state[3]))
+            self.repeats[key] = [now, 1, 0, record.levelno]
+            return True
+        state[1] += 1
+        if state[1] <= self.repeat_burst:
+            return True
+        state[2] += 1
+        return False
+
+    def emit(self, record: logging.LogRecord):
+        if not self._rate_limit(record):
+            return
+        # Like QueueHandler.prepare: resolve the message and traceback now,
+        # the arguments may change before the writer thread gets to them
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        self.queue.put(record)
+
+    def _write_loop(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < MAX_WRITE_BATCH:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            for item in batch:
+                if item is None:
+                    self._flush_handlers()
+                    return
+                if isinstance(item, threading.Event):
+                    self._flush_handlers()
+                    item.set()
+                    continue
+                for handler in self.handlers:
+                    if item.levelno >= handler.level:
+                        handler.handle(item)
+            self._flush_handlers()
+
+    def _flush_handlers(self):
+        for handler in self.handlers:
+            handler.flush()
+
+    def flush(self, timeout: float = FLUSH_TIMEOUT):
+        """Report suppressed repeats and wait until queued records are written."""
+        self.acquire()
+        try:
+            for key, state in self.repeats.items():
+                if state[2]:
+                    self.queue.put(self._suppressed_record(key, state[2], state[3]))
+                    state[2] = 0
+        finally:
+            self.release()
+        if self.thread.is_alive():
+            done = threading.Event()
+            self.queue.put(done)
+            done.wait(timeout)
+
+    def pause(self):
+        """Write the queued records and stop the writer thread until resume."""
+        self.flush()
+        self.queue.put(None)
+        self.thread.join(FLUSH_TIMEOUT)
+
+    def resume(self):
+        """Restart the writer thread; records queued while paused are written."""
+        if not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._write_loop, name='log-writer', daemon=True)
+            self.thread.start()
+
+    def close(self):
+        """Write the remaining records and stop the writer thread."""
+        self.flush()
+        self.queue.put(None)
+        self.thread.join(FLUSH_TIMEOUT)
+        for handler in self.handlers:
+            handler.close()
+        super().close()
+
+
+def configure_logging(
+    level: str = 'info',
+    console: bool = True,
+    json_file: Optional[str] = None,
+    handlers: Optional[List[logging.Handler]] = None,
+    repeat_burst: int = DEFAULT_REPEAT_BURST,
+    repeat_window: float = DEFAULT_REPEAT_WINDOW
+) -> BackgroundHandler:
+    """
+    Set up the migration logger, replacing any previous configuration.
+
+    Args:
+        level: Minimum level ('debug', 'info', 'warning' or 'error')
+        console: Write the usual progress lines to stdout
+        json_file: Optional JSON-lines output file; '-' writes JSON lines to
+            stdout instead of the progress lines
+        handlers: Additional handlers fed by the background writer
+        repeat_burst: Messages with the same repeat_key let through per window
+        repeat_window: Length of a rate limiting window (seconds)
+
+    Returns:
+        The installed BackgroundHandler
+
+    Raises:
+        ValueError: If the level is unknown
+    """
+    if level.lower() not in LOG_LEVELS:
+        raise ValueError(f"Unknown log level '{level}' (expected one of: {', '.join(LOG_LEVELS)})")
+
+    outputs = list(handlers or [])
+    if json_file == '-':
+        json_handler = ConsoleHandler()
+        json_handler.setFormatter(JsonLinesFormatter())
+        outputs.append(json_handler)
+    else:
+        if console:
+            outputs.append(ConsoleHandler())
+        if json_file:
+            json_handler = logging.FileHandler(json_file, encoding='utf-8')
+            json_handler.setFormatter(JsonLinesFormatter())
+            outputs.append(json_handler)
+
+    shutdown_logging()
+    logger = get_logger()
+    background = BackgroundHandler(outputs, repeat_burst, repeat_window)
+    logger.addHandler(background)
+    logger.setLevel(level.upper())
+    logger.propagate = False
+    return background
+
+
+def ensure_logging() -> logging.Logger:
+    """Install the default console logging unless logging is already configured."""
+    logger = get_logger()
+    if not logger.handlers:
+        configure_logging()
+    return logger
+
+
+def flush_logging():
+    """Wait until every record logged so far has been written."""
+    for handler in get_logger().handlers:
+        handler.flush()
+
+
+@contextmanager
+def logging_paused():
+    """
+    Stop the log writer threads for the duration of the block.
+
+    Used around fork(): a child forked while another thread runs may inherit
+    a lock that thread holds. Records logged in the block are written after it.
+    """
+    handlers = [handler for handler in get_logger().handlers if isinstance(handler, BackgroundHandler)]
+    for handler in handlers:
+        handler.pause()
+    try:
+        yield
+    finally:
+        for handler in handlers:
+            handler.resume()
+
+
+def shutdown_logging():
+    """Write the remaining records and remove the migration log handlers."""
+    logger = get_logger()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+
+
+atexit.register(flush_logging)
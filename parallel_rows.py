@@ -0,0 +1,229 @@
+"""
+Parallel row building for very large boards.
+
+Building the SDK Row of every card is pure Python work that runs on one core;
+on a board of tens of thousands of cards the validation pass and the upload
+pass each spend longer building rows than the first row batches take to
+upload. RowBuildPool spreads both passes over forked worker processes:
+
+- the pool is forked once per board, right after the board is loaded and
+  before the migration starts any thread (the log writer is paused for the
+  fork), so workers read the board and the migrator copy-on-write instead of
+  receiving pickled copies; the garbage collector is frozen across the fork
+  so it does not write to (and copy) every inherited page
+- each task is a run of card positions plus the lookups of the pass; for
+  validation a worker checks its rows and returns a ValidationReport, which
+  the parent merges in card order; for the upload it returns the rows
+  serialized to JSON bytes, which are cheap to send back and are joined
+  straight into the request body by BulkRows, with the text cut from long
+  cells
+- results are consumed in card order, with a bounded number of tasks in
+  flight, so memory stays bounded while the upload is slower than the build
+
+Forking needs the 'fork' start method (Linux, macOS) and no other running
+thread; otherwise rows are built serially.
+"""
+
+import gc
+import itertools
+import multiprocessing
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from smartsheet.util import serialize
+
+from bulk_rows import RowPayload
+import json_backend
+from migration_log import logging_paused
+from row_validator import RowValidator, ValidationReport, truncate_long_cells
+
+PARALLEL_BUILD_AVAILABLE = 'fork' in multiprocessing.get_all_start_methods()
+
+# Cards per task: large enough that the per-task overhead is negligible
+BUILD_CHUNK_CARDS = 1000
+
+# Tasks in flight per worker
+TASKS_PER_WORKER = 2
+
+# Pool ID -> board and migrator of a pool. Entries are added before the
+# workers of their pool are forked and read by them copy-on-write.
+_BUILD_STATES = {}
+
+_pool_ids = itertools.count(1)
+
+
+def _iter_rows(state: Dict[str, Any], positions: Tuple[int, ...], params: Dict[str, Any]):
+    migrator = state['migrator']
+    cards = state['cards']
+    custom_field_index = state['custom_field_index']
+    for position in positions:
+        card = cards[position]
+        if not migrator.is_migrated_card(card):
+            continue
+        row = migrator.create_row_from_card(
+            card,
+            params['column_map'],
+            params['list_lookup'],
+            params['member_lookup'],
+            params['label_lookup'],
+            params['custom_field_lookup'],
+            custom_field_index.get(card['id'])
+        )
+        yield card['id'], row
+
+
+def _validate_chunk(task: Tuple[int, Tuple[int, ...], Dict[str, Any]]) -> ValidationReport:
+    pool_id, positions, params = task
+    state = _BUILD_STATES[pool_id]
+    columns = state['migrator'].build_sheet_columns(
+        params['list_names'], params['label_names'], params['custom_fields']
+    )
+    params = dict(params, column_map={col.title: index for index, col in enumerate(columns)})
+    validator = RowValidator(columns)
+    for card_id, row in _iter_rows(state, positions, params):
+        validator.check_row(card_id, row)
+    return validator.report
+
+
+def _build_chunk(task: Tuple[int, Tuple[int, ...], Dict[str, Any]]) -> List[Tuple[str, bytes, list]]:
+    pool_id, positions, params = task
+    payloads = []
+    for card_id, row in _iter_rows(_BUILD_STATES[pool_id], positions, params):
+        # A cell over the length limit fails the whole batch
+        overflow = truncate_long_cells(row)
+        payloads.append((card_id, json_backend.dumps(serialize(row)), overflow))
+    return payloads
+
+
+class RowBuildPool:
+    """Worker processes forked with a loaded board, validating and building its rows."""
+
+    def __init__(self, migrator: Any, trello_data: Dict[str, Any], workers: int = 2):
+        """
+        Fork the workers.
+
+        Must run before the migration starts any thread: forking while
+        another thread runs can leave a child holding a lock forever.
+
+        Args:
+            migrator: TrelloToSmartsheetMigrator building the rows
+            trello_data: Parsed Trello board data; shards must reuse its cards
+            workers: Number of worker processes
+
+        Raises:
+            RuntimeError: If fork() is unavailable or other threads are running
+        """
+        if not PARALLEL_BUILD_AVAILABLE:
+            raise RuntimeError("parallel row building needs fork()")
+        cards = trello_data.get('cards', [])
+        self.migrator = migrator
+        self.workers = workers
+        self.positions = {card['id']: position for position, card in enumerate(cards)}
+        self.pool_id = next(_pool_ids)
+        _BUILD_STATES[self.pool_id] = {
+            'migrator': migrator,
+            'cards': cards,
+            'custom_field_index': (
+                migrator.build_custom_field_item_index(trello_data) if trello_data.get('customFields') else {}
+            )
+        }
+        try:
+            with logging_paused():
+                if threading.active_count() > 1:
+                    raise RuntimeError(f"{threading.active_count() - 1} other threads are running")
+                gc.freeze()
+                try:
+                    self.pool = multiprocessing.get_context('fork').Pool(workers)
+                finally:
+                    gc.unfreeze()
+        except BaseException:
+            del _BUILD_STATES[self.pool_id]
+            raise
+
+    def _tasks(self, trello_data: Dict[str, Any], params: Dict[str, Any]) -> Iterator[tuple]:
+        positions = [self.positions[card['id']] for card in trello_data.get('cards', [])]
+        for start in range(0, len(positions), BUILD_CHUNK_CARDS):
+            yield self.pool_id, tuple(positions[start:start + BUILD_CHUNK_CARDS]), params
+
+    def _run(self, func: Callable, tasks: Iterator[tuple]) -> Iterator[Any]:
+        pending = deque()
+        while True:
+            while len(pending) < self.workers * TASKS_PER_WORKER:
+                task = next(tasks, None)
+                if task is None:
+                    break
+                pending.append(self.pool.apply_async(func, (task,)))
+            if not pending:
+                return
+            yield pending.popleft().get()
+
+    def _lookups(self, trello_data: Dict[str, Any], custom_fields: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        return {
+            'list_lookup': self.migrator.build_list_lookup(trello_data),
+            'member_lookup': self.migrator.build_member_lookup(trello_data),
+            'label_lookup': self.migrator.build_label_lookup(trello_data),
+            'custom_field_lookup': {field['id']: field for field in custom_fields or []}
+        }
+
+    def validate(
+        self,
+        trello_data: Dict[str, Any],
+        list_names: List[str],
+        label_names: List[str],
+        custom_fields: Optional[List[Dict[str, Any]]] = None
+    ) -> ValidationReport:
+        """
+        Check the row of every active card, as validate_board_rows does.
+
+        Args:
+            trello_data: Parsed Trello board data (or a shard of it)
+            list_names: List names for the List column
+            label_names: Label names for the Labels column
+            custom_fields: Optional custom field definitions from extract_custom_fields
+
+        Returns:
+            The report a single RowValidator checking the rows in order gives
+        """
+        params = dict(
+            self._lookups(trello_data, custom_fields),
+            list_names=list_names,
+            label_names=label_names,
+            custom_fields=custom_fields
+        )
+        report = ValidationReport()
+        for chunk_report in self._run(_validate_chunk, self._tasks(trello_data, params)):
+            report.merge(chunk_report)
+        return report
+
+    def iter_payloads(
+        self,
+        trello_data: Dict[str, Any],
+        column_map: Dict[str, int],
+        custom_fields: Optional[List[Dict[str, Any]]] = None
+    ) -> Iterator[Tuple[str, RowPayload]]:
+        """
+        Build the row of every active card, as iter_card_rows does, serialized.
+
+        Text cut from long cells is recorded with the migrator's record_overflow.
+
+        Args:
+            trello_data: Parsed Trello board data (or a shard of it)
+            column_map: Dictionary mapping column names to column IDs
+            custom_fields: Optional custom field definitions from extract_custom_fields
+
+        Yields:
+            (card ID, RowPayload) pairs in board order
+        """
+        column_titles = {column_id: title for title, column_id in column_map.items()}
+        params = dict(self._lookups(trello_data, custom_fields), column_map=column_map)
+        for payloads in self._run(_build_chunk, self._tasks(trello_data, params)):
+            for card_id, data, overflow in payloads:
+                self.migrator.record_overflow(card_id, overflow, column_titles)
+                yield card_id, RowPayload(data)
+
+    def close(self):
+        """Stop the workers."""
+        self.pool.terminate()
+        self.pool.join()
+        del _BUILD_STATES[self.pool_id]
@@ -0,0 +1,114 @@
+"""
+Small helpers for running migration phases as a threaded pipeline.
+
+Each stage runs in its own thread and hands work to the next one through a
+bounded queue.Queue. A full queue blocks the producer (backpressure), and a
+failure in any stage sets a shared stop event so the other stages give up
+instead of waiting forever.
+"""
+
+import queue
+import threading
+from typing import Any, Callable, Iterator, Optional
+
+# Marks the end of a stage's output
+END_OF_STREAM = object()
+
+# How often blocked stages re-check the stop event (seconds)
+POLL_INTERVAL = 0.1
+
+
+class PipelineAborted(Exception):
+    """Raised inside a stage when another stage has failed."""
+
+
+class Pipeline:
+    """Run pipeline stages in threads and collect their errors."""
+
+    def __init__(self):
+        self.stop_event = threading.Event()
+        self.errors = []
+        self.threads = []
+
+    def make_queue(self, maxsize: int) -> queue.Queue:
+        """Create a bounded queue connecting two stages."""
+        return queue.Queue(maxsize=max(maxsize, 1))
+
+    def put(self, q: queue.Queue, item: Any):
+        """
+        Put an item on a queue, blocking while it is full.
+
+        Raises:
+            PipelineAborted: If another stage failed while waiting
+        """
+        while True:
+            if self.stop_event.is_set():
+                raise PipelineAborted()
+            try:
+                q.put(item, timeout=POLL_INTERVAL)
+                return
+            except queue.Full:
+                continue
+
+    def iterate(self, q: queue.Queue) -> Iterator[Any]:
+        """
+        Yield items from a queue until the producer closes it.
+
+        Raises:
+            PipelineAborted: If another stage failed while waiting
+        """
+        while True:
+            if self.stop_event.is_set():
+                raise PipelineAborted()
+            try:
+                item = q.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            if item is END_OF_STREAM:
+                return
+            yield item
+
+    def close(self, q: queue.Queue):
+        """Signal the consumer of a queue that no more items will come."""
+        try:
+            self.put(q, END_OF_STREAM)
+        except PipelineAborted:
+            pass
+
+    def start(self, name: str, target: Callable[[], None], output: Optional[queue.Queue] = None):
+        """
+        Start a stage in a background thread.
+
+        Args:
+            name: Stage name used in error messages
+            target: Callable running the stage
+            output: Queue the stage feeds; closed when the stage ends
+        """
+        def run():
+            try:
+                target()
+            except PipelineAborted:
+                pass
+            except BaseException as e:
+                self.errors.append((name, e))
+                self.stop_event.set()
+            finally:
+                if output is not None:
+                    self.close(output)
+
+        thread = threading.Thread(target=run, name=f"pipeline-{name}", daemon=True)
+        self.threads.append(thread)
+        thread.start()
+
+    def join(self):
+        """
+        Wait for all stages and re-raise the first error.
+
+        Raises:
+            Exception: The first exception raised by a stage
+        """
+        for thread in self.threads:
+            thread.join()
+        if self.errors:
+            name, error = self.errors[0]
+            raise RuntimeError(f"Pipeline stage '{name}' failed: {error}") from error
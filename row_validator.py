@@ -0,0 +1,242 @@
+"""
+Offline validation of Smartsheet rows before upload.
+
+One bad cell makes a whole add_rows call fail, and that is only reported
+after the network round trip. RowValidator checks the rows built by the
+migrator locally against the rules Smartsheet enforces:
+
+- cell text is at most 4000 characters
+- PICKLIST / MULTI_PICKLIST values are among the column options
+- contact emails are syntactically valid
+
+Problems are repaired where possible (long text is truncated and the
+overflow kept for a follow-up discussion, missing picklist options are added
+to the column, non-ASCII emails are transliterated) and collected in a
+ValidationReport otherwise.
+"""
+
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+# Smartsheet cell value limit (characters)
+MAX_CELL_LENGTH = 4000
+
+EMAIL_PATTERN = re.compile(r"^[A-Za-z0-9.!#$%&'*+/=?^_`{|}~-]+@[A-Za-z0-9-]+(\.[A-Za-z0-9-]+)+$")
+
+
+def is_valid_email(email: Optional[str]) -> bool:
+    """Check the syntax of an email address."""
+    return bool(email) and EMAIL_PATTERN.match(email) is not None
+
+
+def repair_email(email: Optional[str]) -> Optional[str]:
+    """
+    Try to turn an invalid email into a valid one.
+
+    Accents are transliterated (é -> e) and characters that are not allowed
+    in an address (spaces, apostrophes...) are dropped.
+
+    Args:
+        email: Invalid email address
+
+    Returns:
+        Repaired address, or None if it still is not valid
+    """
+    if not email or email.count('@') != 1:
+        return None
+    ascii_email = unicodedata.normalize('NFKD', email).encode('ascii', 'ignore').decode('ascii')
+    local, domain = ascii_email.lower().split('@')
+    local = re.sub(r"[^a-z0-9._+-]", '', local).strip('.')
+    repaired = f"{local}@{domain}"
+    return repaired if is_valid_email(repaired) else None
+
+
+def truncate_long_cells(row: Any) -> List[Tuple[Any, str]]:
+    """
+    Truncate text cells longer than MAX_CELL_LENGTH in place.
+
+    Args:
+        row: Row object
+
+    Returns:
+        List of (column ID, overflow text) for each truncated cell
+    """
+    overflow = []
+    for cell in row.cells:
+        value = cell.value
+        if isinstance(value, str) and len(value) > MAX_CELL_LENGTH:
+            cell.value = value[:MAX_CELL_LENGTH]
+            overflow.append((cell.column_id, value[MAX_CELL_LENGTH:]))
+    return overflow
+
+
+class ValidationReport:
+    """Outcome of validating all rows of a board."""
+
+    def __init__(self):
+        self.rows_checked = 0
+        self.errors = []            # (card ID, column title, message)
+        self.repairs = []           # (card ID, column title, message)
+        self.extra_options = {}     # column title -> option values to add
+        self.overflow = {}          # card ID -> [(column title, overflow text)]
+        self.email_repairs = {}     # member name -> repaired email
+        self.invalid_emails = set()
+        # ('errors' or 'repairs', index) -> key of the entries reported once
+        # per board (added options, email repairs, invalid emails)
+        self.entry_keys = {}
+
+    def add(self, kind: str, entry: Tuple[str, str, str], key: Optional[tuple] = None):
+        """
+        Record an error or repair.
+
+        Args:
+            kind: 'errors' or 'repairs'
+            entry: (card ID, column title, message)
+            key: Set for entries reported once per board, so merge can
+                drop the ones another report already holds
+        """
+        entries = getattr(self, kind)
+        if key is not None:
+            self.entry_keys[(kind, len(entries))] = key
+        entries.append(entry)
+
+    def merge(self, other: 'ValidationReport'):
+        """
+        Add the findings of a report on the following rows (e.g. from another worker).
+
+        The result is the report a single validator checking both row
+        ranges in order would have produced.
+
+        Args:
+            other: Report on rows that come after the rows of this one
+        """
+        seen = set(self.entry_keys.values())
+        self.rows_checked += other.rows_checked
+        for kind in ('errors', 'repairs'):
+            for index, entry in enumerate(getattr(other, kind)):
+                key = other.entry_keys.get((kind, index))
+                if key in seen:
+                    continue
+                self.add(kind, entry, key)
+        for title, values in other.extra_options.items():
+            options = self.extra_options.setdefault(title, [])
+            options.extend(value for value in values if value not in options)
+        self.overflow.update(other.overflow)
+        for name, email in other.email_repairs.items():
+            self.email_repairs.setdefault(name, email)
+        self.invalid_emails |= other.invalid_emails
+
+    @property
+    def ok(self) -> bool:
+        """True when no unrepairable problem was found."""
+        return not self.errors
+
+    def format(self, limit: int = 50) -> str:
+        """
+        Render the report as text.
+
+        Args:
+            limit: Maximum number of errors and repairs listed individually
+
+        Returns:
+            Multi-line report
+        """
+        lines = [f"Checked {self.rows_checked} rows: {len(self.errors)} errors, "
+                 f"{len(self.repairs)} repairs"]
+        for title, entries in (('Errors', self.errors), ('Repairs', self.repairs)):
+            if not entries:
+                continue
+            lines.append(f"{title}:")
+            for card_id, column, message in entries[:limit]:
+                lines.append(f"   card {card_id} [{column}]: {message}")
+            if len(entries) > limit:
+                lines.append(f"   ... {len(entries) - limit} more")
+        return '\n'.join(lines)
+
+
+class RowValidator:
+    """Validate rows built against a list of column specifications."""
+
+    def __init__(self, columns: List[Any], auto_repair: bool = True):
+        """
+        Initialize the validator.
+
+        Args:
+            columns: Column specifications in sheet order; rows passed to
+                check_row must use column positions as column IDs
+            auto_repair: Repair problems where possible instead of reporting
+                them as errors
+        """
+        self.columns = columns
+        self.auto_repair = auto_repair
+        self.options = {
+            index: set(col.options or [])
+            for index, col in enumerate(columns)
+            if col.type in ('PICKLIST', 'MULTI_PICKLIST')
+        }
+        self.report = ValidationReport()
+
+    def _picklist_value(self, card_id: str, index: int, value: Any):
+        options = self.options[index]
+        if value in (None, '') or value in options:
+            return
+        title = self.columns[index].title
+        if self.auto_repair:
+            options.add(value)
+            self.report.extra_options.setdefault(title, []).append(value)
+            self.report.add('repairs', (card_id, title, f"added missing option '{value}'"), ('option', title, value))
+        else:
+            self.report.add('errors', (card_id, title, f"'{value}' is not a column option"))
+
+    def check_row(self, card_id: str, row: Any):
+        """
+        Validate one row and record problems and repairs in the report.
+
+        Args:
+            card_id: Trello card ID the row was built from
+            row: Row object whose cell column IDs are column positions
+        """
+        self.report.rows_checked += 1
+
+        for cell in row.cells:
+            index = cell.column_id
+            title = self.columns[index].title
+
+            value = cell.value
+            if isinstance(value, str) and len(value) > MAX_CELL_LENGTH:
+                if self.auto_repair:
+                    self.report.overflow.setdefault(card_id, []).append(
+                        (title, value[MAX_CELL_LENGTH:]))
+                    self.report.add(
+                        'repairs', (card_id, title, f"{len(value)} characters, overflow moved to a discussion"))
+                else:
+                    self.report.add(
+                        'errors', (card_id, title, f"{len(value)} characters (limit {MAX_CELL_LENGTH})"))
+
+            if index in self.options:
+                if cell.object_value is not None:
+                    for option in cell.object_value.to_dict().get('values', []):
+                        self._picklist_value(card_id, index, option)
+                else:
+                    self._picklist_value(card_id, index, value)
+
+            if self.columns[index].type == 'MULTI_CONTACT_LIST' and cell.object_value is not None:
+                for contact in cell.object_value.to_dict().get('values', []):
+                    self._check_contact(card_id, title, contact)
+
+    def _check_contact(self, card_id: str, title: str, contact: Dict[str, Any]):
+        email = contact.get('email')
+        name = contact.get('name', '')
+        if is_valid_email(email) or name in self.report.email_repairs or \
+                email in self.report.invalid_emails:
+            return
+        repaired = repair_email(email) if self.auto_repair else None
+        if repaired:
+            self.report.email_repairs[name] = repaired
+            self.report.add('repairs', (card_id, title, f"email '{email}' -> '{repaired}'"), ('email', name))
+        else:
+            # Reported once, not for every card the member is on
+            self.report.invalid_emails.add(email)
+            self.report.add('errors', (card_id, title, f"invalid email '{email}' for {name}"),
+                            ('invalid email', email))
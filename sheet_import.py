@@ -0,0 +1,117 @@
+"""
+Helpers for the single-upload import path.
+
+Instead of creating an empty sheet and inserting rows through many add_rows
+calls, the import path writes every card row to a local XLSX (or CSV) file,
+uploads it with one Smartsheet import request, and then fixes up column
+types. This module handles the file side: flattening Row objects built by
+the migrator into plain cell values and streaming them to disk.
+"""
+
+import csv
+from datetime import date
+from typing import Any, Iterable, List, Optional
+
+try:
+    import openpyxl
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
+# Separator Smartsheet splits on when converting text to multi-value columns
+MULTI_VALUE_SEPARATOR = '\n'
+
+# Largest page get_sheet returns when reading rows back
+READ_BACK_PAGE_SIZE = 10000
+
+
+def cell_to_import_value(cell: Any) -> Any:
+    """
+    Convert a Smartsheet Cell to a plain value for an import file.
+
+    Multi-contact cells become their email addresses and multi-picklist
+    cells their option names, joined with MULTI_VALUE_SEPARATOR so the
+    column type conversion after import splits them again.
+
+    Args:
+        cell: Cell object built by create_row_from_card
+
+    Returns:
+        Value to write in the import file
+    """
+    object_value = cell.object_value
+    if object_value is not None:
+        values = object_value.to_dict().get('values', [])
+        parts = [value.get('email') or value.get('name', '') if isinstance(value, dict) else str(value)
+                 for value in values]
+        return MULTI_VALUE_SEPARATOR.join(part for part in parts if part)
+    return cell.value
+
+
+def row_to_import_values(row: Any, column_count: int, date_columns: Optional[set] = None) -> List[Any]:
+    """
+    Flatten a Row whose cell column IDs are column positions into a value list.
+
+    Args:
+        row: Row object built with a title -> position column map
+        column_count: Number of columns in the import file
+        date_columns: Positions of date columns; their 'YYYY-MM-DD' strings
+            are written as real dates
+
+    Returns:
+        List of cell values in column order
+    """
+    values = [None] * column_count
+    for cell in row.cells:
+        value = cell_to_import_value(cell)
+        if date_columns and cell.column_id in date_columns and isinstance(value, str):
+            try:
+                value = date.fromisoformat(value)
+            except ValueError:
+                pass
+        values[cell.column_id] = value
+    return values
+
+
+def write_import_file(
+    path: str,
+    headers: List[str],
+    rows: Iterable[List[Any]],
+    file_format: str = 'xlsx'
+) -> int:
+    """
+    Stream rows to an XLSX or CSV file without keeping them in memory.
+
+    Args:
+        path: Destination file path
+        headers: Column titles, written as the first row
+        rows: Iterable of value lists in column order
+        file_format: 'xlsx' (write-only openpyxl workbook) or 'csv'
+
+    Returns:
+        Number of data rows written
+
+    Raises:
+        RuntimeError: If XLSX output is requested but openpyxl is missing
+    """
+    count = 0
+
+    if file_format == 'xlsx':
+        if not OPENPYXL_AVAILABLE:
+            raise RuntimeError("openpyxl is required to write XLSX import files")
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet()
+        ws.append(headers)
+        for values in rows:
+            ws.append(values)
+            count += 1
+        wb.save(path)
+        return count
+
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        for values in rows:
+            writer.writerow(['' if value is None else value for value in values])
+            count += 1
+    return count
@@ -0,0 +1,317 @@
+"""
+Post-migration verification of a sheet against the Trello export.
+
+The migrated sheet is read back with a few large requests: row pages of
+get_sheet and the sheet-wide discussion list (Discussions.get_all_discussions
+with comments), fetched in parallel once the first page reveals how many
+pages there are. Every row and every row's discussions are reduced to a
+content hash, and VerificationReport lists the cards whose hashes differ
+from the ones computed from the export.
+
+Values are normalized before hashing so that representation differences
+between what was sent and what the API returns (3 vs 3.0, contact order,
+trailing whitespace) do not count as mismatches.
+"""
+
+import hashlib
+from datetime import date, datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+
+from sheet_import import cell_to_import_value
+
+# Rows per get_sheet page and discussions per get_all_discussions page
+VERIFY_PAGE_SIZE = 1000
+
+# Concurrent read requests
+VERIFY_WORKERS = 4
+
+
+def normalize_value(value: Any) -> str:
+    """
+    Reduce a cell value to a canonical string.
+
+    Multi-value cells (newline-separated, see cell_to_import_value) are
+    sorted, whole floats lose their decimal part, dates become YYYY-MM-DD
+    and surrounding whitespace is ignored.
+
+    Args:
+        value: Cell value
+
+    Returns:
+        Canonical text ('' for empty cells)
+    """
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    elif isinstance(value, datetime):
+        value = value.date().isoformat()
+    elif isinstance(value, date):
+        value = value.isoformat()
+    text = str(value).strip()
+    if '\n' in text:
+        text = '\n'.join(sorted(part.strip() for part in text.split('\n') if part.strip()))
+    return text
+
+
+def cell_text(cell: Any) -> str:
+    """Return the normalized content of a Cell (values, contacts or options)."""
+    return normalize_value(cell_to_import_value(cell))
+
+
+def content_hash(parts: List[str]) -> str:
+    """Hash a list of normalized strings."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+def row_values_hash(values: Dict[str, str]) -> str:
+    """Hash the normalized cell values of a row, keyed by column title."""
+    return content_hash([f"{title}={value}" for title, value in sorted(values.items()) if value])
+
+
+def comments_hash(texts: List[str]) -> str:
+    """Hash the comments of a row regardless of their order."""
+    return content_hash(sorted(normalize_value(text) for text in texts))
+
+
+def fetch_pages(
+    fetch_page: Callable[[int], Any],
+    total_pages: Callable[[Any], int],
+    max_workers: int = VERIFY_WORKERS
+) -> List[Any]:
+    """
+    Fetch all pages of a paginated endpoint.
+
+    The first page is fetched alone to learn the page count; the others are
+    fetched concurrently.
+
+    Args:
+        fetch_page: Callable fetching one page by number (1-based)
+        total_pages: Callable returning the page count from the first page
+        max_workers: Number of concurrent requests
+
+    Returns:
+        Page results in page order
+    """
+    first = fetch_page(1)
+    count = total_pages(first)
+    if count <= 1:
+        return [first]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return [first] + list(executor.map(fetch_page, range(2, count + 1)))
+
+
+def read_sheet_rows(
+    client: Any,
+    sheet_id: int,
+    page_size: int = VERIFY_PAGE_SIZE,
+    max_workers: int = VERIFY_WORKERS
+) -> Tuple[Any, List[Any], int]:
+    """
+    Read all rows of a sheet with parallel get_sheet pages.
+
+    Args:
+        client: Smartsheet client
+        sheet_id: Sheet to read
+        page_size: Rows per request
+        max_workers: Number of concurrent requests
+
+    Returns:
+        Tuple of (first page Sheet, with columns, list of all rows, number
+        of requests made)
+    """
+    def fetch_page(page):
+        # level=2 with objectValue returns contacts and multi-picklist values
+        return client.Sheets.get_sheet(
+            sheet_id, include='objectValue', level=2, page_size=page_size, page=page)
+
+    def total_pages(sheet):
+        return -(-(sheet.total_row_count or 0) // page_size)
+
+    pages = fetch_pages(fetch_page, total_pages, max_workers)
+    rows = [row for sheet in pages for row in sheet.rows]
+    return pages[0], rows, len(pages)
+
+
+def read_row_comments(
+    client: Any,
+    sheet_id: int,
+    page_size: int = VERIFY_PAGE_SIZE,
+    max_workers: int = VERIFY_WORKERS
+) -> Tuple[Dict[int, List[str]], int]:
+    """
+    Read every row discussion of a sheet with its comments.
+
+    Args:
+        client: Smartsheet client
+        sheet_id: Sheet to read
+        page_size: Discussions per request
+        max_workers: Number of concurrent requests
+
+    Returns:
+        Tuple of (dictionary mapping row IDs to the texts of all their
+        comments, number of requests made)
+    """
+    def fetch_page(page):
+        return client.Discussions.get_all_discussions(
+            sheet_id, include='comments', page_size=page_size, page=page)
+
+    pages = fetch_pages(fetch_page, lambda result: result.total_pages or 1, max_workers)
+
+    comments = {}
+    for result in pages:
+        for discussion in result.data:
+            if discussion.parent_type != 'ROW':
+                continue
+            texts = comments.setdefault(discussion.parent_id, [])
+            texts.extend(comment.text for comment in discussion.comments or [])
+    return comments, len(pages)
+
+
+class VerificationReport:
+    """Differences between the export and the migrated sheets."""
+
+    def __init__(self):
+        self.cards_checked = 0
+        self.rows_read = 0
+        self.requests = 0
+        self.missing = []           # card IDs without a row
+        self.mismatched = []        # (card ID, [column titles])
+        self.comment_mismatches = []  # (card ID, expected count, found count)
+        self.unexpected_rows = []   # row IDs matching no card
+
+    @property
+    def ok(self) -> bool:
+        """True when every card and comment was found unchanged."""
+        return not (self.missing or self.mismatched or self.comment_mismatches or self.unexpected_rows)
+
+    def format(self, limit: int = 50) -> str:
+        """
+        Render the report as text.
+
+        Args:
+            limit: Maximum number of entries listed per category
+
+        Returns:
+            Multi-line report
+        """
+        lines = [f"Verified {self.cards_checked} cards against {self.rows_read} rows "
+                 f"({self.requests} read requests): {len(self.missing)} missing, "
+                 f"{len(self.mismatched)} mismatched, {len(self.comment_mismatches)} with "
+                 f"comment differences, {len(self.unexpected_rows)} unexpected rows"]
+        sections = (
+            ('Missing cards', [f"card {card_id}" for card_id in self.missing]),
+            ('Mismatched cards', [f"card {card_id}: {', '.join(columns)}"
+                                  for card_id, columns in self.mismatched]),
+            ('Comment differences', [f"card {card_id}: expected {expected}, found {found}"
+                                     for card_id, expected, found in self.comment_mismatches]),
+            ('Unexpected rows', [f"row {row_id}" for row_id in self.unexpected_rows])
+        )
+        for title, entries in sections:
+            if not entries:
+                continue
+            lines.append(f"{title}:")
+            for entry in entries[:limit]:
+                lines.append(f"   {entry}")
+            if len(entries) > limit:
+                lines.append(f"   ... {len(entries) - limit} more")
+        return '\n'.join(lines)
+
+
+class SheetVerifier:
+    """Compare migrated sheets with the rows and comments expected from the export."""
+
+    def __init__(
+        self,
+        client: Any,
+        page_size: int = VERIFY_PAGE_SIZE,
+        max_workers: int = VERIFY_WORKERS,
+        key_column: str = 'URL'
+    ):
+        """
+        Initialize the verifier.
+
+        Args:
+            client: Smartsheet client
+            page_size: Rows or discussions per read request
+            max_workers: Number of concurrent read requests
+            key_column: Column identifying the card of a row
+        """
+        self.client = client
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.key_column = key_column
+        self.report = VerificationReport()
+        self.expected = {}      # key -> (card ID, {title: value}, row hash, comments hash, comment count)
+        self.found = set()
+
+    def expect(self, card_id: str, values: Dict[str, str], comments: List[str]):
+        """
+        Register the expected content of a card.
+
+        Args:
+            card_id: Trello card ID
+            values: Normalized cell values keyed by column title
+            comments: Expected discussion texts
+        """
+        key = values.get(self.key_column) or card_id
+        self.expected[key] = (card_id, values, row_values_hash(values), comments_hash(comments), len(comments))
+        self.report.cards_checked += 1
+
+    def verify_sheet(self, sheet_id: int) -> VerificationReport:
+        """
+        Read a sheet back and compare its rows with the expected cards.
+
+        Args:
+            sheet_id: Migrated sheet (call once per shard)
+
+        Returns:
+            The cumulative report
+        """
+        sheet, rows, row_requests = read_sheet_rows(
+            self.client, sheet_id, self.page_size, self.max_workers)
+        comments, comment_requests = read_row_comments(
+            self.client, sheet_id, self.page_size, self.max_workers)
+        self.report.rows_read += len(rows)
+        self.report.requests += row_requests + comment_requests
+
+        titles = {col.id: col.title for col in sheet.columns}
+        for row in rows:
+            values = {titles[cell.column_id]: cell_text(cell) for cell in row.cells if cell.column_id in titles}
+            key = values.get(self.key_column)
+            entry = self.expected.get(key)
+            if entry is None:
+                self.report.unexpected_rows.append(row.id)
+                continue
+            card_id, expected_values, expected_hash, expected_comments, comment_count = entry
+            self.found.add(key)
+
+            if row_values_hash(values) != expected_hash:
+                columns = sorted(
+                    title for title in set(values) | set(expected_values)
+                    if values.get(title, '') != expected_values.get(title, '')
+                )
+                self.report.mismatched.append((card_id, columns))
+
+            row_comments = comments.get(row.id, [])
+            if comments_hash(row_comments) != expected_comments:
+                self.report.comment_mismatches.append((card_id, comment_count, len(row_comments)))
+
+        return self.report
+
+    def finish(self) -> VerificationReport:
+        """
+        Record the expected cards no sheet contained.
+
+        Returns:
+            The final report
+        """
+        self.report.missing = [
+            entry[0] for key, entry in self.expected.items() if key not in self.found
+        ]
+        return self.report
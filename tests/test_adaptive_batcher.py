@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+
+from smartsheet.exceptions import ApiError, ServerTimeoutExceededError
+
+import adaptive_batcher
+from adaptive_batcher import AdaptiveBatcher
+
+
+def too_large():
+    return ApiError(SimpleNamespace(result=SimpleNamespace(status_code=413, code=4000)), 'too large')
+
+
+def test_byte_cap_recovers_below_the_rejected_size():
+    batcher = AdaptiveBatcher('items', initial_size=10, max_size=10, max_bytes=10_000, size_of=lambda item: 100)
+    sent = []
+
+    def send(batch):
+        if len(batch) * 100 > 600:
+            raise too_large()
+        sent.append(len(batch))
+        return batch
+
+    items = list(range(200))
+    assert [item for batch, _ in batcher.run(items, send) for item in batch] == items
+    # Halved after each rejection, then back up to just below the smallest one
+    assert batcher.rejected_bytes == 700
+    assert batcher.max_bytes == 699
+    assert max(sent) == 6 and sent.count(6) > 20
+
+
+def test_confirm_time_is_not_counted_as_latency(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(adaptive_batcher.time, 'monotonic', lambda: clock[0])
+    batcher = AdaptiveBatcher('items', initial_size=4, max_size=4, size_of=lambda item: 1)
+
+    def send(batch):
+        clock[0] += 1.0
+        raise ServerTimeoutExceededError(SimpleNamespace(result=None), 'timeout')
+
+    def confirm(batch):
+        clock[0] += 100.0
+        return batch
+
+    assert [batch for batch, _ in batcher.run([1, 2, 3, 4], send, confirm)] == [[1, 2, 3, 4]]
+    assert batcher.stats['seconds'] == 1.0
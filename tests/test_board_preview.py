@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from board_preview import build_board_index
+from card_filter import CardFilter
+
+BOARD = {
+    'id': 'board1',
+    'name': 'Board',
+    'lists': [{'id': 'list1', 'name': 'To Do'}, {'id': 'list2', 'name': 'Done'}],
+    'cards': [
+        {'id': 'card1', 'name': 'First', 'idList': 'list1', 'closed': False},
+        {'id': 'card2', 'name': 'Second', 'idList': 'list2', 'closed': False},
+        {'id': 'card3', 'name': 'Orphan', 'idList': 'LX', 'closed': False}
+    ],
+    'actions': []
+}
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = tmp_path / 'board.json'
+    path.write_text(json.dumps(BOARD), encoding='utf-8')
+    return build_board_index(str(path))
+
+
+def test_orphan_cards_are_shown_but_not_on_the_board(index):
+    assert [trello_list.id for trello_list in index.lists] == ['list1', 'list2', 'LX']
+    assert [trello_list.on_board for trello_list in index.lists] == [True, True, False]
+    assert index.card_count == 3
+    assert index.filter_list_ids(set()) is None
+
+
+def test_excluding_a_list_gives_a_filter_the_board_accepts(index):
+    list_ids = index.filter_list_ids({'list2'})
+
+    assert list_ids == ['list1']
+    card_filter = CardFilter(lists=list_ids).bind(BOARD)
+    assert [card['id'] for card in BOARD['cards'] if card_filter.matches(card)] == ['card1']
+    assert [trello_list.id for trello_list in index.included_lists({'list2'})] == ['list1']
+
+
+def test_excluding_every_board_list_includes_nothing(index):
+    assert index.included_lists({'list1', 'list2'}) == []
@@ -0,0 +1,65 @@
+import pytest
+
+import trello_parse_cache
+from trello_parse_cache import cache_path, load_cached_board, save_cached_board
+from trello_to_smartsheet_kanban import CompactCard
+
+BOARD = {
+    'id': 'board1',
+    'name': 'Board',
+    'lists': [{'id': 'list1', 'name': 'To Do'}],
+    'labels': [{'id': 'label1', 'name': 'Urgent'}],
+    'members': [{'id': 'member1', 'fullName': 'Ana Lopez'}],
+    'cards': [
+        {'id': 'card1', 'name': 'First', 'desc': 'Résumé', 'idList': 'list1',
+         'idMembers': ['member1'], 'idLabels': ['label1'], 'shortUrl': 'https://trello.com/c/abc',
+         'closed': False, 'customFieldItems': [{'idCustomField': 'field1', 'value': {'text': 'x'}}]},
+        {'id': 'card2', 'name': 'Second', 'idList': 'list1', 'closed': True}
+    ]
+}
+
+COMMENTS = {'card1': [{'text': 'Hello', 'author_name': 'Ana Lopez', 'member_id': 'member1',
+                       'date': '2024-01-01T00:00:00.000Z'}]}
+
+
+def save_board(cache_dir):
+    data = dict(BOARD, cards=[CompactCard.from_trello(card) for card in BOARD['cards']])
+    save_cached_board(str(cache_dir), 'digest', data, COMMENTS)
+    return data
+
+
+def test_msgpack_round_trip(tmp_path):
+    pytest.importorskip('msgpack')
+    data = save_board(tmp_path)
+
+    assert cache_path(str(tmp_path), 'digest').endswith('.msgpack')
+    cached = load_cached_board(str(tmp_path), 'digest')
+
+    assert cached['name'] == 'Board'
+    assert list(cached['lists']) == BOARD['lists']
+    assert cached['commentsByCard'] == COMMENTS
+    for fresh, loaded in zip(data['cards'], cached['cards']):
+        for attr in CompactCard.__slots__:
+            assert getattr(loaded, attr) == getattr(fresh, attr)
+    # use_list=False: sequences come back as the tuples CompactCard.from_trello builds
+    assert cached['cards'][0].id_members == ('member1',)
+    assert isinstance(cached['cards'][0].custom_field_items, tuple)
+
+
+def test_json_round_trip_without_msgpack(tmp_path, monkeypatch):
+    monkeypatch.setattr(trello_parse_cache, 'MSGPACK_AVAILABLE', False)
+    data = save_board(tmp_path)
+
+    assert cache_path(str(tmp_path), 'digest').endswith('.json')
+    cached = load_cached_board(str(tmp_path), 'digest')
+
+    assert cached['commentsByCard'] == COMMENTS
+    assert [card.to_dict() for card in cached['cards']] == [card.to_dict() for card in data['cards']]
+
+
+def test_unreadable_entry_is_ignored(tmp_path):
+    path = cache_path(str(tmp_path), 'digest')
+    with open(path, 'wb') as f:
+        f.write(b'\xc1 not a cache entry')
+
+    assert load_cached_board(str(tmp_path), 'digest') is None
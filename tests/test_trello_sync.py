@@ -0,0 +1,120 @@
+import pytest
+
+from trello_sync import SyncService, replay_actions
+
+COLUMNS = {'Card Name': 11, 'Description': 12, 'List': 13, 'Due Date': 14, 'URL': 15}
+
+
+class FakeBulk:
+    def __init__(self):
+        self.updates = []       # (sheet ID, [(row ID, {column ID: value})]) per request
+        self.fail_updates = 0
+
+    def update_rows(self, sheet_id, rows):
+        if self.fail_updates:
+            self.fail_updates -= 1
+            raise RuntimeError('update failed')
+        self.updates.append((sheet_id, [
+            (row.id, {cell.column_id: cell.value for cell in row.cells}) for row in rows
+        ]))
+        return [row.id for row in rows]
+
+    def add_rows(self, sheet_id, rows):
+        return [500 + index for index in range(len(rows))]
+
+
+class FakeDiscussions:
+    def __init__(self):
+        self.posted = []
+
+    def create_discussion_on_row(self, sheet_id, row_id, discussion):
+        self.posted.append((sheet_id, row_id, discussion.comment.text))
+
+
+class FakeClient:
+    def __init__(self):
+        self.Bulk = FakeBulk()
+        self.Discussions = FakeDiscussions()
+
+
+def make_service(data_dir):
+    service = SyncService(['token'], str(data_dir), window=3600)
+    service.migrator.smartsheet_client = FakeClient()
+    service.store.link_sheet('board1', 1, COLUMNS, [('card1', 'AAAAAAAA', 101)])
+    return service
+
+
+@pytest.fixture
+def receiver(tmp_path):
+    service = make_service(tmp_path)
+    httpd = service.serve(port=0)
+    yield service, f"http://127.0.0.1:{httpd.server_port}/webhook"
+    httpd.shutdown()
+    httpd.server_close()
+    service.stop()
+
+
+def rename(action_id, name, date):
+    return {
+        'id': action_id, 'type': 'updateCard', 'date': date,
+        'data': {'card': {'id': 'card1', 'name': name}, 'old': {'name': 'before'}, 'board': {'id': 'board1'}}
+    }
+
+
+def test_edits_to_one_card_are_coalesced(receiver):
+    service, url = receiver
+    counts = replay_actions([
+        rename('a1', 'First', '2024-01-01T00:00:01.000Z'),
+        rename('a2', 'Second', '2024-01-01T00:00:02.000Z'),
+        rename('a1', 'First', '2024-01-01T00:00:01.000Z'),
+        rename('a3', 'Third', '2024-01-01T00:00:03.000Z')
+    ], url)
+
+    assert counts == {'queued': 3, 'duplicate': 1}
+    assert service.flush() == 1
+    assert service.migrator.smartsheet_client.Bulk.updates == [(1, [(101, {COLUMNS['Card Name']: 'Third'})])]
+    assert service.store.counts()['pending_events'] == 0
+
+
+def test_failed_update_is_requeued_under_newer_values(receiver):
+    service, url = receiver
+    bulk = service.migrator.smartsheet_client.Bulk
+    replay_actions([rename('a1', 'First', '2024-01-01T00:00:01.000Z')], url)
+    bulk.fail_updates = 1
+    service.flush()
+
+    assert bulk.updates == []
+    assert service.store.counts()['pending_events'] == 1
+
+    replay_actions([rename('a2', 'Second', '2024-01-01T00:00:02.000Z')], url)
+    service.flush()
+
+    assert bulk.updates == [(1, [(101, {COLUMNS['Card Name']: 'Second'})])]
+    assert service.store.counts()['pending_events'] == 0
+
+
+def test_action_without_card_is_rejected(receiver):
+    service, url = receiver
+    action = {'id': 'c1', 'type': 'createCard', 'date': '2024-01-01T00:00:01.000Z',
+              'data': {'card': {'name': 'No ID'}, 'board': {'id': 'board1'}}}
+
+    assert replay_actions([action], url) == {'http 400': 1}
+    assert service.store.counts()['pending_events'] == 0
+
+
+def test_pending_events_are_replayed_on_start(tmp_path):
+    service = make_service(tmp_path)
+    service.receive({'action': rename('a1', 'First', '2024-01-01T00:00:01.000Z')})
+    # Stored by an older version that did not check actions
+    service.store.record_event({'id': 'bad', 'type': 'createCard',
+                               'data': {'card': {'name': 'No ID'}, 'board': {'id': 'board1'}}})
+
+    restarted = make_service(tmp_path)
+    restarted.start()
+    try:
+        restarted.flush()
+        assert restarted.migrator.smartsheet_client.Bulk.updates == [(1, [(101, {COLUMNS['Card Name']: 'First'})])]
+        assert restarted.store.counts()['pending_events'] == 0
+        assert restarted.stats['failed'] == 1
+    finally:
+        restarted.stop()
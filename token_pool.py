@@ -0,0 +1,246 @@
+"""
+Pool of Smartsheet API tokens for higher aggregate throughput.
+
+Smartsheet rate limits apply per token (about 300 requests per minute), so a
+single-token migration is capped at one token's quota. TokenPool holds one
+client per token (e.g. several service accounts sharing folder access) and
+PooledSmartsheetClient exposes the usual ``client.Sheets.add_rows(...)``
+interface on top of it, sending each call through the token with the most
+remaining budget.
+
+Rate limit errors (429) are handled per token: the token that hit the limit
+is rested and the call is retried on another token. Sheet-scoped calls only
+go to tokens that can write the sheet: the token that created it, plus every
+token when the pool is declared to share folder access.
+"""
+
+import random
+import threading
+import time
+from typing import Any, Dict, List
+
+import smartsheet
+
+import json_backend
+from smartsheet.exceptions import RateLimitExceededError
+from smartsheet.smartsheet import AbstractUserCalcBackoff
+from migration_log import get_logger
+
+log = get_logger('token_pool')
+
+# Smartsheet's documented per-token limit
+DEFAULT_REQUESTS_PER_MINUTE = 300
+
+# How long a token rests after a 429 when the API gives no hint (seconds)
+RATE_LIMIT_COOLDOWN = 60.0
+
+# Error code Smartsheet uses for rate limiting
+RATE_LIMIT_ERROR_CODE = 4003
+
+# API objects whose methods take a sheet ID as first argument
+SHEET_SCOPED_APIS = ('Sheets', 'Discussions', 'Attachments', 'Cells', 'Bulk')
+
+# Calls returning a new sheet whose creator token becomes its writer
+SHEET_CREATING_CALLS = {
+    ('Home', 'create_sheet'),
+    ('Folders', 'create_sheet_in_folder'),
+    ('Workspaces', 'create_sheet_in_workspace'),
+    ('Sheets', 'import_xlsx_sheet'),
+    ('Sheets', 'import_csv_sheet'),
+    ('Folders', 'import_xlsx_sheet'),
+    ('Folders', 'import_csv_sheet')
+}
+
+
+class _SurfaceRateLimits(AbstractUserCalcBackoff):
+    """SDK backoff that retries transient errors but returns 429s to the pool."""
+
+    def __init__(self, max_retry_time: float = 30):
+        self.max_retry_time = max_retry_time
+
+    def calc_backoff(self, previous_attempts, total_elapsed_time, error_result):
+        if getattr(error_result, 'code', None) == RATE_LIMIT_ERROR_CODE:
+            return -1
+        backoff = (2 ** previous_attempts) + random.random()
+        if total_elapsed_time + backoff > self.max_retry_time:
+            return -1
+        return backoff
+
+
+def mask_token(token: str) -> str:
+    """Return a printable form of a token showing only its last 4 characters."""
+    return f"...{token[-4:]}" if len(token) > 4 else '...'
+
+
+class PooledToken:
+    """One token of the pool with its client, request budget and counters."""
+
+    def __init__(self, token: str, requests_per_minute: float):
+        self.label = mask_token(token)
+        self.client = json_backend.install_sdk_serializer(
+            smartsheet.Smartsheet(token, max_retry_time=_SurfaceRateLimits()))
+        self.rate = requests_per_minute / 60.0
+        self.capacity = float(requests_per_minute)
+        self.budget = self.capacity
+        self.updated = time.monotonic()
+        self.cooldown_until = 0.0
+        self.stats = {'requests': 0, 'rate_limited': 0, 'errors': 0, 'operations': {}}
+
+    def refill(self, now: float):
+        """Add the budget accumulated since the last update."""
+        self.budget = min(self.capacity, self.budget + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available_at(self, now: float) -> float:
+        """Return the time at which this token can send its next request."""
+        ready = max(now, self.cooldown_until)
+        if self.budget < 1:
+            ready = max(ready, now + (1 - self.budget) / self.rate)
+        return ready
+
+
+class TokenPool:
+    """Schedule API calls across several tokens according to their budgets."""
+
+    def __init__(
+        self,
+        tokens: List[str],
+        requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+        shared_access: bool = True
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            tokens: API tokens; duplicates are ignored
+            requests_per_minute: Rate limit of each token
+            shared_access: All tokens can write every sheet the migration
+                creates (e.g. sheets are created in a folder shared with all
+                accounts). When False, sheet-scoped calls use only the token
+                that created the sheet.
+
+        Raises:
+            ValueError: If no token is given
+        """
+        unique = list(dict.fromkeys(token for token in tokens if token))
+        if not unique:
+            raise ValueError("TokenPool needs at least one API token")
+
+        self.tokens = [PooledToken(token, requests_per_minute) for token in unique]
+        self.shared_access = shared_access
+        self.sheet_writers = {}     # sheet ID -> list of PooledToken
+        self.lock = threading.Lock()
+
+    def _acquire(self, candidates: List[PooledToken]) -> PooledToken:
+        """Block until one of the candidates may send, and charge its budget."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                for token in candidates:
+                    token.refill(now)
+                # Prefer the token that is ready first, then the one with most budget left
+                best = min(candidates, key=lambda t: (t.available_at(now), -t.budget))
+                ready_at = best.available_at(now)
+                if ready_at <= now:
+                    best.budget -= 1
+                    return best
+            time.sleep(min(ready_at - now, 1.0))
+
+    def _candidates(self, api: str, args: tuple) -> List[PooledToken]:
+        if api in SHEET_SCOPED_APIS and args and isinstance(args[0], int):
+            writers = self.sheet_writers.get(args[0])
+            if writers:
+                return writers
+        return self.tokens
+
+    def call(self, api: str, method: str, args: tuple, kwargs: Dict[str, Any]) -> Any:
+        """
+        Run one SDK call through the best available token.
+
+        Args:
+            api: SDK API object name (e.g. 'Sheets')
+            method: Method name (e.g. 'add_rows')
+            args: Positional arguments
+            kwargs: Keyword arguments
+
+        Returns:
+            The SDK call result
+        """
+        candidates = self._candidates(api, args)
+        while True:
+            token = self._acquire(candidates)
+            operation = f"{api}.{method}"
+            with self.lock:
+                token.stats['requests'] += 1
+                token.stats['operations'][operation] = token.stats['operations'].get(operation, 0) + 1
+            try:
+                result = getattr(getattr(token.client, api), method)(*args, **kwargs)
+            except RateLimitExceededError:
+                with self.lock:
+                    token.stats['rate_limited'] += 1
+                    token.cooldown_until = time.monotonic() + RATE_LIMIT_COOLDOWN
+                    token.budget = 0
+                log.warning(f"[WARN] Token {token.label} rate limited on {operation}, "
+                            f"resting it for {RATE_LIMIT_COOLDOWN:.0f}s", extra={'repeat_key': 'token rate limited'})
+                continue
+            except Exception:
+                with self.lock:
+                    token.stats['errors'] += 1
+                raise
+
+            if (api, method) in SHEET_CREATING_CALLS:
+                sheet = getattr(result, 'result', None)
+                if getattr(sheet, 'id', None):
+                    self.sheet_writers[sheet.id] = list(self.tokens) if self.shared_access else [token]
+            return result
+
+    def set_errors_as_exceptions(self, preference: bool = True):
+        """Apply errors_as_exceptions to every client of the pool."""
+        for token in self.tokens:
+            token.client.errors_as_exceptions(preference)
+
+    def metrics(self) -> List[Dict[str, Any]]:
+        """Return per-token counters (requests, rate limits, operations)."""
+        return [dict(token.stats, token=token.label) for token in self.tokens]
+
+    def summary(self) -> str:
+        """Return a multi-line summary of how calls were spread across tokens."""
+        lines = [f"Token pool: {len(self.tokens)} tokens"]
+        for token in self.tokens:
+            operations = ', '.join(
+                f"{name} x{count}" for name, count in sorted(token.stats['operations'].items())
+            )
+            lines.append(f"   {token.label}: {token.stats['requests']} requests, "
+                         f"{token.stats['rate_limited']} rate limited"
+                         + (f" ({operations})" if operations else ''))
+        return '\n'.join(lines)
+
+
+class _PooledAPI:
+    """Stand-in for one SDK API object (e.g. client.Sheets) routed through a pool."""
+
+    def __init__(self, pool: TokenPool, name: str):
+        self._pool = pool
+        self._name = name
+
+    def __getattr__(self, method: str):
+        def call(*args, **kwargs):
+            return self._pool.call(self._name, method, args, kwargs)
+        call.__name__ = method
+        return call
+
+
+class PooledSmartsheetClient:
+    """Drop-in replacement for smartsheet.Smartsheet backed by a TokenPool."""
+
+    def __init__(self, pool: TokenPool):
+        self.pool = pool
+
+    def errors_as_exceptions(self, preference: bool = True):
+        """Set exception preference on all pooled clients."""
+        self.pool.set_errors_as_exceptions(preference)
+
+    def __getattr__(self, name: str) -> _PooledAPI:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return _PooledAPI(self.pool, name)
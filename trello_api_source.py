@@ -0,0 +1,221 @@
+"""
+Fetch a Trello board directly from the Trello REST API.
+
+Trello's JSON export caps ``actions`` at 1000 entries, so older comments are
+silently lost on busy boards. TrelloAPISource pulls the board, its lists,
+labels, members, custom fields and cards, plus the complete comment history
+(paginated with ``before=`` cursors), and assembles the same structure as a
+JSON export so the migrator can consume it unchanged.
+
+Independent endpoints are fetched concurrently through a shared rate limiter,
+and responses are cached on disk. History pages fetched with a ``before=``
+cursor never change and are cached permanently; other responses expire after
+``cache_max_age`` seconds. ``base_url`` can point at a local stand-in server
+for testing.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import requests
+
+import json_backend
+
+TRELLO_API_URL = 'https://api.trello.com/1'
+
+# Trello allows 100 requests per 10 seconds per token
+DEFAULT_REQUESTS_PER_SECOND = 10.0
+
+# Largest page the actions endpoint returns
+ACTIONS_PAGE_SIZE = 1000
+
+CARD_FIELDS = 'id,name,desc,idList,idMembers,idLabels,shortUrl,url,shortLink,due,dateLastActivity,closed'
+
+
+class RateLimiter:
+    """Thread-safe limiter spacing requests at a fixed average rate."""
+
+    def __init__(self, requests_per_second: float):
+        self.interval = 1.0 / requests_per_second
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """Block until the caller may send its next request."""
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class TrelloAPISource:
+    """Concurrent, rate-limited, caching reader of a Trello board."""
+
+    def __init__(
+        self,
+        api_key: str,
+        token: str,
+        base_url: str = TRELLO_API_URL,
+        cache_dir: Optional[str] = None,
+        cache_max_age: float = 3600,
+        max_workers: int = 4,
+        requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+        action_filter: str = 'commentCard',
+        card_scope: str = 'all'
+    ):
+        """
+        Initialize the source.
+
+        Args:
+            api_key: Trello API key
+            token: Trello API token
+            base_url: API root; point at a local server for testing
+            cache_dir: Optional directory for cached responses
+            cache_max_age: Seconds before non-history responses are refetched
+            max_workers: Number of concurrent requests
+            requests_per_second: Average request rate across all workers
+            action_filter: Trello action types to fetch (comma separated)
+            card_scope: 'all' to fetch archived cards too, 'open' to let the
+                API leave them out
+        """
+        self.auth = {'key': api_key, 'token': token}
+        self.base_url = base_url.rstrip('/')
+        self.cache_dir = cache_dir
+        self.cache_max_age = cache_max_age
+        self.max_workers = max_workers
+        self.action_filter = action_filter
+        self.card_scope = card_scope
+        self.limiter = RateLimiter(requests_per_second)
+        self.session = requests.Session()
+        self.stats = {'requests': 0, 'cache_hits': 0}
+        self.stats_lock = threading.Lock()
+
+    def _cache_file(self, path: str, params: Dict[str, Any]) -> str:
+        key = json.dumps([self.base_url, path, sorted(params.items())])
+        name = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}.json")
+
+    def get(self, path: str, params: Optional[Dict[str, Any]] = None, permanent: bool = False) -> Any:
+        """
+        GET a Trello API path, using the on-disk cache when possible.
+
+        Args:
+            path: API path such as '/boards/abc/lists'
+            params: Query parameters (auth is added automatically)
+            permanent: The response can never change (history pages), so a
+                cached copy is used regardless of its age
+
+        Returns:
+            Decoded JSON response
+
+        Raises:
+            requests.HTTPError: On a non-retryable HTTP error
+        """
+        params = dict(params or {})
+        cache_file = self._cache_file(path, params) if self.cache_dir else None
+
+        if cache_file and os.path.exists(cache_file):
+            age = time.time() - os.path.getmtime(cache_file)
+            if permanent or age < self.cache_max_age:
+                with self.stats_lock:
+                    self.stats['cache_hits'] += 1
+                return json_backend.load_file(cache_file)
+
+        for attempt in range(5):
+            self.limiter.wait()
+            response = self.session.get(f"{self.base_url}{path}", params={**params, **self.auth}, timeout=60)
+            with self.stats_lock:
+                self.stats['requests'] += 1
+            if response.status_code == 429 or response.status_code >= 500:
+                # Rate limited or transient server error: back off and retry
+                time.sleep(float(response.headers.get('Retry-After', 2 ** attempt)))
+                continue
+            response.raise_for_status()
+            data = json_backend.loads(response.content)
+            break
+        else:
+            response.raise_for_status()
+            data = json_backend.loads(response.content)
+
+        if cache_file:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_file = f"{cache_file}.{threading.get_ident()}.tmp"
+            with open(tmp_file, 'wb') as f:
+                f.write(json_backend.dumps(data))
+            os.replace(tmp_file, cache_file)
+
+        return data
+
+    def fetch_actions(self, board_id: str) -> List[Dict[str, Any]]:
+        """
+        Fetch the complete action history of a board, newest first.
+
+        Pages are chained with ``before=<oldest action ID of previous page>``
+        until a short page is returned.
+
+        Args:
+            board_id: Trello board ID or short link
+
+        Returns:
+            List of action objects
+        """
+        actions = []
+        before = None
+        while True:
+            params = {'filter': self.action_filter, 'limit': ACTIONS_PAGE_SIZE}
+            if before:
+                params['before'] = before
+            # Pages before a fixed action ID are immutable history
+            page = self.get(f"/boards/{board_id}/actions", params, permanent=before is not None)
+            actions.extend(page)
+            if len(page) < ACTIONS_PAGE_SIZE:
+                return actions
+            before = page[-1]['id']
+
+    def fetch_board(self, board_id: str) -> Dict[str, Any]:
+        """
+        Fetch a board in the same structure as a Trello JSON export.
+
+        Args:
+            board_id: Trello board ID or short link
+
+        Returns:
+            Board data with lists, labels, members, customFields, cards and actions
+        """
+        requests_to_make = {
+            'board': (f"/boards/{board_id}", {'fields': 'id,name,url,shortUrl'}),
+            'lists': (f"/boards/{board_id}/lists", {'filter': 'all', 'fields': 'id,name,closed,pos'}),
+            'labels': (f"/boards/{board_id}/labels", {'fields': 'id,name,color', 'limit': 1000}),
+            'members': (f"/boards/{board_id}/members", {'fields': 'id,fullName,username'}),
+            'customFields': (f"/boards/{board_id}/customFields", {}),
+            'cards': (f"/boards/{board_id}/cards/{self.card_scope}", {'fields': CARD_FIELDS, 'customFieldItems': 'true'})
+        }
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                name: executor.submit(self.get, path, params)
+                for name, (path, params) in requests_to_make.items()
+            }
+            # The action history is a sequential cursor chain; run it alongside
+            actions_future = executor.submit(self.fetch_actions, board_id)
+
+            results = {name: future.result() for name, future in futures.items()}
+            actions = actions_future.result()
+
+        board = results.pop('board')
+        data = {
+            'id': board.get('id'),
+            'name': board.get('name'),
+            'url': board.get('url') or board.get('shortUrl')
+        }
+        data.update(results)
+        data['actions'] = actions
+        return data
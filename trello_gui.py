@@ -5,9 +5,13 @@ Trello to Smartsheet Migration - GUI Application
 A graphical interface for migrating Trello boards to Smartsheet.
 """
 
+import logging
+import multiprocessing
 import os
-import sys
 import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
@@ -20,13 +24,38 @@ except ImportError:
 
 # Import the migrator class
 from trello_to_smartsheet_kanban import TrelloToSmartsheetMigrator
+from board_preview import build_board_index, estimate_migration, format_duration
+from card_filter import CardFilter
+from export_reader import list_export_entries
+from migration_log import configure_logging, flush_logging
+
+# How often queued log lines are added to the log area (milliseconds)
+LOG_POLL_INTERVAL = 100
+
+# How often a running preview parse is checked (milliseconds)
+PREVIEW_POLL_INTERVAL = 100
+
+# Cards added to the preview tree at a time when a list is expanded or scrolled
+PREVIEW_PAGE_SIZE = 200
+
+
+class GuiLogHandler(logging.Handler):
+    """Queues migration log messages for the GUI's log area."""
+
+    def __init__(self, gui):
+        super().__init__()
+        self.gui = gui
+        self.setFormatter(logging.Formatter('%(message)s'))
+
+    def emit(self, record):
+        self.gui.log(self.format(record))
 
 
 class TrelloMigrationGUI:
     def __init__(self, root):
         self.root = root
         self.root.title(f"Trello to Smartsheet Migration Tool v{__version__}")
-        self.root.geometry("900x700")
+        self.root.geometry("1100x750")
         self.root.resizable(True, True)
         self.root.minsize(800, 600)
 
@@ -61,6 +90,21 @@ class TrelloMigrationGUI:
         # Create UI
         self.create_widgets()
 
+        # Log lines from the migration thread, shown by poll_log
+        self.log_queue = deque()
+        self.root.after(LOG_POLL_INTERVAL, self.poll_log)
+
+        # Board preview: the index is built in a worker process so parsing a
+        # large export never blocks the event loop; cards are added to the
+        # tree a page at a time as lists are expanded and scrolled
+        self.preview_pool = None
+        self.preview_generation = 0
+        self.preview_index = None
+        self.preview_lists = {}      # tree item -> ListSummary
+        self.preview_loaded = {}     # tree item -> cards added to the tree
+        self.excluded_lists = set()
+        self.preview_page_pending = False
+
     def setup_styles(self):
         """Configure modern ttk styles"""
         style = ttk.Style()
@@ -200,6 +244,9 @@ class TrelloMigrationGUI:
         ttk.Button(
             file_frame, text="Browse", command=self.browse_json_file, style='Secondary.TButton'
         ).pack(side=tk.RIGHT)
+        ttk.Button(
+            file_frame, text="Preview", command=self.start_preview, style='Secondary.TButton'
+        ).pack(side=tk.RIGHT, padx=(0, 10))
 
         # API Token
         row += 1
@@ -278,9 +325,66 @@ class TrelloMigrationGUI:
             style='Secondary.TButton'
         ).pack(side=tk.LEFT)
 
+        # Preview and log side by side
+        bottom_pane = ttk.PanedWindow(content_frame, orient=tk.HORIZONTAL)
+        bottom_pane.pack(fill=tk.BOTH, expand=True)
+
+        # Board preview card
+        preview_card = ttk.Frame(bottom_pane, style='Card.TFrame', padding=20)
+        bottom_pane.add(preview_card, weight=1)
+
+        ttk.Label(preview_card, text="BOARD PREVIEW", style='FieldLabel.TLabel').pack(
+            anchor='w', pady=(0, 10)
+        )
+
+        tree_frame = tk.Frame(preview_card, bg=self.colors['surface'])
+        tree_frame.pack(fill=tk.BOTH, expand=True)
+
+        self.preview_tree = ttk.Treeview(
+            tree_frame,
+            columns=('include', 'cards', 'comments'),
+            height=10,
+            selectmode='extended'
+        )
+        self.preview_tree.heading('#0', text='List / card', anchor='w')
+        self.preview_tree.heading('include', text='Migrate')
+        self.preview_tree.heading('cards', text='Cards')
+        self.preview_tree.heading('comments', text='Comments')
+        self.preview_tree.column('#0', width=220, stretch=True)
+        self.preview_tree.column('include', width=60, anchor='center', stretch=False)
+        self.preview_tree.column('cards', width=60, anchor='e', stretch=False)
+        self.preview_tree.column('comments', width=75, anchor='e', stretch=False)
+        self.preview_tree.tag_configure('excluded', foreground=self.colors['text_secondary'])
+        self.preview_tree.tag_configure('more', foreground=self.colors['primary'])
+
+        preview_scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.preview_tree.yview)
+        self.preview_tree.configure(
+            yscrollcommand=lambda first, last: self.on_preview_scroll(preview_scrollbar, first, last)
+        )
+        self.preview_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        preview_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.preview_tree.bind('<<TreeviewOpen>>', self.on_preview_open)
+        self.preview_tree.bind('<Button-1>', self.on_preview_click)
+        self.preview_tree.bind('<Double-1>', self.on_preview_double_click)
+        self.preview_tree.bind('<space>', self.on_preview_space)
+
+        self.preview_status = tk.StringVar(value="Select a Trello export to preview it")
+        self.preview_label = tk.Label(
+            preview_card,
+            textvariable=self.preview_status,
+            font=("Segoe UI", 9),
+            foreground=self.colors['text_secondary'],
+            bg=self.colors['surface'],
+            anchor='w',
+            justify=tk.LEFT,
+            wraplength=380
+        )
+        self.preview_label.pack(fill=tk.X, pady=(10, 0))
+
         # Log area card
-        log_card = ttk.Frame(content_frame, style='Card.TFrame', padding=20)
-        log_card.pack(fill=tk.BOTH, expand=True)
+        log_card = ttk.Frame(bottom_pane, style='Card.TFrame', padding=20)
+        bottom_pane.add(log_card, weight=1)
 
         ttk.Label(log_card, text="MIGRATION LOG", style='FieldLabel.TLabel').pack(
             anchor='w', pady=(0, 10)
@@ -320,10 +424,15 @@ class TrelloMigrationGUI:
     def browse_json_file(self):
         filename = filedialog.askopenfilename(
             title="Select Trello JSON Export",
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+            filetypes=[
+                ("Trello exports", "*.json *.json.gz *.json.zst *.zip"),
+                ("JSON files", "*.json"),
+                ("All files", "*.*")
+            ]
         )
         if filename:
             self.json_file.set(filename)
+            self.start_preview()
 
     def browse_email_file(self):
         filename = filedialog.askopenfilename(
@@ -341,13 +450,215 @@ class TrelloMigrationGUI:
             self.token_entry.config(show='*')
             self.show_token_btn.config(text='👁')
 
+    def get_preview_pool(self):
+        """Return the worker process that builds board previews"""
+        if self.preview_pool is None:
+            # spawn: never fork a process that runs Tk and the log writer thread
+            self.preview_pool = ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context('spawn')
+            )
+        return self.preview_pool
+
+    def start_preview(self):
+        """Index the selected export in the worker process and show it when ready"""
+        path = self.json_file.get()
+        self.preview_generation += 1
+        self.clear_preview()
+
+        if not path or not os.path.exists(path):
+            self.preview_status.set("Select a Trello export to preview it")
+            return
+        try:
+            entries = list_export_entries(path)
+        except Exception as e:
+            self.preview_status.set(f"Cannot read export: {e}")
+            return
+        if len(entries) > 1:
+            self.preview_status.set(
+                f"Archive with {len(entries)} boards: every board is migrated, no preview available"
+            )
+            return
+
+        self.preview_status.set("Reading export...")
+        future = self.get_preview_pool().submit(build_board_index, path)
+        self.root.after(PREVIEW_POLL_INTERVAL, self.poll_preview, future, self.preview_generation)
+
+    def poll_preview(self, future, generation):
+        """Show the board index once the worker process has built it"""
+        if generation != self.preview_generation:
+            # Another export was selected meanwhile
+            future.cancel()
+            return
+        if not future.done():
+            self.root.after(PREVIEW_POLL_INTERVAL, self.poll_preview, future, generation)
+            return
+        try:
+            index = future.result()
+        except BrokenProcessPool:
+            self.preview_pool = None
+            self.preview_status.set("Cannot preview export: the preview process stopped")
+            return
+        except Exception as e:
+            self.preview_status.set(f"Cannot preview export: {e}")
+            return
+        self.show_preview(index)
+
+    def clear_preview(self):
+        """Remove the current preview"""
+        self.preview_index = None
+        self.preview_lists = {}
+        self.preview_loaded = {}
+        self.excluded_lists = set()
+        self.preview_tree.delete(*self.preview_tree.get_children())
+
+    def show_preview(self, index):
+        """Add the lists of a board index to the preview tree (cards come later)"""
+        self.preview_index = index
+        for trello_list in index.lists:
+            item = f"list:{trello_list.id}"
+            name = trello_list.name + (' (archived)' if trello_list.closed else '')
+            self.preview_tree.insert(
+                '', tk.END, iid=item, text=name,
+                values=('✓', f"{len(trello_list.cards):,}", f"{trello_list.comments:,}")
+            )
+            self.preview_lists[item] = trello_list
+            self.preview_loaded[item] = 0
+            if trello_list.cards:
+                # Placeholder making the list expandable; replaced page by page
+                self.preview_tree.insert(item, tk.END, iid=f"more:{item}", text="Loading...", tags=('more',))
+        self.update_preview_summary()
+
+    def load_preview_page(self, item):
+        """Add the next page of cards of a list above its placeholder"""
+        more = f"more:{item}"
+        if not self.preview_tree.exists(more):
+            return
+        trello_list = self.preview_lists[item]
+        start = self.preview_loaded[item]
+        page = trello_list.cards[start:start + PREVIEW_PAGE_SIZE]
+        included = trello_list in self.preview_index.included_lists(self.excluded_lists)
+        tags = () if included else ('excluded',)
+        position = self.preview_tree.index(more)
+        for _, name, comments in page:
+            self.preview_tree.insert(item, position, text=name, values=('', '', f"{comments:,}"), tags=tags)
+            position += 1
+        self.preview_loaded[item] = start + len(page)
+
+        remaining = len(trello_list.cards) - self.preview_loaded[item]
+        if remaining:
+            self.preview_tree.item(more, text=f"{remaining:,} more cards...")
+        else:
+            self.preview_tree.delete(more)
+
+    def load_visible_pages(self):
+        """Load the next page of every open list whose placeholder is in view"""
+        self.preview_page_pending = False
+        for item, loaded in self.preview_loaded.items():
+            more = f"more:{item}"
+            if loaded and self.preview_tree.exists(more) and self.preview_tree.bbox(more):
+                self.load_preview_page(item)
+
+    def on_preview_scroll(self, scrollbar, first, last):
+        """Update the scrollbar and load more cards when a placeholder scrolls into view"""
+        scrollbar.set(first, last)
+        if self.preview_loaded and not self.preview_page_pending:
+            self.preview_page_pending = True
+            self.root.after_idle(self.load_visible_pages)
+
+    def on_preview_open(self, event):
+        """Load the first page of cards when a list is expanded"""
+        item = self.preview_tree.focus()
+        if item in self.preview_loaded and self.preview_loaded[item] == 0:
+            self.load_preview_page(item)
+
+    def on_preview_click(self, event):
+        """Toggle a list when its Migrate cell is clicked"""
+        if self.preview_tree.identify_region(event.x, event.y) != 'cell':
+            return
+        if self.preview_tree.identify_column(event.x) != '#1':
+            return
+        item = self.preview_tree.identify_row(event.y)
+        if item in self.preview_lists:
+            self.toggle_lists([item])
+
+    def on_preview_double_click(self, event):
+        """Load the next page when a placeholder is double-clicked"""
+        item = self.preview_tree.identify_row(event.y)
+        if item.startswith('more:'):
+            self.load_preview_page(item[len('more:'):])
+            return 'break'
+
+    def on_preview_space(self, event):
+        """Toggle the selected lists"""
+        items = [item for item in self.preview_tree.selection() if item in self.preview_lists]
+        if items:
+            self.toggle_lists(items)
+        return 'break'
+
+    def toggle_lists(self, items):
+        """Include or exclude lists from the migration"""
+        for item in items:
+            trello_list = self.preview_lists[item]
+            if not trello_list.on_board:
+                # A list filter cannot name it: it follows the other lists
+                continue
+            if trello_list.id in self.excluded_lists:
+                self.excluded_lists.discard(trello_list.id)
+            else:
+                self.excluded_lists.add(trello_list.id)
+        included = {trello_list.id for trello_list in self.preview_index.included_lists(self.excluded_lists)}
+        for item, trello_list in self.preview_lists.items():
+            if not trello_list.on_board or item in items:
+                self.mark_preview_list(item, trello_list.id in included)
+        self.update_preview_summary()
+
+    def mark_preview_list(self, item, included):
+        """Show a list of the preview, and its loaded cards, as included or excluded"""
+        mark, tags = ('✓', ()) if included else ('', ('excluded',))
+        self.preview_tree.set(item, 'include', mark)
+        self.preview_tree.item(item, tags=tags)
+        for child in self.preview_tree.get_children(item):
+            if not child.startswith('more:'):
+                self.preview_tree.item(child, tags=tags)
+
+    def update_preview_summary(self):
+        """Show the selected cards with the estimated requests and duration"""
+        index = self.preview_index
+        selected = [trello_list.id for trello_list in index.included_lists(self.excluded_lists)]
+        cards, comments = index.selected(selected)
+        estimate = estimate_migration(cards, comments)
+        text = (
+            f"{index.name}: {len(selected)} of {len(index.lists)} lists, "
+            f"{cards:,} of {index.card_count:,} cards, {comments:,} comments.\n"
+            f"Estimated {estimate['requests']:,} API requests, "
+            f"about {format_duration(estimate['seconds'])}."
+        )
+        if index.archived_cards:
+            text += f" {index.archived_cards:,} archived cards are not migrated."
+        self.preview_status.set(text)
+
+    def preview_card_filter(self):
+        """Return a CardFilter for the lists kept in the preview, or None to migrate all"""
+        index = self.preview_index
+        if index is None or not self.excluded_lists or index.path != self.json_file.get():
+            return None
+        return CardFilter(lists=index.filter_list_ids(self.excluded_lists))
+
     def log(self, message):
-        """Add message to log area"""
-        self.log_text.config(state='normal')
-        self.log_text.insert(tk.END, message + '\n')
-        self.log_text.see(tk.END)
-        self.log_text.config(state='disabled')
-        self.root.update()
+        """Queue a message for the log area (safe from any thread)"""
+        self.log_queue.append(message)
+
+    def poll_log(self):
+        """Add queued messages to the log area in one update"""
+        if self.log_queue:
+            lines = []
+            while self.log_queue:
+                lines.append(self.log_queue.popleft())
+            self.log_text.config(state='normal')
+            self.log_text.insert(tk.END, '\n'.join(lines) + '\n')
+            self.log_text.see(tk.END)
+            self.log_text.config(state='disabled')
+        self.root.after(LOG_POLL_INTERVAL, self.poll_log)
 
     def clear_log(self):
         """Clear the log area"""
@@ -365,6 +676,12 @@ class TrelloMigrationGUI:
             messagebox.showerror("Error", "Trello JSON file not found")
             return False
 
+        index = self.preview_index
+        if (index is not None and index.path == self.json_file.get()
+                and index.lists and not index.included_lists(self.excluded_lists)):
+            messagebox.showerror("Error", "Select at least one list to migrate in the preview")
+            return False
+
         if not self.api_token.get():
             messagebox.showerror("Error", "Please enter your Smartsheet API token")
             return False
@@ -430,30 +747,15 @@ class TrelloMigrationGUI:
         self.progress.start()
         self.clear_log()
 
-        # Run migration in separate thread
-        thread = threading.Thread(target=self.run_migration, daemon=True)
+        # Run migration in separate thread, with the lists selected in the preview
+        thread = threading.Thread(target=self.run_migration, args=(self.preview_card_filter(),), daemon=True)
         thread.start()
 
-    def run_migration(self):
+    def run_migration(self, card_filter=None):
         """Run the actual migration"""
         try:
-            # Redirect stdout to log
-            import io
-            import sys
-
-            class LogCapture:
-                def __init__(self, gui):
-                    self.gui = gui
-
-                def write(self, text):
-                    if text.strip():
-                        self.gui.log(text.rstrip())
-
-                def flush(self):
-                    pass
-
-            old_stdout = sys.stdout
-            sys.stdout = LogCapture(self)
+            # Send the migration log to the log area
+            configure_logging(console=False, handlers=[GuiLogHandler(self)])
 
             # Get parameters
             json_file = self.json_file.get()
@@ -468,19 +770,24 @@ class TrelloMigrationGUI:
                 self.log(f"Using email mapping file: {email_mapping}")
             else:
                 self.log("No email mapping file - emails will be auto-generated")
+            if card_filter:
+                self.log(f"Migrating the {len(card_filter.lists)} lists selected in the preview")
 
             # Create migrator and run
-            migrator = TrelloToSmartsheetMigrator(api_token, folder_id, email_mapping)
-            sheet_id = migrator.migrate_board(json_file)
+            migrator = TrelloToSmartsheetMigrator(api_token, folder_id, email_mapping, card_filter=card_filter)
+            if len(list_export_entries(json_file)) > 1:
+                # Zip archive of several exports: one sheet per board
+                sheet_ids = migrator.migrate_archive(json_file)
+                sheet_id = ', '.join(str(value) for value in sheet_ids.values())
+            else:
+                sheet_id = migrator.migrate_board(json_file)
+            flush_logging()
 
             self.log("=" * 60)
             self.log("MIGRATION COMPLETED SUCCESSFULLY!")
             self.log(f"Sheet ID: {sheet_id}")
             self.log("=" * 60)
 
-            # Restore stdout
-            sys.stdout = old_stdout
-
             # Show success message
             self.root.after(0, lambda: messagebox.showinfo(
                 "Success",
@@ -488,8 +795,7 @@ class TrelloMigrationGUI:
             ))
 
         except Exception as e:
-            # Restore stdout
-            sys.stdout = old_stdout
+            flush_logging()
 
             error_msg = str(e)
             self.log(f"\n[ERROR] Migration failed: {error_msg}")
@@ -507,9 +813,13 @@ class TrelloMigrationGUI:
 
 
 def main():
+    # The preview worker process starts from the frozen executable too
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = TrelloMigrationGUI(root)
     root.mainloop()
+    if app.preview_pool is not None:
+        app.preview_pool.shutdown(wait=False, cancel_futures=True)
 
 
 if __name__ == '__main__':
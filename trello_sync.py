@@ -0,0 +1,989 @@
+#!/usr/bin/env python3
+"""
+Live sync of Trello board activity to migrated sheets.
+
+After a board is migrated, people may keep working in Trello for a while.
+The sync service receives the board's webhook events and applies them to
+the sheet, so it stays current until the switch:
+
+- updateCard: name, description, list and due date changes update the row
+- createCard: a row is added for the new card
+- commentCard: the comment is posted as a discussion on the card's row
+
+Other actions are acknowledged and ignored.
+
+Cards are found through a card -> row mapping kept in a local SQLite
+database, filled once per board by the link command from the export and the
+migrated sheets. Events are stored there as they arrive and marked applied
+once sent, so events received before a crash are applied on restart, and
+events Trello delivers twice are applied once.
+
+Changes are not sent one by one. They are buffered for a short window
+(--window, 5 seconds by default) and coalesced: five edits to one card in
+that window become one row in one update_rows call, with the latest value of
+each cell. Each flush then sends the new rows, the row updates (in adaptive
+batches, one request per sheet for typical volumes) and the discussions,
+all through a TokenPool so the requests stay under the rate limit.
+
+Commands:
+    link    Record the rows of migrated sheets for a board export
+    serve   Receive webhook events and apply them
+    replay  Post the actions of an export (or a JSON list of actions) to a
+            running receiver, oldest first, to test a sync without Trello
+
+HTTP API of the receiver:
+    HEAD /webhook       Answers Trello's check when the webhook is created
+    POST /webhook       Webhook event (JSON with "action" and "model")
+    GET  /metrics       Event, coalescing and request counters
+
+Usage:
+    python trello_sync.py link <export.json> <sheet_id> [<sheet_id> ...]
+                          [api_token] [--data-dir=DIR]
+    python trello_sync.py serve [api_token] [--port=8090] [--host=127.0.0.1]
+                          [--data-dir=DIR] [--window=5] [--tokens=TOKEN2,...]
+                          [--rpm=300] [--email-mapping=FILE]
+                          [--secret=TRELLO_SECRET --callback-url=URL]
+    python trello_sync.py replay <export.json|actions.json> [--url=URL]
+                          [--speed=0] [--secret=TRELLO_SECRET --callback-url=URL]
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from smartsheet.models import Row
+
+from adaptive_batcher import resend, row_payload_size
+from card_links import short_link_from_url
+from export_reader import load_export
+import json_backend
+from migration_log import ensure_logging, flush_logging, get_logger
+from row_validator import MAX_CELL_LENGTH
+from sheet_import import READ_BACK_PAGE_SIZE
+from token_pool import DEFAULT_REQUESTS_PER_MINUTE, TokenPool
+from trello_to_smartsheet_kanban import TrelloToSmartsheetMigrator, parse_cli_args
+
+log = get_logger('sync')
+
+# How long changes are buffered before they are sent (seconds)
+DEFAULT_WINDOW = 5.0
+
+# Largest accepted webhook body (bytes)
+MAX_EVENT_SIZE = 1024 * 1024
+
+# Applied events older than this are removed from the database (seconds)
+EVENT_RETENTION = 7 * 24 * 3600
+
+# Longest pause between two replayed actions (seconds), whatever their dates
+REPLAY_MAX_GAP = 10.0
+
+DEFAULT_RECEIVER_URL = 'http://127.0.0.1:8090/webhook'
+
+# Objects of the synced actions that must be present with an ID
+REQUIRED_OBJECTS = {
+    'updateCard': ('card',),
+    'createCard': ('card', 'board'),
+    'commentCard': ('card',)
+}
+
+# Card fields of updateCard actions and the columns they update
+SYNCED_FIELDS = {
+    'name': 'Card Name',
+    'desc': 'Description',
+    'idList': 'List',
+    'due': 'Due Date'
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sheets (
+    sheet_id INTEGER PRIMARY KEY,
+    board_id TEXT NOT NULL,
+    columns TEXT NOT NULL,
+    linked_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sheets_board ON sheets (board_id, linked_at);
+CREATE TABLE IF NOT EXISTS cards (
+    card_id TEXT PRIMARY KEY,
+    short_link TEXT,
+    sheet_id INTEGER NOT NULL,
+    row_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cards_short_link ON cards (short_link);
+CREATE TABLE IF NOT EXISTS events (
+    action_id TEXT PRIMARY KEY,
+    type TEXT,
+    payload TEXT NOT NULL,
+    received_at REAL NOT NULL,
+    applied_at REAL
+);
+CREATE INDEX IF NOT EXISTS events_pending ON events (applied_at, received_at);
+"""
+
+
+def trello_signature(secret: str, body: bytes, callback_url: str) -> str:
+    """
+    Compute the X-Trello-Webhook signature of a webhook request.
+
+    Args:
+        secret: Trello application secret
+        body: Raw request body
+        callback_url: URL the webhook was registered with
+
+    Returns:
+        Base64 HMAC-SHA1 of the body followed by the callback URL
+    """
+    digest = hmac.new(secret.encode('utf-8'), body + callback_url.encode('utf-8'), hashlib.sha1).digest()
+    return base64.b64encode(digest).decode('ascii')
+
+
+def check_action(action: Dict[str, Any]):
+    """
+    Check that a synced action holds the objects it is applied with.
+
+    Args:
+        action: Trello action
+
+    Raises:
+        ValueError: If the action has no ID, or a synced action misses its
+            card (or board) or their ID
+    """
+    if not isinstance(action, dict) or not action.get('id'):
+        raise ValueError("Event has no action")
+    required = REQUIRED_OBJECTS.get(action.get('type'))
+    if not required:
+        return
+    data = action.get('data')
+    if not isinstance(data, dict):
+        raise ValueError(f"{action['type']} action {action['id']} has no data")
+    for name in required:
+        value = data.get(name)
+        if not isinstance(value, dict) or not value.get('id'):
+            raise ValueError(f"{action['type']} action {action['id']} has no {name} ID")
+    for name in ('old', 'list', 'listAfter'):
+        if data.get(name) is not None and not isinstance(data[name], dict):
+            raise ValueError(f"{action['type']} action {action['id']} has an invalid '{name}'")
+
+
+def text_value(value: Optional[str]) -> str:
+    """Return a text cell value, cut to the cell length limit ('' clears the cell)."""
+    return (value or '')[:MAX_CELL_LENGTH]
+
+
+class SyncStore:
+    """SQLite-backed card -> row mapping and event log, safe to use from several threads."""
+
+    def __init__(self, db_path: str):
+        """
+        Open (or create) the sync database.
+
+        Args:
+            db_path: Path of the SQLite file
+        """
+        self.db_path = db_path
+        self.lock = threading.RLock()
+        self.db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.executescript(SCHEMA)
+
+    def link_sheet(self, board_id: str, sheet_id: int, columns: Dict[str, int], cards: Iterable[Tuple[str, str, int]]) -> int:
+        """
+        Record a migrated sheet and the rows of its cards.
+
+        Args:
+            board_id: Trello board ID
+            sheet_id: Sheet the board (or one of its shards) was migrated to
+            columns: Column title -> column ID mapping of the sheet
+            cards: (card ID, short link, row ID) triples
+
+        Returns:
+            Number of cards recorded
+        """
+        rows = [(card_id, short_link, sheet_id, row_id) for card_id, short_link, row_id in cards]
+        with self.lock:
+            self.db.execute('BEGIN IMMEDIATE')
+            try:
+                self.db.execute(
+                    'INSERT OR REPLACE INTO sheets (sheet_id, board_id, columns, linked_at) VALUES (?, ?, ?, ?)',
+                    (sheet_id, board_id, json.dumps(columns), time.time())
+                )
+                self.db.executemany(
+                    'INSERT OR REPLACE INTO cards (card_id, short_link, sheet_id, row_id) VALUES (?, ?, ?, ?)', rows)
+                self.db.execute('COMMIT')
+            except BaseException:
+                self.db.execute('ROLLBACK')
+                raise
+        return len(rows)
+
+    def add_card(self, card_id: str, short_link: Optional[str], sheet_id: int, row_id: int):
+        """Record the row of a card created after the migration."""
+        with self.lock:
+            self.db.execute(
+                'INSERT OR REPLACE INTO cards (card_id, short_link, sheet_id, row_id) VALUES (?, ?, ?, ?)',
+                (card_id, short_link, sheet_id, row_id)
+            )
+
+    def find_row(self, card: Dict[str, Any]) -> Optional[Tuple[int, int]]:
+        """
+        Return the row of a card.
+
+        Args:
+            card: Card object of an action (id and shortLink)
+
+        Returns:
+            Tuple of (sheet ID, row ID), or None if the card has no row
+        """
+        with self.lock:
+            row = self.db.execute('SELECT sheet_id, row_id FROM cards WHERE card_id = ?', (card.get('id'),)).fetchone()
+            if row is None and card.get('shortLink'):
+                row = self.db.execute('SELECT sheet_id, row_id FROM cards WHERE short_link = ?',
+                                      (card['shortLink'],)).fetchone()
+        return (row['sheet_id'], row['row_id']) if row else None
+
+    def board_sheet(self, board_id: str) -> Optional[int]:
+        """Return the sheet new cards of a board are added to (the first one linked)."""
+        with self.lock:
+            row = self.db.execute('SELECT sheet_id FROM sheets WHERE board_id = ? ORDER BY linked_at LIMIT 1',
+                                  (board_id,)).fetchone()
+        return row['sheet_id'] if row else None
+
+    def columns(self, sheet_id: int) -> Dict[str, int]:
+        """Return the column title -> column ID mapping of a linked sheet."""
+        with self.lock:
+            row = self.db.execute('SELECT columns FROM sheets WHERE sheet_id = ?', (sheet_id,)).fetchone()
+        return json.loads(row['columns']) if row else {}
+
+    def record_event(self, action: Dict[str, Any]) -> bool:
+        """
+        Store a received action.
+
+        Returns:
+            True if the action is new, False if it was received before
+        """
+        with self.lock:
+            cursor = self.db.execute(
+                'INSERT OR IGNORE INTO events (action_id, type, payload, received_at) VALUES (?, ?, ?, ?)',
+                (action['id'], action.get('type'), json.dumps(action), time.time())
+            )
+            return cursor.rowcount > 0
+
+    def mark_applied(self, action_ids: List[str]):
+        """Mark actions as applied to the sheets."""
+        if not action_ids:
+            return
+        now = time.time()
+        with self.lock:
+            self.db.executemany('UPDATE events SET applied_at = ? WHERE action_id = ?',
+                                [(now, action_id) for action_id in action_ids])
+
+    def pending_events(self) -> List[Dict[str, Any]]:
+        """Return the actions received but not applied, oldest first."""
+        with self.lock:
+            rows = self.db.execute(
+                'SELECT payload FROM events WHERE applied_at IS NULL ORDER BY received_at').fetchall()
+        return [json.loads(row['payload']) for row in rows]
+
+    def prune(self, older_than: float = EVENT_RETENTION) -> int:
+        """
+        Remove applied events received more than older_than seconds ago.
+
+        Returns:
+            Number of events removed
+        """
+        with self.lock:
+            cursor = self.db.execute('DELETE FROM events WHERE applied_at IS NOT NULL AND received_at < ?',
+                                     (time.time() - older_than,))
+            return cursor.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        """Return the number of linked sheets, cards and pending events."""
+        with self.lock:
+            return {
+                'sheets': self.db.execute('SELECT COUNT(*) FROM sheets').fetchone()[0],
+                'cards': self.db.execute('SELECT COUNT(*) FROM cards').fetchone()[0],
+                'pending_events': self.db.execute(
+                    'SELECT COUNT(*) FROM events WHERE applied_at IS NULL').fetchone()[0]
+            }
+
+
+class PendingChanges:
+    """Changes buffered during one coalescing window."""
+
+    def __init__(self):
+        self.rows = {}          # (sheet ID, row ID) -> [{column title: value}, action IDs]
+        self.new_cards = {}     # card ID -> [sheet ID, short link, {column title: value}, action IDs]
+        self.comments = []      # (card object, text, action ID)
+        self.retry = []         # actions on cards whose row was being created
+        self.started_at = None
+
+    def __bool__(self) -> bool:
+        return bool(self.rows or self.new_cards or self.comments or self.retry)
+
+
+def link_board(migrator: TrelloToSmartsheetMigrator, store: SyncStore, export_path: str, sheet_ids: List[int]) -> int:
+    """
+    Record the card -> row mapping of a migrated board.
+
+    Rows are matched to cards through the URL column, as after a file import.
+
+    Args:
+        migrator: Migrator whose client reads the sheets
+        store: Sync database
+        export_path: Export the sheets were migrated from
+        sheet_ids: Sheets of the board (several for a sharded board)
+
+    Returns:
+        Number of cards linked
+    """
+    data = load_export(export_path)
+    board_id = data.get('id')
+    if not board_id:
+        raise ValueError(f"{export_path} has no board ID")
+    cards_by_link = {}
+    for card in data.get('cards', []):
+        short_link = card.get('shortLink') or short_link_from_url(card.get('shortUrl') or card.get('url'))
+        if short_link:
+            cards_by_link[short_link] = card['id']
+
+    linked = 0
+    for sheet_id in sheet_ids:
+        sheet = migrator.smartsheet_client.Sheets.get_sheet(sheet_id, page_size=1)
+        columns = {col.title: col.id for col in sheet.columns}
+        if 'URL' not in columns:
+            raise ValueError(f"Sheet {sheet_id} has no URL column; was it migrated from a Trello export?")
+
+        cards = []
+        page = 1
+        while True:
+            page_sheet = migrator.smartsheet_client.Sheets.get_sheet(
+                sheet_id, column_ids=[columns['URL']], page_size=READ_BACK_PAGE_SIZE, page=page)
+            if not page_sheet.rows:
+                break
+            for row in page_sheet.rows:
+                short_link = short_link_from_url(row.cells[0].value if row.cells else None)
+                card_id = cards_by_link.get(short_link)
+                if card_id is not None:
+                    cards.append((card_id, short_link, row.id))
+            if page * READ_BACK_PAGE_SIZE >= (page_sheet.total_row_count or 0):
+                break
+            page += 1
+
+        count = store.link_sheet(board_id, sheet_id, columns, cards)
+        linked += count
+        log.info(f"[OK] Linked {count} cards of board {data.get('name', board_id)} to sheet {sheet_id}")
+    return linked
+
+
+class SyncService:
+    """Webhook receiver applying Trello actions to migrated sheets in coalesced batches."""
+
+    def __init__(
+        self,
+        api_tokens: List[str],
+        data_dir: str,
+        window: float = DEFAULT_WINDOW,
+        requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+        email_mapping_file: Optional[str] = None,
+        secret: Optional[str] = None,
+        callback_url: Optional[str] = None
+    ):
+        """
+        Initialize the service.
+
+        Args:
+            api_tokens: Smartsheet API tokens; all must have access to the linked sheets
+            data_dir: Directory of the sync database
+            window: How long changes are buffered before they are sent (seconds)
+            requests_per_minute: Rate limit of each token
+            email_mapping_file: Optional member name to email mapping for comment authors
+            secret: Trello application secret; when set, events must carry a
+                valid X-Trello-Webhook signature
+            callback_url: URL the webhook was registered with (needed with secret)
+        """
+        if secret and not callback_url:
+            raise ValueError("Verifying webhook signatures needs the callback URL")
+        os.makedirs(data_dir, exist_ok=True)
+        self.store = SyncStore(os.path.join(data_dir, 'sync.sqlite'))
+        self.token_pool = TokenPool(api_tokens, requests_per_minute)
+        # The migrator supplies the pooled client, batching and comment formatting
+        self.migrator = TrelloToSmartsheetMigrator(None, email_mapping_file=email_mapping_file,
+                                                   token_pool=self.token_pool)
+        self.window = window
+        self.secret = secret
+        self.callback_url = callback_url
+
+        ensure_logging()
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.pending = PendingChanges()
+        self.creating = set()   # card IDs whose row is being added
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.started_at = time.time()
+        self.stats = {
+            'events': 0, 'duplicates': 0, 'ignored': 0, 'unmapped': 0,
+            'edits': 0, 'coalesced': 0, 'flushes': 0,
+            'rows_added': 0, 'rows_updated': 0, 'update_requests': 0,
+            'comments': 0, 'failed': 0
+        }
+
+    def verify(self, body: bytes, signature: Optional[str]) -> bool:
+        """Check the X-Trello-Webhook signature of an event (always True without a secret)."""
+        if not self.secret:
+            return True
+        expected = trello_signature(self.secret, body, self.callback_url)
+        return signature is not None and hmac.compare_digest(expected, signature)
+
+    def receive(self, payload: Dict[str, Any]) -> str:
+        """
+        Store a webhook event and buffer its changes.
+
+        Args:
+            payload: Decoded webhook body
+
+        Returns:
+            'queued', 'duplicate' or 'ignored'
+
+        Raises:
+            ValueError: If the payload holds no action, or an action that
+                cannot be applied (see check_action); it is not stored
+        """
+        action = payload.get('action') if isinstance(payload, dict) else None
+        check_action(action)
+        if not self.store.record_event(action):
+            self._count('duplicates')
+            return 'duplicate'
+        self._count('events')
+        if not self.apply(action):
+            self.store.mark_applied([action['id']])
+            return 'ignored'
+        return 'queued'
+
+    def apply(self, action: Dict[str, Any]) -> bool:
+        """
+        Buffer the changes of one action.
+
+        Args:
+            action: Trello action
+
+        Returns:
+            True if changes were buffered, False if the action changes nothing
+            that is synced (or its card has no row)
+        """
+        action_type = action.get('type')
+        data = action.get('data') or {}
+        card = data.get('card') or {}
+        action_id = action['id']
+
+        if action_type == 'updateCard':
+            values = {}
+            for field in (data.get('old') or {}):
+                column = SYNCED_FIELDS.get(field)
+                if column == 'List':
+                    values[column] = text_value((data.get('listAfter') or {}).get('name'))
+                elif column == 'Due Date':
+                    values[column] = self.migrator.parse_trello_date(card.get('due')) or ''
+                elif column:
+                    values[column] = text_value(card.get(field))
+            if not values:
+                self._count('ignored')
+                return False
+            return self._buffer_values(action, card, values)
+
+        if action_type == 'createCard':
+            board_id = (data.get('board') or {}).get('id')
+            sheet_id = self.store.board_sheet(board_id)
+            if sheet_id is None:
+                self._count('unmapped')
+                log.warning(f"[WARN] Board {board_id} is not linked to a sheet, card "
+                            f"'{card.get('name', '')}' not added", extra={'repeat_key': 'unlinked board'})
+                return False
+            short_link = card.get('shortLink')
+            values = {
+                'Card Name': text_value(card.get('name')) or 'Untitled',
+                'List': text_value((data.get('list') or {}).get('name'))
+            }
+            if short_link:
+                values['URL'] = f"https://trello.com/c/{short_link}"
+            with self.lock:
+                self._touch()
+                self.pending.new_cards[card['id']] = [sheet_id, short_link, values, [action_id]]
+            return True
+
+        if action_type == 'commentCard':
+            member = action.get('memberCreator') or {}
+            member_lookup = self.migrator.build_member_lookup({'members': [member]}) if member.get('id') else {}
+            text = self.migrator.format_comment({
+                'text': data.get('text', ''),
+                'author_name': member.get('fullName', member.get('username', 'Unknown')),
+                'member_id': member.get('id'),
+                'date': action.get('date', '')
+            }, member_lookup)
+            with self.lock:
+                if card.get('id') not in self.pending.new_cards and card.get('id') not in self.creating \
+                        and self.store.find_row(card) is None:
+                    self.stats['unmapped'] += 1
+                    return False
+                self._touch()
+                self.pending.comments.append((card, text, action_id))
+            return True
+
+        self._count('ignored')
+        return False
+
+    def _count(self, key: str, amount: int = 1):
+        # Handler threads and the flush thread update the counters concurrently
+        with self.lock:
+            self.stats[key] += amount
+
+    def _touch(self):
+        if self.pending.started_at is None:
+            self.pending.started_at = time.monotonic()
+
+    def _buffer_values(self, action: Dict[str, Any], card: Dict[str, Any], values: Dict[str, str]) -> bool:
+        with self.lock:
+            new_card = self.pending.new_cards.get(card.get('id'))
+            if new_card is not None:
+                # Not sent yet: the row is created with the latest values
+                new_card[2].update(values)
+                new_card[3].append(action['id'])
+                self.stats['edits'] += len(values)
+                self.stats['coalesced'] += 1
+                return True
+            if card.get('id') in self.creating:
+                self.pending.retry.append(action)
+                self._touch()
+                return True
+            location = self.store.find_row(card)
+            if location is None:
+                self.stats['unmapped'] += 1
+                log.warning(f"[WARN] Card '{card.get('name', card.get('id'))}' has no row, change ignored",
+                            extra={'repeat_key': 'unmapped card'})
+                return False
+            self._touch()
+            self.stats['edits'] += len(values)
+            entry = self.pending.rows.get(location)
+            if entry is None:
+                self.pending.rows[location] = [dict(values), [action['id']]]
+            else:
+                entry[0].update(values)
+                entry[1].append(action['id'])
+                self.stats['coalesced'] += 1
+        return True
+
+    def flush(self) -> int:
+        """
+        Send the buffered changes: new rows, row updates, then discussions.
+
+        Actions are marked applied once their changes were sent. Row
+        updates of a failed request are buffered again for the next flush,
+        under any newer values of the same rows; other failed actions stay
+        pending and are applied again on the next start.
+
+        Returns:
+            Number of API requests sent
+        """
+        with self.flush_lock:
+            with self.lock:
+                changes, self.pending = self.pending, PendingChanges()
+                self.creating = set(changes.new_cards)
+            if not changes:
+                return 0
+            self._count('flushes')
+            requests_sent = 0
+            try:
+                requests_sent += self._add_rows(changes)
+            finally:
+                with self.lock:
+                    self.creating = set()
+            requests_sent += self._update_rows(changes)
+            requests_sent += self._post_comments(changes)
+            for action in changes.retry:
+                self.apply(action)
+        return requests_sent
+
+    def _row(self, row_id: Optional[int], columns: Dict[str, int], values: Dict[str, str]) -> Row:
+        row = Row()
+        if row_id is not None:
+            row.id = row_id
+        else:
+            row.to_bottom = True
+        for title, value in values.items():
+            if title in columns:
+                row.cells.append({'column_id': columns[title], 'value': value})
+        return row
+
+    def _add_rows(self, changes: PendingChanges) -> int:
+        by_sheet = {}
+        for card_id, (sheet_id, short_link, values, action_ids) in changes.new_cards.items():
+            by_sheet.setdefault(sheet_id, []).append((card_id, short_link, values, action_ids))
+
+        requests_sent = 0
+        for sheet_id, cards in by_sheet.items():
+            columns = self.store.columns(sheet_id)
+            items = [(card, self._row(None, columns, card[2])) for card in cards]
+            batcher = self.migrator.create_batcher('rows')
+            try:
+                for batch, row_ids in batcher.run(
+                        items,
+                        lambda batch: self.migrator.smartsheet_client.Bulk.add_rows(
+                            sheet_id, [row for _, row in batch]),
+                        lambda batch: self.migrator.find_added_rows(
+                            sheet_id, columns['URL'], [row for _, row in batch])):
+                    requests_sent += 1
+                    for ((card_id, short_link, _, action_ids), _), row_id in zip(batch, row_ids):
+                        self.store.add_card(card_id, short_link, sheet_id, row_id)
+                        self.store.mark_applied(action_ids)
+                        self._count('rows_added')
+            except Exception as e:
+                self._count('failed')
+                log.warning(f"[WARN] Failed to add new cards to sheet {sheet_id}: {e}")
+        return requests_sent
+
+    def _update_rows(self, changes: PendingChanges) -> int:
+        by_sheet = {}
+        for (sheet_id, row_id), (values, action_ids) in changes.rows.items():
+            by_sheet.setdefault(sheet_id, []).append((row_id, values, action_ids))
+
+        requests_sent = 0
+        for sheet_id, updates in by_sheet.items():
+            columns = self.store.columns(sheet_id)
+            items = [(update, self._row(update[0], columns, update[1])) for update in updates]
+            batcher = self.migrator.create_batcher('updates', size_of=lambda item: row_payload_size(item[1]))
+            sent = 0
+            try:
+                for batch, _ in batcher.run(
+                        items,
+                        lambda batch: self.migrator.smartsheet_client.Bulk.update_rows(
+                            sheet_id, [row for _, row in batch]),
+                        resend):
+                    requests_sent += 1
+                    sent += len(batch)
+                    self._count('update_requests')
+                    self._count('rows_updated', len(batch))
+                    self.store.mark_applied([action_id for (_, _, action_ids), _ in batch for action_id in action_ids])
+            except Exception as e:
+                self._count('failed')
+                log.warning(f"[WARN] Failed to update {len(updates) - sent} rows of sheet {sheet_id}, "
+                            f"retrying in the next flush: {e}", extra={'repeat_key': 'update failed'})
+                self._requeue_updates(sheet_id, updates[sent:])
+        return requests_sent
+
+    def _requeue_updates(self, sheet_id: int, updates: List[Tuple[int, Dict[str, str], List[str]]]):
+        # Changes buffered since the flush started are newer and win; the
+        # failed actions are marked applied together with them, so a restart
+        # never replays an old value over a newer one
+        with self.lock:
+            self._touch()
+            for row_id, values, action_ids in updates:
+                entry = self.pending.rows.get((sheet_id, row_id))
+                if entry is None:
+                    self.pending.rows[(sheet_id, row_id)] = [values, action_ids]
+                else:
+                    entry[0] = dict(values, **entry[0])
+                    entry[1] = action_ids + entry[1]
+
+    def _post_comments(self, changes: PendingChanges) -> int:
+        requests_sent = 0
+        for card, text, action_id in changes.comments:
+            location = self.store.find_row(card)
+            if location is None:
+                # Its row could not be added
+                continue
+            requests_sent += 1
+            if self.migrator.post_discussion(location[0], location[1], text):
+                self._count('comments')
+                self.store.mark_applied([action_id])
+            else:
+                self._count('failed')
+        return requests_sent
+
+    def flush_loop(self):
+        """Flush the buffered changes once their window has passed, until the service stops."""
+        while not self.stop_event.is_set():
+            started_at = self.pending.started_at
+            if started_at is None:
+                self.stop_event.wait(min(self.window, 0.5))
+                continue
+            remaining = started_at + self.window - time.monotonic()
+            if remaining > 0:
+                self.stop_event.wait(remaining)
+                continue
+            with self.lock:
+                before = dict(self.stats)
+            try:
+                sent = self.flush()
+                if sent:
+                    with self.lock:
+                        delta = {key: self.stats[key] - before[key] for key in before}
+                    log.info(f"[OK] Sent {delta['rows_updated']} row updates, {delta['rows_added']} new rows "
+                             f"and {delta['comments']} comments in {sent} requests")
+            except Exception as e:
+                log.warning(f"[WARN] Sync flush failed: {e}")
+
+    def start(self):
+        """Apply the events left pending by the last run and start the flush thread."""
+        pruned = self.store.prune()
+        if pruned:
+            log.info(f"[*] Removed {pruned} old applied events")
+        pending = self.store.pending_events()
+        for action in pending:
+            try:
+                if not self.apply(action):
+                    self.store.mark_applied([action['id']])
+            except Exception as e:
+                # It would fail again on every start: drop it
+                self._count('failed')
+                self.store.mark_applied([action['id']])
+                log.warning(f"[WARN] Dropped pending event {action.get('id')} ({action.get('type')}): {e}")
+        if pending:
+            log.info(f"[*] Applying {len(pending)} events received before the last stop")
+        self.thread = threading.Thread(target=self.flush_loop, name='sync-flush', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the flush thread and send what is still buffered."""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.flush()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return event, coalescing, request and rate limit metrics."""
+        with self.lock:
+            buffered = {
+                'rows': len(self.pending.rows),
+                'new_cards': len(self.pending.new_cards),
+                'comments': len(self.pending.comments)
+            }
+            stats = dict(self.stats)
+        return {
+            'uptime': round(time.time() - self.started_at, 1),
+            'window': self.window,
+            **self.store.counts(),
+            'buffered': buffered,
+            'stats': stats,
+            'tokens': self.token_pool.metrics()
+        }
+
+    def make_handler(self):
+        """Build the request handler class bound to this service."""
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def send_json(self, status: int, payload: Any):
+                body = json.dumps(payload, indent=2).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_HEAD(self):
+                # Trello checks the callback URL answers before creating the webhook
+                self.send_response(200 if urlparse(self.path).path.rstrip('/') == '/webhook' else 404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def do_GET(self):
+                if urlparse(self.path).path.rstrip('/') == '/metrics':
+                    self.send_json(200, service.metrics())
+                else:
+                    self.send_json(404, {'error': 'not found'})
+
+            def do_POST(self):
+                if urlparse(self.path).path.rstrip('/') != '/webhook':
+                    self.send_json(404, {'error': 'not found'})
+                    return
+                length = int(self.headers.get('Content-Length') or 0)
+                if not length or length > MAX_EVENT_SIZE:
+                    self.send_json(400, {'error': 'missing or oversized event'})
+                    return
+                body = self.rfile.read(length)
+                if not service.verify(body, self.headers.get('X-Trello-Webhook')):
+                    self.send_json(401, {'error': 'invalid signature'})
+                    return
+                try:
+                    status = service.receive(json_backend.loads(body))
+                except ValueError as e:
+                    self.send_json(400, {'error': str(e)})
+                    return
+                except Exception as e:
+                    log.warning(f"[WARN] Failed to handle event: {e}", extra={'repeat_key': 'event failed'})
+                    self.send_json(500, {'error': str(e)})
+                    return
+                self.send_json(200, {'status': status})
+
+        return Handler
+
+    def serve(self, host: str = '127.0.0.1', port: int = 8090) -> ThreadingHTTPServer:
+        """
+        Start the flush thread and the HTTP server in background threads.
+
+        Args:
+            host: Interface to listen on
+            port: TCP port (0 picks a free one)
+
+        Returns:
+            The running HTTP server (call shutdown() to stop it)
+        """
+        self.start()
+        httpd = ThreadingHTTPServer((host, port), self.make_handler())
+        threading.Thread(target=httpd.serve_forever, name='http', daemon=True).start()
+        return httpd
+
+
+def replay_actions(
+    actions: List[Dict[str, Any]],
+    url: str = DEFAULT_RECEIVER_URL,
+    speed: float = 0,
+    secret: Optional[str] = None,
+    callback_url: Optional[str] = None
+) -> Dict[str, int]:
+    """
+    Post actions to a receiver as Trello would, oldest first.
+
+    Args:
+        actions: Trello actions (e.g. the actions of an export)
+        url: Webhook URL of the receiver
+        speed: 0 posts as fast as possible; otherwise actions are spaced by
+            the time between their dates divided by speed (at most
+            REPLAY_MAX_GAP seconds)
+        secret: Trello application secret to sign the events with
+        callback_url: URL the signature is computed for (defaults to url)
+
+    Returns:
+        Number of events per receiver status ('queued', 'duplicate', ...)
+    """
+    actions = sorted((action for action in actions if action.get('id')), key=lambda action: action.get('date') or '')
+    session = requests.Session()
+    counts = {}
+    previous = None
+    for action in actions:
+        date = action.get('date')
+        if speed and date and previous:
+            try:
+                gap = (datetime.fromisoformat(date.replace('Z', '+00:00'))
+                       - datetime.fromisoformat(previous.replace('Z', '+00:00'))).total_seconds()
+                time.sleep(min(max(gap, 0) / speed, REPLAY_MAX_GAP))
+            except ValueError:
+                pass
+        previous = date or previous
+
+        board = (action.get('data') or {}).get('board') or {}
+        body = json.dumps({'action': action, 'model': {'id': board.get('id')}}).encode('utf-8')
+        headers = {'Content-Type': 'application/json'}
+        if secret:
+            headers['X-Trello-Webhook'] = trello_signature(secret, body, callback_url or url)
+        response = session.post(url, data=body, headers=headers, timeout=30)
+        status = response.json().get('status', 'error') if response.ok else f"http {response.status_code}"
+        counts[status] = counts.get(status, 0) + 1
+    return counts
+
+
+def main():
+    """Command line entry point."""
+    args, options = parse_cli_args(sys.argv[1:])
+    command = args.pop(0) if args else None
+    if command not in ('link', 'serve', 'replay'):
+        print("Error: expected a command (link, serve or replay)")
+        print(__doc__.split('Usage:')[1])
+        sys.exit(1)
+
+    if command == 'replay':
+        if not args:
+            print("Error: replay needs an export or a JSON file of actions")
+            sys.exit(1)
+        data = load_export(args[0])
+        actions = data.get('actions', []) if isinstance(data, dict) else data
+        log.info(f"[*] Replaying {len(actions)} actions to {options.get('url', DEFAULT_RECEIVER_URL)}")
+        counts = replay_actions(
+            actions,
+            options.get('url', DEFAULT_RECEIVER_URL),
+            speed=float(options.get('speed', 0)),
+            secret=options.get('secret') or None,
+            callback_url=options.get('callback-url') or None
+        )
+        log.info(f"[OK] Replayed: " + ', '.join(f"{count} {status}" for status, count in sorted(counts.items())))
+        return
+
+    data_dir = options.get('data-dir') or 'trello_sync_data'
+    if command == 'link':
+        if len(args) < 2:
+            print("Error: link needs an export and at least one sheet ID")
+            sys.exit(1)
+        export_path = args.pop(0)
+        sheet_ids = []
+        while args and args[0].isdigit():
+            sheet_ids.append(int(args.pop(0)))
+        api_token = args[0] if args else os.getenv('SMARTSHEET_ACCESS_TOKEN')
+        if not api_token or not sheet_ids:
+            print("Error: link needs sheet IDs and SMARTSHEET_ACCESS_TOKEN")
+            sys.exit(1)
+        os.makedirs(data_dir, exist_ok=True)
+        store = SyncStore(os.path.join(data_dir, 'sync.sqlite'))
+        migrator = TrelloToSmartsheetMigrator(api_token)
+        try:
+            linked = link_board(migrator, store, export_path, sheet_ids)
+        except ValueError as e:
+            flush_logging()
+            print(f"Error: {e}")
+            sys.exit(1)
+        log.info(f"[OK] {linked} cards linked in {store.db_path}")
+        return
+
+    api_token = args[0] if args else os.getenv('SMARTSHEET_ACCESS_TOKEN')
+    if not api_token:
+        print("Error: SMARTSHEET_ACCESS_TOKEN not provided")
+        sys.exit(1)
+    tokens = [api_token] + [token for token in str(options.get('tokens', '')).split(',') if token]
+    try:
+        service = SyncService(
+            tokens,
+            data_dir,
+            window=float(options.get('window', DEFAULT_WINDOW)),
+            requests_per_minute=float(options.get('rpm', DEFAULT_REQUESTS_PER_MINUTE)),
+            email_mapping_file=options.get('email-mapping') or None,
+            secret=options.get('secret') or None,
+            callback_url=options.get('callback-url') or None
+        )
+    except ValueError as e:
+        flush_logging()
+        print(f"Error: {e}")
+        sys.exit(1)
+    host = options.get('host', '127.0.0.1')
+    port = int(options.get('port', 8090))
+    httpd = service.serve(host, port)
+    counts = service.store.counts()
+    log.info(f"[OK] Sync receiver listening on http://{host}:{httpd.server_port}/webhook "
+             f"for {counts['cards']} cards in {counts['sheets']} sheets ({service.window:g}s window)")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        log.info("\n[*] Sending buffered changes...")
+        httpd.shutdown()
+        service.stop()
+        stats = service.stats
+        log.info(f"[OK] {stats['events']} events: {stats['rows_updated']} row updates in "
+                 f"{stats['update_requests']} requests, {stats['rows_added']} rows added, "
+                 f"{stats['comments']} comments")
+
+
+if __name__ == '__main__':
+    main()
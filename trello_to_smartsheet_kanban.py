@@ -12,15 +12,15 @@ Requirements:
     - Smartsheet API token (set in environment variable SMARTSHEET_ACCESS_TOKEN)
 
 Usage:
-    python trello_to_smartsheet_kanban.py <trello_export.json>
+    python trello_to_smartsheet_kanban.py <trello_export.json> [options]
 """
 
-import json
 import os
 import sys
+import tempfile
 import time
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 
 import smartsheet
 from smartsheet.models import Sheet, Column, Row, Cell, Discussion, Comment
@@ -31,6 +31,27 @@ try:
 except ImportError:
     __version__ = "1.0.0"
 
+from adaptive_batcher import AdaptiveBatcher, resend, row_payload_size
+from bulk_rows import WireStats, install_bulk_api, row_cell_value
+from card_filter import CardFilter
+from card_links import CardLinkIndex, short_link_from_url
+from contact_directory import DEFAULT_CONTACTS_TTL, ContactDirectory
+from export_reader import list_export_entries, load_export
+import json_backend
+from migration_log import LOG_LEVELS, configure_logging, ensure_logging, flush_logging, get_logger
+from http_cassette import Cassette, install_cassette
+from memory_profile import MemoryProfiler, profile_phase
+from parallel_rows import PARALLEL_BUILD_AVAILABLE, RowBuildPool
+from pipeline import Pipeline
+from row_validator import MAX_CELL_LENGTH, RowValidator, ValidationReport, truncate_long_cells
+from sheet_import import READ_BACK_PAGE_SIZE, row_to_import_values, write_import_file
+from sheet_verify import SheetVerifier, VerificationReport, cell_text
+from token_pool import PooledSmartsheetClient, TokenPool
+from trello_api_source import TRELLO_API_URL, TrelloAPISource
+from trello_parse_cache import file_digest, load_cached_board, save_cached_board
+
+log = get_logger()
+
 try:
     import openpyxl
     OPENPYXL_AVAILABLE = True
@@ -38,10 +59,183 @@ except ImportError:
     OPENPYXL_AVAILABLE = False
 
 
+# Smartsheet sheet size limits
+MAX_SHEET_ROWS = 20000
+MAX_SHEET_CELLS = 500000
+MAX_SHEET_COLUMNS = 400
+MAX_SHEET_NAME_LENGTH = 50
+
+# Supported strategies for splitting a board across several sheets
+SHARD_STRATEGIES = ('list', 'date', 'rows', 'none')
+
+# Source argument prefix selecting the Trello API instead of a JSON file
+TRELLO_SOURCE_PREFIX = 'trello:'
+
+# Files picked up from a directory in workspace mode
+WORKSPACE_EXPORT_EXTENSIONS = ('.json', '.json.gz', '.json.zst', '.zip')
+
+# How card rows are sent: batched add_rows calls, or one sheet file import
+UPLOAD_MODES = ('rows', 'import')
+
+# Trello custom field type -> Smartsheet column type
+CUSTOM_FIELD_COLUMN_TYPES = {
+    'number': 'TEXT_NUMBER',
+    'text': 'TEXT_NUMBER',
+    'date': 'DATE',
+    'checkbox': 'CHECKBOX',
+    'list': 'PICKLIST'
+}
+
+
+class CompactCard:
+    """
+    Memory-efficient record holding only the card fields the migration uses.
+
+    A Trello export card is a dict with dozens of keys (badges, cover, limits,
+    descData, ...) that are never migrated. CompactCard keeps the migrated
+    fields in __slots__ and interns the repeated list/label/member IDs, so
+    cards sharing a list or label share one string object.
+
+    It supports the read-only dict API used throughout the migrator
+    (``card['id']``, ``card.get('idList')``) under the original Trello key
+    names, so it can be used wherever a raw card dict was expected.
+    """
+
+    # Trello key -> attribute name
+    FIELDS = {
+        'id': 'id',
+        'name': 'name',
+        'desc': 'desc',
+        'idList': 'id_list',
+        'idMembers': 'id_members',
+        'idLabels': 'id_labels',
+        'shortUrl': 'short_url',
+        'url': 'url',
+        'shortLink': 'short_link',
+        'due': 'due',
+        'dateLastActivity': 'date_last_activity',
+        'closed': 'closed',
+        'customFieldItems': 'custom_field_items'
+    }
+
+    __slots__ = tuple(FIELDS.values())
+
+    def __init__(
+        self,
+        id=None,
+        name=None,
+        desc=None,
+        id_list=None,
+        id_members=(),
+        id_labels=(),
+        short_url=None,
+        url=None,
+        short_link=None,
+        due=None,
+        date_last_activity=None,
+        closed=False,
+        custom_field_items=None
+    ):
+        # Positional order matches __slots__, so CompactCard(*values) works
+        self.id = id
+        self.name = name
+        self.desc = desc
+        self.id_list = id_list
+        self.id_members = id_members
+        self.id_labels = id_labels
+        self.short_url = short_url
+        self.url = url
+        self.short_link = short_link
+        self.due = due
+        self.date_last_activity = date_last_activity
+        self.closed = closed
+        self.custom_field_items = custom_field_items
+
+    @classmethod
+    def from_trello(cls, card: Dict[str, Any]) -> 'CompactCard':
+        """
+        Build a compact record from a raw Trello card dict.
+
+        Args:
+            card: Trello card object from the JSON export
+
+        Returns:
+            CompactCard holding only the migrated fields
+        """
+        intern = sys.intern
+        id_list = card.get('idList')
+        return cls(
+            id=intern(card['id']),
+            name=card.get('name'),
+            desc=card.get('desc') or None,
+            id_list=intern(id_list) if id_list else id_list,
+            id_members=tuple(intern(mid) for mid in card.get('idMembers') or ()),
+            id_labels=tuple(intern(lid) for lid in card.get('idLabels') or ()),
+            short_url=card.get('shortUrl'),
+            url=card.get('url'),
+            short_link=card.get('shortLink'),
+            due=card.get('due'),
+            date_last_activity=card.get('dateLastActivity'),
+            closed=bool(card.get('closed', False)),
+            custom_field_items=tuple(card.get('customFieldItems') or ()) or None
+        )
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the value for a Trello card key, or default if unset."""
+        attr = self.FIELDS.get(key)
+        if attr is None:
+            return default
+        value = getattr(self, attr)
+        return default if value is None else value
+
+    def __getitem__(self, key: str) -> Any:
+        attr = self.FIELDS.get(key)
+        if attr is None:
+            raise KeyError(key)
+        return getattr(self, attr)
+
+    def __contains__(self, key: str) -> bool:
+        attr = self.FIELDS.get(key)
+        return attr is not None and getattr(self, attr) is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the card as a Trello-keyed dict (unset fields omitted)."""
+        result = {}
+        for key, attr in self.FIELDS.items():
+            value = getattr(self, attr)
+            if value is not None:
+                result[key] = list(value) if isinstance(value, tuple) else value
+        return result
+
+    def __repr__(self) -> str:
+        return f"CompactCard(id={self.id!r}, name={self.name!r})"
+
+
 class TrelloToSmartsheetMigrator:
     """Main class for migrating Trello boards to Smartsheet"""
 
-    def __init__(self, api_token: str, folder_id: Optional[int] = None, email_mapping_file: Optional[str] = None):
+    def __init__(
+        self,
+        api_token: str,
+        folder_id: Optional[int] = None,
+        email_mapping_file: Optional[str] = None,
+        shard_strategy: str = 'list',
+        create_summary_sheet: bool = False,
+        cache_dir: Optional[str] = None,
+        max_batch_rows: int = 500,
+        upload_mode: str = 'rows',
+        import_format: str = 'xlsx',
+        validate_rows: bool = True,
+        pipeline: bool = False,
+        extra_tokens: Optional[List[str]] = None,
+        card_filter: Optional[CardFilter] = None,
+        contact_directory: Optional[ContactDirectory] = None,
+        token_pool: Optional[TokenPool] = None,
+        compress_requests: bool = False,
+        memory_profile: Optional[str] = None,
+        cassette: Optional[Cassette] = None,
+        build_workers: int = 0
+    ):
         """
         Initialize the migrator with Smartsheet API credentials.
 
@@ -49,44 +243,279 @@ class TrelloToSmartsheetMigrator:
             api_token: Smartsheet API access token
             folder_id: Optional folder ID to create sheet in
             email_mapping_file: Optional Excel file with member name to email mapping
+            shard_strategy: How to split boards that exceed Smartsheet sheet limits
+                ('list', 'date', 'rows', or 'none' to fail instead)
+            create_summary_sheet: Create an index sheet linking all shards when
+                a board is split across several sheets
+            cache_dir: Optional directory for the binary parse cache; when set,
+                parsed exports are cached and reused on later runs
+            max_batch_rows: Upper bound for adaptive row batch sizes
+            upload_mode: 'rows' to create the sheet and insert rows in batches,
+                or 'import' to upload all rows at once as a file import
+            import_format: File format for the import mode ('xlsx' or 'csv')
+            validate_rows: Check all rows offline before creating the sheet,
+                repairing what can be repaired
+            pipeline: Overlap row and discussion uploads instead of running
+                them one phase after the other (row upload mode only)
+            extra_tokens: Additional API tokens (e.g. other service accounts);
+                requests are spread across all tokens by remaining rate limit
+                budget. Sheets created in a folder are assumed writable by
+                every token; sheets created in Home only by their creator.
+            card_filter: Optional CardFilter selecting the cards to migrate;
+                excluded cards are dropped while the board is loaded
+            contact_directory: Optional ContactDirectory to check member
+                emails against before any row is sent; pass the same instance
+                to several migrators to share the user list
+            token_pool: Optional existing TokenPool to send requests through
+                (api_token and extra_tokens are then ignored); migrators
+                sharing a pool share its rate limit
+            compress_requests: gzip large row upload bodies; the API traffic
+                before and after compression is recorded in wire_stats
+            memory_profile: Optional report file; when set, migrate_board
+                records memory use per phase with tracemalloc and writes it
+                there (archive boards get one file each)
+            cassette: Optional Cassette recording every API request and
+                response, or answering them from a previous recording
+                instead of the network
+            build_workers: Validate, build and serialize the rows in this many
+                worker processes (0 or 1 builds them in this process); only
+                used where processes can be forked
         """
-        self.smartsheet_client = smartsheet.Smartsheet(api_token)
+        ensure_logging()
+        if upload_mode not in UPLOAD_MODES:
+            raise ValueError(
+                f"Unknown upload mode '{upload_mode}' (expected one of: {', '.join(UPLOAD_MODES)})"
+            )
+        if shard_strategy not in SHARD_STRATEGIES:
+            raise ValueError(
+                f"Unknown shard strategy '{shard_strategy}' "
+                f"(expected one of: {', '.join(SHARD_STRATEGIES)})"
+            )
+
+        self.token_pool = token_pool
+        if token_pool is None and extra_tokens:
+            self.token_pool = TokenPool([api_token] + list(extra_tokens), shared_access=folder_id is not None)
+            log.info(f"[*] Using a pool of {len(self.token_pool.tokens)} API tokens")
+        if self.token_pool is not None:
+            self.smartsheet_client = PooledSmartsheetClient(self.token_pool)
+            sdk_clients = [token.client for token in self.token_pool.tokens]
+        else:
+            self.smartsheet_client = json_backend.install_sdk_serializer(smartsheet.Smartsheet(api_token))
+            sdk_clients = [self.smartsheet_client]
+        # Row uploads go through client.Bulk, which returns only the row IDs
+        self.wire_stats = WireStats()
+        for client in sdk_clients:
+            self.wire_stats = install_bulk_api(client, compress_requests, self.wire_stats).stats
+            if cassette is not None:
+                install_cassette(client, cassette)
+        self.cassette = cassette
         self.smartsheet_client.errors_as_exceptions(True)
         self.folder_id = folder_id
+        self.shard_strategy = shard_strategy
+        self.create_summary_sheet = create_summary_sheet
+        self.cache_dir = cache_dir
+        self.max_batch_rows = max_batch_rows
+        self.upload_mode = upload_mode
+        self.import_format = import_format
+        self.validate_rows = validate_rows
+        self.pipeline = pipeline
+        self.card_filter = card_filter
+        self.include_archived = bool(card_filter and card_filter.include_archived)
+        self.contact_directory = contact_directory
+        # Card ID -> [(column title, text)] cut from cells over the length limit
+        self.cell_overflow = {}
+        self.memory_profile = memory_profile
+        self.memory_profiler = None
+        # Migrated cards for rewriting links between them (see migrate_workspace)
+        self.link_index = None
+        self.build_workers = build_workers
+        # RowBuildPool of the board being migrated (see start_row_pool)
+        self.row_pool = None
+        if build_workers > 1 and not PARALLEL_BUILD_AVAILABLE:
+            log.warning("[WARN] Parallel row building needs fork(), building rows in this process")
+            self.build_workers = 0
 
         # Load email mapping if provided, otherwise use empty dict (auto-generate emails)
         if email_mapping_file:
             self.email_mapping = self.load_email_mapping(email_mapping_file)
         else:
             self.email_mapping = {}
-            print("[*] No email mapping file provided - emails will be auto-generated from names")
+            log.info("[*] No email mapping file provided - emails will be auto-generated from names")
 
-    def load_trello_data(self, file_path: str) -> Dict[str, Any]:
+    def load_trello_data(self, file_path: str, entry: Optional[str] = None) -> Dict[str, Any]:
         """
         Load and parse Trello JSON export file.
 
+        Cards are converted to CompactCard records as soon as the file is
+        parsed, so the raw card dicts are released before the migration starts.
+        When a cache directory is configured, the normalized board is loaded
+        from the parse cache if this exact file was parsed before, and written
+        to it otherwise.
+
+        The export may be plain JSON, gzip or zstd compressed, or a zip
+        archive (see export_reader); compressed exports are decompressed in
+        memory without a temporary file.
+
         Args:
             file_path: Path to Trello JSON export file
+            entry: Board entry to read from a multi-board zip archive
 
         Returns:
-            Parsed Trello board data
+            Parsed Trello board data, with 'cards' as a list of CompactCard
 
         Raises:
             FileNotFoundError: If file doesn't exist
-            json.JSONDecodeError: If file is not valid JSON
+            ValueError: If file is not valid JSON, or entry is needed to pick
+                a board from a zip archive
         """
-        print(f"[*] Loading Trello data from: {file_path}")
+        log.info(f"[*] Loading Trello data from: {file_path}" + (f" ({entry})" if entry else ''))
+
+        digest = None
+        if self.cache_dir:
+            digest = file_digest(file_path, entry=entry)
+            data = load_cached_board(self.cache_dir, digest)
+            if data is not None:
+                log.info(f"[OK] Loaded board from parse cache: {data.get('name', 'Unknown')}")
+                log.info(f"   Lists: {len(data.get('lists', []))}")
+                log.info(f"   Cards: {len(data.get('cards', []))}")
+                log.info(f"   Cards with comments: {len(data['commentsByCard'])}")
+                return self.apply_card_filter(data)
+
+        data = load_export(file_path, entry)
+
+        if not digest:
+            # Nothing to cache: drop excluded cards before they are compacted
+            self.apply_card_filter(data)
+        data['cards'] = self.compact_cards(data.get('cards', []))
+
+        log.info(f"[OK] Loaded board: {data.get('name', 'Unknown')}")
+        log.info(f"   Lists: {len(data.get('lists', []))}")
+        log.info(f"   Cards: {len(data.get('cards', []))}")
+        log.info(f"   Actions: {len(data.get('actions', []))}")
+
+        if digest:
+            comments_by_card = self.extract_comments_for_cards(data)
+            try:
+                path = save_cached_board(self.cache_dir, digest, data, comments_by_card)
+                log.info(f"[OK] Saved parse cache: {path}")
+            except OSError as e:
+                log.warning(f"[WARN] Failed to write parse cache: {e}")
+            data['commentsByCard'] = comments_by_card
+            # The cache holds the whole board so any filter can reuse it
+            self.apply_card_filter(data)
+
+        return data
 
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+    def load_trello_api(self, board_id: str) -> Dict[str, Any]:
+        """
+        Fetch a board directly from the Trello REST API.
 
-        print(f"[OK] Loaded board: {data.get('name', 'Unknown')}")
-        print(f"   Lists: {len(data.get('lists', []))}")
-        print(f"   Cards: {len(data.get('cards', []))}")
-        print(f"   Actions: {len(data.get('actions', []))}")
+        Unlike the JSON export, which truncates actions at 1000, this pulls the
+        full comment history. Credentials come from the TRELLO_API_KEY and
+        TRELLO_TOKEN environment variables; TRELLO_API_URL overrides the API
+        root (e.g. a local test server).
+
+        Args:
+            board_id: Trello board ID or short link
+
+        Returns:
+            Board data in the JSON export structure, with CompactCard cards
+
+        Raises:
+            ValueError: If Trello credentials are not set
+        """
+        api_key = os.getenv('TRELLO_API_KEY')
+        token = os.getenv('TRELLO_TOKEN')
+        if not api_key or not token:
+            raise ValueError("TRELLO_API_KEY and TRELLO_TOKEN must be set to read boards from the Trello API")
+
+        log.info(f"[*] Fetching Trello board from API: {board_id}")
+        source = TrelloAPISource(
+            api_key,
+            token,
+            base_url=os.getenv('TRELLO_API_URL', TRELLO_API_URL),
+            cache_dir=os.path.join(self.cache_dir, 'trello_api') if self.cache_dir else None,
+            card_scope='all' if self.include_archived else 'open'
+        )
+        data = source.fetch_board(board_id)
+        self.apply_card_filter(data)
+        data['cards'] = self.compact_cards(data.get('cards', []))
+
+        log.info(f"[OK] Loaded board: {data.get('name', 'Unknown')}")
+        log.info(f"   Lists: {len(data.get('lists', []))}")
+        log.info(f"   Cards: {len(data.get('cards', []))}")
+        log.info(f"   Actions: {len(data.get('actions', []))}")
+        log.info(f"   API requests: {source.stats['requests']} ({source.stats['cache_hits']} cached)")
 
         return data
 
+    def load_trello_source(self, source: str, entry: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Load a board from a JSON export path or from the Trello API.
+
+        Args:
+            source: Path to a JSON export, or 'trello:<board id>' for the API
+            entry: Board entry to read from a multi-board zip archive
+
+        Returns:
+            Parsed Trello board data
+        """
+        if source.startswith(TRELLO_SOURCE_PREFIX):
+            return self.load_trello_api(source[len(TRELLO_SOURCE_PREFIX):])
+        return self.load_trello_data(source, entry)
+
+    def apply_card_filter(self, trello_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Drop the cards excluded by the card filter, with their comments.
+
+        Args:
+            trello_data: Parsed Trello board data (raw or compacted cards)
+
+        Returns:
+            The same board data, filtered in place
+        """
+        if self.card_filter is None:
+            return trello_data
+
+        card_filter = self.card_filter.bind(trello_data)
+        all_cards = trello_data.get('cards', [])
+        cards = [card for card in all_cards if card_filter.matches(card)]
+        selected = {card['id'] for card in cards}
+        trello_data['cards'] = cards
+
+        if 'actions' in trello_data:
+            trello_data['actions'] = [
+                action for action in trello_data['actions']
+                if action.get('data', {}).get('card', {}).get('id') in selected
+            ]
+        if 'commentsByCard' in trello_data:
+            trello_data['commentsByCard'] = {
+                card_id: comments for card_id, comments in trello_data['commentsByCard'].items()
+                if card_id in selected
+            }
+
+        log.info(f"[*] Card filter ({card_filter.describe()}): {len(cards)} of {len(all_cards)} cards selected")
+        return trello_data
+
+    def is_migrated_card(self, card: Any) -> bool:
+        """Check whether a card becomes a row (archived cards only on request)."""
+        return self.include_archived or not card.get('closed', False)
+
+    def compact_cards(self, cards: List[Dict[str, Any]]) -> List[CompactCard]:
+        """
+        Convert raw Trello card dicts to CompactCard records.
+
+        Args:
+            cards: Card objects from the Trello export
+
+        Returns:
+            List of CompactCard in the same order
+        """
+        compact = []
+        for card in cards:
+            compact.append(card if isinstance(card, CompactCard) else CompactCard.from_trello(card))
+        return compact
+
     def load_email_mapping(self, file_path: str) -> Dict[str, str]:
         """
         Load email mapping from Excel file.
@@ -98,11 +527,11 @@ class TrelloToSmartsheetMigrator:
             Dictionary mapping member names to email addresses
         """
         if not OPENPYXL_AVAILABLE:
-            print("[WARN] openpyxl not available, cannot load email mapping")
+            log.warning("[WARN] openpyxl not available, cannot load email mapping")
             return {}
 
         if not os.path.exists(file_path):
-            print(f"[WARN] Email mapping file not found: {file_path}")
+            log.warning(f"[WARN] Email mapping file not found: {file_path}")
             return {}
 
         try:
@@ -119,17 +548,24 @@ class TrelloToSmartsheetMigrator:
                     # Also store lowercase version for flexible matching
                     email_map[name.lower()] = email
 
-            print(f"[OK] Loaded {len(email_map) // 2} email mappings from {file_path}")
+            log.info(f"[OK] Loaded {len(email_map) // 2} email mappings from {file_path}")
             return email_map
 
         except Exception as e:
-            print(f"[WARN] Failed to load email mapping: {e}")
+            log.warning(f"[WARN] Failed to load email mapping: {e}")
             return {}
 
-    def create_smartsheet_columns(self) -> List[Column]:
+    def create_smartsheet_columns(
+        self,
+        custom_fields: Optional[List[Dict[str, Any]]] = None
+    ) -> List[Column]:
         """
         Create the column structure for Smartsheet.
 
+        Args:
+            custom_fields: Optional custom field definitions from
+                extract_custom_fields, appended as extra columns
+
         Returns:
             List of Column objects matching the spec
         """
@@ -171,8 +607,144 @@ class TrelloToSmartsheetMigrator:
             })
         ]
 
+        # Custom fields (Power-Up) get one column each
+        for field in custom_fields or []:
+            spec = {
+                'title': field['column_title'],
+                'type': field['column_type']
+            }
+            if field['column_type'] == 'PICKLIST':
+                spec['options'] = list(field['options'].values())
+            columns.append(Column(spec))
+
         return columns
 
+    def extract_custom_fields(self, trello_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Extract custom field (Power-Up) definitions and map them to Smartsheet columns.
+
+        Trello field types map to Smartsheet column types as follows:
+        number/text -> TEXT_NUMBER, date -> DATE, checkbox -> CHECKBOX,
+        list -> PICKLIST (with the field's options).
+
+        Args:
+            trello_data: Parsed Trello board data
+
+        Returns:
+            List of field definitions with id, name, trello_type, column_title,
+            column_type and options (option ID -> option text)
+        """
+        base_titles = {col.title for col in self.create_smartsheet_columns()}
+        used_titles = set(base_titles)
+        fields = []
+
+        for field in trello_data.get('customFields', []):
+            trello_type = field.get('type', 'text')
+            column_type = CUSTOM_FIELD_COLUMN_TYPES.get(trello_type, 'TEXT_NUMBER')
+
+            name = (field.get('name') or '').strip() or 'Custom Field'
+            column_title = name
+            # Avoid clashing with the built-in columns or another custom field
+            if column_title in used_titles:
+                column_title = f"{name} (Custom)"
+            suffix = 2
+            while column_title in used_titles:
+                column_title = f"{name} (Custom {suffix})"
+                suffix += 1
+            used_titles.add(column_title)
+
+            options = {}
+            for option in field.get('options', []) or []:
+                option_text = option.get('value', {}).get('text', '')
+                if option.get('id') and option_text:
+                    options[option['id']] = option_text
+
+            fields.append({
+                'id': field['id'],
+                'name': name,
+                'trello_type': trello_type,
+                'column_title': column_title,
+                'column_type': column_type,
+                'options': options
+            })
+
+        if fields:
+            log.info(f"[OK] Found {len(fields)} custom fields: {', '.join(f['name'] for f in fields)}")
+
+        return fields
+
+    def build_custom_field_item_index(
+        self,
+        trello_data: Dict[str, Any]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Build a card ID -> custom field items index in a single pass.
+
+        Items can appear nested in each card (``card['customFieldItems']``) or
+        at the board level keyed by ``idModel``; both are collected so row
+        construction never has to scan the item list per card.
+
+        Args:
+            trello_data: Parsed Trello board data
+
+        Returns:
+            Dictionary mapping card IDs to their custom field items
+        """
+        index = {}
+        seen = set()
+
+        def add_item(card_id, item):
+            key = (card_id, item.get('idCustomField'))
+            if not card_id or key in seen:
+                return
+            seen.add(key)
+            index.setdefault(card_id, []).append(item)
+
+        for card in trello_data.get('cards', []):
+            for item in card.get('customFieldItems', []) or []:
+                add_item(card['id'], item)
+
+        for item in trello_data.get('customFieldItems', []) or []:
+            add_item(item.get('idModel'), item)
+
+        return index
+
+    def convert_custom_field_value(
+        self,
+        field: Dict[str, Any],
+        item: Dict[str, Any]
+    ) -> Optional[Any]:
+        """
+        Convert a Trello custom field item to a Smartsheet cell value.
+
+        Args:
+            field: Custom field definition from extract_custom_fields
+            item: Trello custom field item for a card
+
+        Returns:
+            Cell value, or None if the item is empty or malformed
+        """
+        trello_type = field['trello_type']
+        value = item.get('value') or {}
+
+        if trello_type == 'list':
+            return field['options'].get(item.get('idValue'))
+        if trello_type == 'checkbox':
+            return str(value.get('checked', '')).lower() == 'true'
+        if trello_type == 'date':
+            return self.parse_trello_date(value.get('date'))
+        if trello_type == 'number':
+            raw = value.get('number')
+            if raw in (None, ''):
+                return None
+            try:
+                number = float(raw)
+            except (TypeError, ValueError):
+                return raw
+            return int(number) if number.is_integer() else number
+
+        return value.get('text') or None
+
     def extract_list_names(self, trello_data: Dict[str, Any]) -> List[str]:
         """
         Extract unique list names from Trello data for dropdown options.
@@ -212,29 +784,40 @@ class TrelloToSmartsheetMigrator:
         # Return sorted list for consistency
         return sorted(list(label_names))
 
-    def create_sheet(self, board_name: str, list_names: List[str], label_names: List[str]) -> Sheet:
+    def build_sheet_name(self, board_name: str, suffix: str = '') -> str:
         """
-        Create a new Smartsheet sheet with proper column structure.
+        Build a sheet name that fits Smartsheet's 50 character limit.
 
         Args:
             board_name: Name of the Trello board
-            list_names: List of Trello list names for dropdown
-            label_names: List of Trello label names for multi-select dropdown
+            suffix: Optional suffix (e.g. shard label) kept intact at the end
 
         Returns:
-            Created Sheet object
+            Sheet name, with the board name truncated if needed
         """
-        sheet_name = f"Trello Import - {board_name}"
+        prefix = "Trello Import - "
         # Smartsheet limits sheet names to 50 characters
-        if len(sheet_name) > 50:
-            # Truncate board name to fit within limit
-            max_board_name_length = 50 - len("Trello Import - ")
-            truncated_board_name = board_name[:max_board_name_length]
-            sheet_name = f"Trello Import - {truncated_board_name}"
-        print(f"\n[*] Creating Smartsheet: {sheet_name}")
+        max_board_name_length = MAX_SHEET_NAME_LENGTH - len(prefix) - len(suffix)
+        return f"{prefix}{board_name[:max(max_board_name_length, 0)]}{suffix}"[:MAX_SHEET_NAME_LENGTH]
 
-        # Create columns
-        columns = self.create_smartsheet_columns()
+    def build_sheet_columns(
+        self,
+        list_names: List[str],
+        label_names: List[str],
+        custom_fields: Optional[List[Dict[str, Any]]] = None
+    ) -> List[Column]:
+        """
+        Build the full column specification for a board's sheet.
+
+        Args:
+            list_names: List of Trello list names for dropdown
+            label_names: List of Trello label names for multi-select dropdown
+            custom_fields: Optional custom field definitions for extra columns
+
+        Returns:
+            List of Column objects with List and Labels options filled in
+        """
+        columns = self.create_smartsheet_columns(custom_fields)
 
         # Set List and Labels column options
         for col in columns:
@@ -243,6 +826,35 @@ class TrelloToSmartsheetMigrator:
             elif col.title == 'Labels':
                 col.options = label_names
 
+        return columns
+
+    def create_sheet(
+        self,
+        board_name: str,
+        list_names: List[str],
+        label_names: List[str],
+        custom_fields: Optional[List[Dict[str, Any]]] = None,
+        name_suffix: str = ''
+    ) -> Sheet:
+        """
+        Create a new Smartsheet sheet with proper column structure.
+
+        Args:
+            board_name: Name of the Trello board
+            list_names: List of Trello list names for dropdown
+            label_names: List of Trello label names for multi-select dropdown
+            custom_fields: Optional custom field definitions for extra columns
+            name_suffix: Optional suffix appended to the sheet name (used for shards)
+
+        Returns:
+            Created Sheet object
+        """
+        sheet_name = self.build_sheet_name(board_name, name_suffix)
+        log.info(f"\n[*] Creating Smartsheet: {sheet_name}")
+
+        # Create columns
+        columns = self.build_sheet_columns(list_names, label_names, custom_fields)
+
         # Create sheet specification
         sheet_spec = Sheet({
             'name': sheet_name,
@@ -261,10 +873,177 @@ class TrelloToSmartsheetMigrator:
         # The response already contains the sheet with all details including column IDs
         sheet = response.result
 
-        print(f"[OK] Sheet created with ID: {sheet.id}")
+        log.info(f"[OK] Sheet created with ID: {sheet.id}")
 
         return sheet
 
+    def estimate_sheet_size(
+        self,
+        trello_data: Dict[str, Any],
+        custom_fields: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Estimate the size of the target sheet before anything is uploaded.
+
+        Smartsheet counts every cell of every row against the cell limit,
+        empty or not, so cells = rows x columns.
+
+        Args:
+            trello_data: Parsed Trello board data
+            custom_fields: Optional custom field definitions from extract_custom_fields
+
+        Returns:
+            Dictionary with rows, columns, cells, max_rows_per_sheet and fits
+        """
+        rows = sum(1 for card in trello_data.get('cards', []) if self.is_migrated_card(card))
+        columns = len(self.create_smartsheet_columns(custom_fields))
+        cells = rows * columns
+        max_rows_per_sheet = min(MAX_SHEET_ROWS, MAX_SHEET_CELLS // max(columns, 1))
+
+        return {
+            'rows': rows,
+            'columns': columns,
+            'cells': cells,
+            'max_rows_per_sheet': max_rows_per_sheet,
+            'fits': columns <= MAX_SHEET_COLUMNS and rows <= max_rows_per_sheet
+        }
+
+    def plan_shards(
+        self,
+        trello_data: Dict[str, Any],
+        max_rows: int,
+        strategy: str = 'list'
+    ) -> List[Dict[str, Any]]:
+        """
+        Split the active cards of a board into shards that each fit in one sheet.
+
+        Strategies:
+            list: keep whole lists together, packing lists into sheets in board
+                order (cards of lists missing from the board last); a single
+                list larger than a sheet is split by row count
+            date: order cards by last activity and cut into consecutive date ranges
+            rows: cut cards into consecutive chunks in board order
+
+        Args:
+            trello_data: Parsed Trello board data
+            max_rows: Maximum number of rows per sheet
+            strategy: One of 'list', 'date' or 'rows'
+
+        Returns:
+            List of shards, each with 'label' (short description) and 'cards'
+        """
+        cards = [card for card in trello_data.get('cards', []) if self.is_migrated_card(card)]
+
+        def chunk(items):
+            return [items[i:i + max_rows] for i in range(0, len(items), max_rows)]
+
+        if strategy == 'rows':
+            return [
+                {'label': f"rows {i * max_rows + 1}-{i * max_rows + len(part)}", 'cards': part}
+                for i, part in enumerate(chunk(cards))
+            ]
+
+        if strategy == 'date':
+            ordered = sorted(cards, key=lambda card: card.get('dateLastActivity') or '')
+            shards = []
+            for part in chunk(ordered):
+                first = self.parse_trello_date(part[0].get('dateLastActivity')) or '?'
+                last = self.parse_trello_date(part[-1].get('dateLastActivity')) or '?'
+                shards.append({'label': f"{first} to {last}", 'cards': part})
+            return shards
+
+        if strategy == 'list':
+            list_lookup = self.build_list_lookup(trello_data)
+            # Board list order, then cards of lists missing from the board
+            cards_by_list = {trello_list['id']: [] for trello_list in trello_data.get('lists', [])}
+            for card in cards:
+                cards_by_list.setdefault(card.get('idList'), []).append(card)
+
+            shards = []
+            current = {'lists': [], 'cards': []}
+            for list_id, list_cards in cards_by_list.items():
+                if not list_cards:
+                    continue
+                list_name = list_lookup.get(list_id, 'Unknown list')
+                if len(list_cards) > max_rows:
+                    # This list alone does not fit: give it its own sheets
+                    if current['cards']:
+                        shards.append(current)
+                        current = {'lists': [], 'cards': []}
+                    parts = chunk(list_cards)
+                    for i, part in enumerate(parts):
+                        shards.append({
+                            'lists': [f"{list_name} ({i + 1}/{len(parts)})"],
+                            'cards': part
+                        })
+                    continue
+                if len(current['cards']) + len(list_cards) > max_rows:
+                    shards.append(current)
+                    current = {'lists': [], 'cards': []}
+                current['lists'].append(list_name)
+                current['cards'].extend(list_cards)
+            if current['cards']:
+                shards.append(current)
+
+            return [{'label': ', '.join(shard['lists']), 'cards': shard['cards']} for shard in shards]
+
+        raise ValueError(f"Unknown shard strategy '{strategy}'")
+
+    def create_shard_summary_sheet(
+        self,
+        board_name: str,
+        shard_results: List[Dict[str, Any]]
+    ) -> Sheet:
+        """
+        Create an index sheet with one row per shard of a split board.
+
+        Args:
+            board_name: Name of the Trello board
+            shard_results: List of dicts with sheet, label and card_count per shard
+
+        Returns:
+            Created summary Sheet object
+        """
+        sheet_name = self.build_sheet_name(board_name, ' (Index)')
+        log.info(f"\n[*] Creating summary sheet: {sheet_name}")
+
+        sheet_spec = Sheet({
+            'name': sheet_name,
+            'columns': [
+                Column({'title': 'Sheet', 'type': 'TEXT_NUMBER', 'primary': True}),
+                Column({'title': 'Contents', 'type': 'TEXT_NUMBER'}),
+                Column({'title': 'Cards', 'type': 'TEXT_NUMBER'}),
+                Column({'title': 'Sheet ID', 'type': 'TEXT_NUMBER'})
+            ]
+        })
+
+        if self.folder_id:
+            response = self.smartsheet_client.Folders.create_sheet_in_folder(self.folder_id, sheet_spec)
+        else:
+            response = self.smartsheet_client.Home.create_sheet(sheet_spec)
+        summary = response.result
+
+        column_map = {col.title: col.id for col in summary.columns}
+        rows = []
+        for result in shard_results:
+            sheet = result['sheet']
+            sheet_cell = {'column_id': column_map['Sheet'], 'value': sheet.name}
+            if getattr(sheet, 'permalink', None):
+                sheet_cell['hyperlink'] = {'url': sheet.permalink}
+            rows.append(Row({
+                'to_bottom': True,
+                'cells': [
+                    Cell(sheet_cell),
+                    Cell({'column_id': column_map['Contents'], 'value': result['label']}),
+                    Cell({'column_id': column_map['Cards'], 'value': result['card_count']}),
+                    Cell({'column_id': column_map['Sheet ID'], 'value': str(sheet.id)})
+                ]
+            }))
+        self.smartsheet_client.Sheets.add_rows(summary.id, rows)
+
+        log.info(f"[OK] Summary sheet created with ID: {summary.id}")
+        return summary
+
     def build_card_lookup(self, trello_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
         """
         Build a lookup dictionary for Trello cards by ID.
@@ -319,6 +1098,49 @@ class TrelloToSmartsheetMigrator:
             }
         return members
 
+    def check_member_contacts(self, trello_data: Dict[str, Any]) -> List[str]:
+        """
+        Check the emails of assigned members against the contact directory.
+
+        Members whose email is not a Smartsheet user but whose name matches
+        exactly one user get that user's email (added to the email mapping).
+        The others are reported as unknown. Nothing is checked if the token
+        may not list users.
+
+        Args:
+            trello_data: Parsed Trello board data
+
+        Returns:
+            Names of members that could not be matched to a Smartsheet user
+        """
+        log.info(f"\n[*] Checking member emails against the Smartsheet user directory...")
+        self.contact_directory.load()
+        if not self.contact_directory.available:
+            return []
+
+        assigned = set()
+        for card in trello_data.get('cards', []):
+            if self.is_migrated_card(card):
+                assigned.update(card.get('idMembers') or ())
+
+        unknown = []
+        matched = 0
+        for member_id, member in self.build_member_lookup(trello_data).items():
+            if member_id not in assigned:
+                continue
+            email, status = self.contact_directory.resolve(member['name'], member['email'])
+            if status == 'matched':
+                self.email_mapping[member['name']] = email
+                matched += 1
+                log.info(f"   {member['name']}: {member['email']} -> {email}")
+            elif status == 'unknown':
+                unknown.append(member['name'])
+                log.warning(f"[WARN] No Smartsheet user for {member['name']} ({member['email']})",
+                            extra={'repeat_key': 'unknown member'})
+
+        log.info(f"[OK] {len(assigned)} assigned members checked: {matched} corrected, {len(unknown)} unknown")
+        return unknown
+
     def generate_email_from_name(self, full_name: str) -> str:
         """
         Generate an EPFL email address from a full name.
@@ -385,7 +1207,9 @@ class TrelloToSmartsheetMigrator:
         column_map: Dict[str, int],
         list_lookup: Dict[str, str],
         member_lookup: Dict[str, Dict[str, str]],
-        label_lookup: Dict[str, str]
+        label_lookup: Dict[str, str],
+        custom_field_lookup: Optional[Dict[str, Dict[str, Any]]] = None,
+        custom_field_items: Optional[List[Dict[str, Any]]] = None
     ) -> Row:
         """
         Create a Smartsheet row from a Trello card.
@@ -396,6 +1220,8 @@ class TrelloToSmartsheetMigrator:
             list_lookup: Dictionary mapping list IDs to names
             member_lookup: Dictionary mapping member IDs to names
             label_lookup: Dictionary mapping label IDs to names
+            custom_field_lookup: Optional mapping of custom field IDs to definitions
+            custom_field_items: Optional custom field items for this card
 
         Returns:
             Row object ready to be added to Smartsheet
@@ -484,64 +1310,488 @@ class TrelloToSmartsheetMigrator:
                 'value': created_date
             }))
 
+        # Custom fields
+        if custom_field_lookup and custom_field_items:
+            for item in custom_field_items:
+                field = custom_field_lookup.get(item.get('idCustomField'))
+                if not field or field['column_title'] not in column_map:
+                    continue
+                value = self.convert_custom_field_value(field, item)
+                if value is None:
+                    continue
+                cells.append(Cell({
+                    'column_id': column_map[field['column_title']],
+                    'value': value
+                }))
+
         return Row({
             'cells': cells
         })
 
-    def add_cards_to_sheet(
+    def iter_card_rows(
         self,
-        sheet: Sheet,
-        trello_data: Dict[str, Any]
-    ) -> Dict[str, int]:
+        trello_data: Dict[str, Any],
+        column_map: Dict[str, int],
+        custom_fields: Optional[List[Dict[str, Any]]] = None,
+        truncate: bool = True
+    ):
         """
-        Add all Trello cards as rows to the Smartsheet.
+        Lazily build a Smartsheet row for every active card.
 
         Args:
-            sheet: Smartsheet Sheet object
             trello_data: Parsed Trello board data
+            column_map: Dictionary mapping column names to column IDs
+            custom_fields: Optional custom field definitions from extract_custom_fields
+            truncate: Cut text cells to Smartsheet's length limit; the cut
+                text is kept in cell_overflow and posted as discussions
 
-        Returns:
-            Dictionary mapping Trello card IDs to Smartsheet row IDs
+        Yields:
+            (card ID, Row) pairs in board order
         """
-        print(f"\n[*] Adding cards to sheet...")
+        column_titles = {column_id: title for title, column_id in column_map.items()}
 
         # Build lookups
         list_lookup = self.build_list_lookup(trello_data)
         member_lookup = self.build_member_lookup(trello_data)
         label_lookup = self.build_label_lookup(trello_data)
+        custom_field_lookup = {field['id']: field for field in custom_fields or []}
+        custom_field_index = (
+            self.build_custom_field_item_index(trello_data) if custom_field_lookup else {}
+        )
 
-        # Build column map (name -> ID)
-        column_map = {col.title: col.id for col in sheet.columns}
-
-        # Create rows from cards
-        cards = [card for card in trello_data.get('cards', []) if not card.get('closed', False)]
-        rows = []
-
-        for card in cards:
+        for card in trello_data.get('cards', []):
+            if not self.is_migrated_card(card):
+                continue
             row = self.create_row_from_card(
                 card,
                 column_map,
                 list_lookup,
                 member_lookup,
-                label_lookup
+                label_lookup,
+                custom_field_lookup,
+                custom_field_index.get(card['id'])
             )
-            rows.append(row)
+            if truncate:
+                # A cell over the length limit fails the whole batch
+                self.record_overflow(card['id'], truncate_long_cells(row), column_titles)
+            yield card['id'], row
+
+    def record_overflow(self, card_id: str, overflow: List[Tuple[Any, str]], column_titles: Dict[Any, str]):
+        """
+        Keep text cut from a card's cells, to post it as discussions on its row.
+
+        Cards already recorded by validate_board_rows are left as they are.
+
+        Args:
+            card_id: Trello card ID
+            overflow: (column ID, cut text) pairs from truncate_long_cells
+            column_titles: Column ID -> column title mapping
+        """
+        if overflow and card_id not in self.cell_overflow:
+            self.cell_overflow[card_id] = [(column_titles[column_id], text) for column_id, text in overflow]
+
+    def iter_upload_rows(
+        self,
+        trello_data: Dict[str, Any],
+        column_map: Dict[str, int],
+        custom_fields: Optional[List[Dict[str, Any]]] = None
+    ):
+        """
+        Build the rows to upload, in the board's RowBuildPool when there is one.
+
+        Args:
+            trello_data: Parsed Trello board data
+            column_map: Dictionary mapping column names to column IDs
+            custom_fields: Optional custom field definitions from extract_custom_fields
+
+        Yields:
+            (card ID, Row or RowPayload) pairs in board order
+        """
+        if self.row_pool is not None:
+            return self.row_pool.iter_payloads(trello_data, column_map, custom_fields)
+        return self.iter_card_rows(trello_data, column_map, custom_fields)
+
+    def upload_cards_pipelined(
+        self,
+        sheet: Sheet,
+        trello_data: Dict[str, Any],
+        custom_fields: Optional[List[Dict[str, Any]]] = None,
+        queue_size: int = 2000
+    ) -> Dict[str, int]:
+        """
+        Upload rows and discussions as overlapping pipeline stages.
+
+        Three stages connected by bounded queues run concurrently:
+
+            transform -> row upload -> discussion upload
+
+        Discussions for a card are queued as soon as its row batch returns
+        row IDs, so the discussion phase runs while later row batches are
+        still uploading. Full queues block the upstream stage, which bounds
+        memory to a few thousand rows and discussions in flight.
+
+        Args:
+            sheet: Smartsheet Sheet object
+            trello_data: Parsed Trello board data
+            custom_fields: Optional custom field definitions from extract_custom_fields
+            queue_size: Capacity of each inter-stage queue
+
+        Returns:
+            Dictionary mapping Trello card IDs to Smartsheet row IDs
+        """
+        log.info(f"\n[*] Adding cards and comments (pipelined)...")
 
-        # Add rows to sheet in batches
-        if rows:
-            response = self.smartsheet_client.Sheets.add_rows(sheet.id, rows)
-            added_rows = response.result
+        column_map = {col.title: col.id for col in sheet.columns}
+        member_lookup = self.build_member_lookup(trello_data)
+        comments_by_card = self.extract_comments_for_cards(trello_data)
+
+        pipeline = Pipeline()
+        row_queue = pipeline.make_queue(queue_size)
+        discussion_queue = pipeline.make_queue(queue_size)
+        batcher = self.create_batcher('rows')
+        card_to_row_map = {}
+        counts = {'comments': 0}
+
+        def transform():
+            for card_row in self.iter_upload_rows(trello_data, column_map, custom_fields):
+                pipeline.put(row_queue, card_row)
+
+        def upload_rows():
+            def send(batch):
+                return self.smartsheet_client.Bulk.add_rows(sheet.id, [row for _, row in batch])
+
+            def confirm(batch):
+                return self.find_added_rows(sheet.id, column_map['URL'], [row for _, row in batch])
+
+            for batch, row_ids in batcher.run(pipeline.iterate(row_queue), send, confirm):
+                for (card_id, _), row_id in zip(batch, row_ids):
+                    card_to_row_map[card_id] = row_id
+                    for text in self.build_discussion_texts(card_id, comments_by_card, member_lookup):
+                        pipeline.put(discussion_queue, (row_id, text))
+
+        def upload_discussions():
+            for row_id, text in pipeline.iterate(discussion_queue):
+                if self.post_discussion(sheet.id, row_id, text):
+                    counts['comments'] += 1
+
+        pipeline.start('transform', transform, output=row_queue)
+        pipeline.start('rows', upload_rows, output=discussion_queue)
+        pipeline.start('discussions', upload_discussions)
+        pipeline.join()
+
+        log.info(f"[OK] Added {len(card_to_row_map)} cards")
+        log.info(f"   {batcher.summary()}")
+        log.info(f"[OK] Added {counts['comments']} comments")
+
+        return card_to_row_map
+
+    def validate_board_rows(
+        self,
+        trello_data: Dict[str, Any],
+        list_names: List[str],
+        label_names: List[str],
+        custom_fields: Optional[List[Dict[str, Any]]] = None
+    ) -> ValidationReport:
+        """
+        Validate every row offline and apply the repairs to the migration setup.
+
+        Rows are built against column positions, checked by RowValidator and
+        discarded, in the board's RowBuildPool when there is one. Repairs are applied before the sheet is created: missing
+        picklist options are appended to list_names, label_names or the
+        custom field options, repaired emails are added to the email mapping,
+        and text cut from long cells is kept for add_comments_to_rows.
+
+        Args:
+            trello_data: Parsed Trello board data
+            list_names: List names for the List column (extended in place)
+            label_names: Label names for the Labels column (extended in place)
+            custom_fields: Optional custom field definitions (options extended in place)
+
+        Returns:
+            ValidationReport; check report.ok before uploading
+        """
+        log.info(f"\n[*] Validating rows...")
+
+        if self.row_pool is not None:
+            report = self.row_pool.validate(trello_data, list_names, label_names, custom_fields)
+        else:
+            columns = self.build_sheet_columns(list_names, label_names, custom_fields)
+            positions = {col.title: index for index, col in enumerate(columns)}
+            validator = RowValidator(columns)
+            for card_id, row in self.iter_card_rows(trello_data, positions, custom_fields, truncate=False):
+                validator.check_row(card_id, row)
+            report = validator.report
+
+        # Apply repairs
+        for value in report.extra_options.get('List', []):
+            list_names.append(value)
+        for value in report.extra_options.get('Labels', []):
+            label_names.append(value)
+        for field in custom_fields or []:
+            for value in report.extra_options.get(field['column_title'], []):
+                field['options'][value] = value
+        for name, email in report.email_repairs.items():
+            self.email_mapping[name] = email
+        self.cell_overflow.update(report.overflow)
+
+        if report.ok:
+            log.info(f"[OK] {report.format()}")
+        else:
+            log.warning(f"[WARN] {report.format()}")
+
+        return report
+
+    def add_cards_to_sheet(
+        self,
+        sheet: Sheet,
+        trello_data: Dict[str, Any],
+        custom_fields: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, int]:
+        """
+        Add all Trello cards as rows to the Smartsheet.
+
+        Args:
+            sheet: Smartsheet Sheet object
+            trello_data: Parsed Trello board data
+            custom_fields: Optional custom field definitions from extract_custom_fields
+
+        Returns:
+            Dictionary mapping Trello card IDs to Smartsheet row IDs
+        """
+        log.info(f"\n[*] Adding cards to sheet...")
+
+        # Build column map (name -> ID)
+        column_map = {col.title: col.id for col in sheet.columns}
+
+        # Rows are built lazily as the batcher pulls them, so only the
+        # batches in flight are held in memory
+        card_rows = self.iter_upload_rows(trello_data, column_map, custom_fields)
+
+        # Add rows to sheet in adaptively sized batches
+        batcher = self.create_batcher('rows')
+        card_to_row_map = {}
+
+        def send(batch):
+            return self.smartsheet_client.Bulk.add_rows(sheet.id, [row for _, row in batch])
+
+        def confirm(batch):
+            return self.find_added_rows(sheet.id, column_map['URL'], [row for _, row in batch])
+
+        for batch, row_ids in batcher.run(card_rows, send, confirm):
+            # Build card ID -> row ID mapping (rows come back in request order)
+            for (card_id, _), row_id in zip(batch, row_ids):
+                card_to_row_map[card_id] = row_id
+
+        if card_to_row_map:
+            log.info(f"[OK] Added {len(card_to_row_map)} cards")
+            log.info(f"   {batcher.summary()}")
+
+        return card_to_row_map
+
+    def find_added_rows(self, sheet_id: int, url_column_id: int, rows: List[Any]) -> Optional[List[int]]:
+        """
+        Check whether an add_rows request that timed out was applied anyway.
+
+        add_rows is all-or-nothing and not idempotent: the batch is either
+        entirely in the sheet, and must not be sent again, or not at all.
+        Rows are found by their URL column, which is unique per card.
+
+        Args:
+            sheet_id: Sheet the rows were added to
+            url_column_id: ID of the URL column
+            rows: Rows of the failed request (Row or RowPayload)
+
+        Returns:
+            Row IDs in request order if the rows are in the sheet, None if not
+
+        Raises:
+            RuntimeError: If the rows cannot be told apart by URL, or only
+                some of them are in the sheet
+        """
+        urls = [row_cell_value(row, url_column_id) for row in rows]
+        if not all(urls) or len(set(urls)) != len(urls):
+            raise RuntimeError(f"Cannot tell whether {len(rows)} rows were added to sheet {sheet_id}: "
+                               f"they have no unique URL")
+
+        wanted = set(urls)
+        found = {url: row_id for url, row_id in self.iter_url_column(sheet_id, url_column_id) if url in wanted}
+        if not found:
+            return None
+        if len(found) < len(urls):
+            raise RuntimeError(f"Only {len(found)} of {len(urls)} rows were added to sheet {sheet_id}")
+        return [found[url] for url in urls]
+
+    def iter_url_column(self, sheet_id: int, url_column_id: int) -> Iterator[Tuple[Optional[str], int]]:
+        """
+        Read the URL column of a sheet, page by page.
+
+        Args:
+            sheet_id: Smartsheet sheet ID
+            url_column_id: ID of the URL column
+
+        Yields:
+            (URL, row ID) pairs; the URL is None for rows without one
+        """
+        page = 1
+        while True:
+            page_sheet = self.smartsheet_client.Sheets.get_sheet(
+                sheet_id, column_ids=[url_column_id], page_size=READ_BACK_PAGE_SIZE, page=page)
+            if not page_sheet.rows:
+                return
+            for row in page_sheet.rows:
+                yield (row.cells[0].value if row.cells else None), row.id
+            if page * READ_BACK_PAGE_SIZE >= (page_sheet.total_row_count or 0):
+                return
+            page += 1
+
+    def import_cards_to_sheet(
+        self,
+        board_name: str,
+        list_names: List[str],
+        label_names: List[str],
+        trello_data: Dict[str, Any],
+        custom_fields: Optional[List[Dict[str, Any]]] = None,
+        name_suffix: str = ''
+    ) -> Tuple[Sheet, Dict[str, int]]:
+        """
+        Create the sheet and its rows with a single file import.
 
-            print(f"[OK] Added {len(added_rows)} cards")
+        All card rows are streamed to a local XLSX (or CSV) file that is
+        uploaded with one import request. Imported columns are plain text, so
+        the List, Labels, Members, date and custom field columns are then
+        converted to their proper types, and the card -> row mapping is
+        recovered by reading the URL column back page by page. This replaces
+        one add_rows call per batch with a handful of requests regardless of
+        board size.
 
-            # Build card ID -> row ID mapping
-            card_to_row_map = {}
-            for i, row in enumerate(added_rows):
-                card_to_row_map[cards[i]['id']] = row.id
+        Args:
+            board_name: Name of the Trello board
+            list_names: List of Trello list names for dropdown
+            label_names: List of Trello label names for multi-select dropdown
+            trello_data: Parsed Trello board data
+            custom_fields: Optional custom field definitions for extra columns
+            name_suffix: Optional suffix appended to the sheet name (used for shards)
 
-            return card_to_row_map
+        Returns:
+            Tuple of (imported Sheet, card ID -> row ID mapping)
+        """
+        sheet_name = self.build_sheet_name(board_name, name_suffix)
+        file_format = self.import_format if OPENPYXL_AVAILABLE else 'csv'
+        log.info(f"\n[*] Importing Smartsheet from {file_format.upper()}: {sheet_name}")
+
+        columns = self.build_sheet_columns(list_names, label_names, custom_fields)
+        titles = [col.title for col in columns]
+        # Build rows against column positions instead of column IDs
+        positions = {title: index for index, title in enumerate(titles)}
+        date_positions = {index for index, col in enumerate(columns) if col.type == 'DATE'}
+
+        card_ids = []
+
+        def import_rows():
+            for card_id, row in self.iter_card_rows(trello_data, positions, custom_fields):
+                card_ids.append(card_id)
+                yield row_to_import_values(row, len(titles), date_positions)
+
+        with tempfile.TemporaryDirectory(prefix='trello_import_') as tmp_dir:
+            file_path = os.path.join(tmp_dir, f"board.{file_format}")
+            row_count = write_import_file(file_path, titles, import_rows(), file_format)
+            log.info(f"[OK] Wrote {row_count} rows to import file "
+                     f"({os.path.getsize(file_path) / 1024:.0f} KiB)")
+
+            # header_row_index=0: first row holds titles; primary_column_index=0: Card Name
+            if file_format == 'xlsx':
+                if self.folder_id:
+                    response = self.smartsheet_client.Folders.import_xlsx_sheet(
+                        self.folder_id, file_path, sheet_name, 0, 0)
+                else:
+                    response = self.smartsheet_client.Sheets.import_xlsx_sheet(
+                        file_path, sheet_name, 0, 0)
+            else:
+                if self.folder_id:
+                    response = self.smartsheet_client.Folders.import_csv_sheet(
+                        self.folder_id, file_path, sheet_name, 0, 0)
+                else:
+                    response = self.smartsheet_client.Sheets.import_csv_sheet(
+                        file_path, sheet_name, 0, 0)
+
+        sheet_id = response.result.id
+        log.info(f"[OK] Sheet imported with ID: {sheet_id}")
+
+        # Convert imported text columns to their proper types
+        sheet = self.smartsheet_client.Sheets.get_sheet(sheet_id, page_size=1)
+        url_column_id = None
+        for imported, spec in zip(sorted(sheet.columns, key=lambda col: col.index), columns):
+            if spec.title == 'URL':
+                url_column_id = imported.id
+            if spec.type == 'TEXT_NUMBER' or spec.primary:
+                continue
+            update = {'index': imported.index, 'title': spec.title, 'type': spec.type}
+            if spec.options:
+                update['options'] = list(spec.options)
+            self.smartsheet_client.Sheets.update_column(sheet_id, imported.id, Column(update))
+        log.info(f"[OK] Column types updated")
+
+        # Recover card ID -> row ID mapping from the URL column. Imported rows
+        # keep file order, which maps the rows without a URL to the cards
+        # without one; a card is never given two rows.
+        card_lookup = self.build_card_lookup(trello_data)
+        url_to_card = {}
+        cards_without_url = []
+        for card_id in card_ids:
+            card = card_lookup[card_id]
+            url = card.get('shortUrl', card.get('url', '')) if url_column_id else ''
+            if url:
+                url_to_card[url] = card_id
+            else:
+                cards_without_url.append(card_id)
+        cards_without_url = iter(cards_without_url)
+
+        card_to_row_map = {}
+        unmatched_rows = 0
+        position = 0
+        page = 1
+        while position < len(card_ids):
+            page_sheet = self.smartsheet_client.Sheets.get_sheet(
+                sheet_id,
+                column_ids=[url_column_id] if url_column_id else None,
+                page_size=READ_BACK_PAGE_SIZE,
+                page=page
+            )
+            if not page_sheet.rows:
+                break
+            for row in page_sheet.rows:
+                url = row.cells[0].value if url_column_id and row.cells else None
+                card_id = url_to_card.get(url) if url else next(cards_without_url, None)
+                if card_id is None or card_id in card_to_row_map:
+                    unmatched_rows += 1
+                else:
+                    card_to_row_map[card_id] = row.id
+                position += 1
+            page += 1
+
+        if unmatched_rows or len(card_to_row_map) < len(card_ids):
+            log.warning(f"[WARN] {unmatched_rows} imported rows matched no card; "
+                        f"{len(card_ids) - len(card_to_row_map)} cards get no comments")
+        log.info(f"[OK] Imported {len(card_to_row_map)} cards ({page - 1} read-back pages)")
+        return sheet, card_to_row_map
+
+    def create_batcher(self, name: str, **kwargs) -> AdaptiveBatcher:
+        """
+        Create an adaptive batcher for a bulk upload stage.
 
-        return {}
+        Args:
+            name: Label for log messages (e.g. 'rows')
+            **kwargs: Overrides for AdaptiveBatcher settings
+
+        Returns:
+            AdaptiveBatcher sizing batches by payload bytes and latency
+        """
+        settings = {'max_size': self.max_batch_rows}
+        settings.update(kwargs)
+        if name == 'rows':
+            # Items are (card ID, Row) pairs; only the row is sent
+            settings.setdefault('size_of', lambda pair: row_payload_size(pair[1]))
+        return AdaptiveBatcher(name, **settings)
 
     def extract_comments_for_cards(
         self,
@@ -550,12 +1800,18 @@ class TrelloToSmartsheetMigrator:
         """
         Extract comment actions from Trello data, grouped by card ID.
 
+        Boards loaded from the parse cache already carry their comments
+        grouped by card ('commentsByCard'), which is returned as-is.
+
         Args:
             trello_data: Parsed Trello board data
 
         Returns:
             Dictionary mapping card IDs to lists of comment objects
         """
+        if 'commentsByCard' in trello_data:
+            return trello_data['commentsByCard']
+
         comments_by_card = {}
 
         for action in trello_data.get('actions', []):
@@ -579,6 +1835,127 @@ class TrelloToSmartsheetMigrator:
 
         return comments_by_card
 
+    def format_comment(
+        self,
+        comment_data: Dict[str, Any],
+        member_lookup: Dict[str, Dict[str, str]]
+    ) -> str:
+        """
+        Format a Trello comment as Smartsheet discussion text.
+
+        Args:
+            comment_data: Comment object from extract_comments_for_cards
+            member_lookup: Dictionary mapping member IDs to member info
+
+        Returns:
+            Text in the form "[Author (email) - Date]\nComment text"
+        """
+        # Get comment details
+        text = comment_data['text']
+        author_name = comment_data['author_name']
+        member_id = comment_data.get('member_id')
+        date_str = comment_data['date']
+
+        # Get author email from member lookup
+        author_email = None
+        if member_id and member_id in member_lookup:
+            author_email = member_lookup[member_id]['email']
+
+        # Parse date for display
+        date_display = ''
+        if date_str:
+            try:
+                dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+                date_display = dt.strftime('%Y-%m-%d %H:%M')
+            except:
+                date_display = date_str
+
+        # Format: [Author (email) - Date]\nComment text
+        formatted_text = f"[{author_name}"
+        if author_email:
+            formatted_text += f" ({author_email})"
+        if date_display:
+            formatted_text += f" - {date_display}"
+        formatted_text += f"]\n{text}"
+
+        return formatted_text
+
+    def build_discussion_texts(
+        self,
+        card_id: str,
+        comments_by_card: Dict[str, List[Dict[str, Any]]],
+        member_lookup: Dict[str, Dict[str, str]]
+    ) -> List[str]:
+        """
+        Build the texts of all discussions to post on a card's row.
+
+        Args:
+            card_id: Trello card ID
+            comments_by_card: Comments grouped by card ID
+            member_lookup: Dictionary mapping member IDs to member info
+
+        Returns:
+            Formatted comments, followed by any text cut from over-long cells
+        """
+        texts = [
+            self.format_comment(comment_data, member_lookup)
+            for comment_data in comments_by_card.get(card_id, [])
+        ]
+
+        # Text cut from cells over the length limit
+        for column_title, overflow in self.cell_overflow.get(card_id, []):
+            texts.extend(self.format_overflow(column_title, overflow))
+
+        return texts
+
+    def format_overflow(self, column_title: str, overflow: str) -> List[str]:
+        """
+        Split text cut from a cell into discussion texts.
+
+        Args:
+            column_title: Title of the cell's column
+            overflow: Text that did not fit in the cell
+
+        Returns:
+            Discussion texts, each short enough for one comment
+        """
+        parts = [overflow[i:i + MAX_CELL_LENGTH] for i in range(0, len(overflow), MAX_CELL_LENGTH)]
+        return [f"[{column_title} continued ({index}/{len(parts)})]\n{part}"
+                for index, part in enumerate(parts, start=1)]
+
+    def post_discussion(self, sheet_id: int, row_id: int, text: str) -> bool:
+        """
+        Create a discussion with a single comment on a row.
+
+        Args:
+            sheet_id: Smartsheet sheet ID
+            row_id: Smartsheet row ID
+            text: Comment text
+
+        Returns:
+            True if the discussion was created, False if the request failed
+        """
+        if self.link_index is not None:
+            # Links to cards migrated so far point at their rows
+            text = self.link_index.rewrite(text)
+
+        # Create discussion with comment
+        discussion = Discussion()
+        discussion.comment = Comment()
+        discussion.comment.text = text
+
+        try:
+            self.smartsheet_client.Discussions.create_discussion_on_row(
+                sheet_id,
+                row_id,
+                discussion
+            )
+            return True
+        except Exception as e:
+            log.warning(f"[WARN] Failed to add comment to row {row_id}: {e}",
+                        extra={'repeat_key': 'comment failure', 'sheet_id': sheet_id, 'row_id': row_id})
+            return False
+
     def add_comments_to_rows(
         self,
         sheet_id: int,
@@ -593,7 +1970,7 @@ class TrelloToSmartsheetMigrator:
             trello_data: Parsed Trello board data
             card_to_row_map: Dictionary mapping card IDs to row IDs
         """
-        print(f"\n[*] Adding comments as discussions...")
+        log.info(f"\n[*] Adding comments as discussions...")
 
         # Build member lookup for comment authors
         member_lookup = self.build_member_lookup(trello_data)
@@ -601,95 +1978,488 @@ class TrelloToSmartsheetMigrator:
 
         total_comments = 0
 
-        for card_id, comments in comments_by_card.items():
+        for card_id in list(comments_by_card) + [
+            card_id for card_id in self.cell_overflow if card_id not in comments_by_card
+        ]:
             row_id = card_to_row_map.get(card_id)
             if not row_id:
                 continue
 
-            for comment_data in comments:
-                # Get comment details
-                text = comment_data['text']
-                author_name = comment_data['author_name']
-                member_id = comment_data.get('member_id')
-                date_str = comment_data['date']
-
-                # Get author email from member lookup
-                author_email = None
-                if member_id and member_id in member_lookup:
-                    author_email = member_lookup[member_id]['email']
-
-                # Parse date for display
-                date_display = ''
-                if date_str:
-                    try:
-                        dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                        date_display = dt.strftime('%Y-%m-%d %H:%M')
-                    except:
-                        date_display = date_str
-
-                # Format: [Author (email) - Date]\nComment text
-                formatted_text = f"[{author_name}"
-                if author_email:
-                    formatted_text += f" ({author_email})"
-                if date_display:
-                    formatted_text += f" - {date_display}"
-                formatted_text += f"]\n{text}"
-
-                # Create discussion with comment
-                discussion = Discussion()
-                discussion.comment = Comment()
-                discussion.comment.text = formatted_text
-
-                try:
-                    self.smartsheet_client.Discussions.create_discussion_on_row(
-                        sheet_id,
-                        row_id,
-                        discussion
-                    )
+            for text in self.build_discussion_texts(card_id, comments_by_card, member_lookup):
+                if self.post_discussion(sheet_id, row_id, text):
                     total_comments += 1
-                except Exception as e:
-                    print(f"[WARN] Failed to add comment to row {row_id}: {e}")
 
-        print(f"[OK] Added {total_comments} comments")
+        log.info(f"[OK] Added {total_comments} comments")
 
-    def migrate_board(self, trello_file_path: str) -> int:
+    def migrate_board(self, trello_file_path: str, entry: Optional[str] = None) -> int:
         """
         Main migration workflow: load Trello data and create Smartsheet.
 
+        Boards that exceed Smartsheet's sheet limits are split across several
+        sheets according to the configured shard strategy. The size check runs
+        before any sheet is created, so an oversized board with sharding
+        disabled fails immediately instead of midway through the upload.
+
         Args:
-            trello_file_path: Path to Trello JSON export file
+            trello_file_path: Path to Trello JSON export file, or
+                'trello:<board id>' to read the board from the Trello API
+            entry: Board entry to migrate from a multi-board zip archive
 
         Returns:
-            Smartsheet sheet ID
+            Smartsheet sheet ID (the summary sheet, or the first shard, when
+            the board was split)
+
+        Raises:
+            ValueError: If the board does not fit in one sheet and sharding is
+                disabled, or it has more columns than a sheet allows
         """
+        if self.memory_profile:
+            self.start_memory_profile(trello_file_path, entry)
+
         # Load Trello data
-        trello_data = self.load_trello_data(trello_file_path)
+        trello_data = self.load_trello_source(trello_file_path, entry)
+        profile_phase(self.memory_profiler, 'load')
+
+        self.start_row_pool(trello_data)
+        try:
+            return self.migrate_loaded_board(trello_data)
+        finally:
+            if self.row_pool is not None:
+                self.row_pool.close()
+                self.row_pool = None
+
+    def start_row_pool(self, trello_data: Dict[str, Any]):
+        """
+        Fork the RowBuildPool of a board when build_workers is set.
+
+        Called before any migration thread starts. When other threads already
+        run (e.g. in the GUI or the job server), rows are built serially.
+
+        Args:
+            trello_data: Parsed Trello board data
+        """
+        if self.build_workers <= 1:
+            return
+        try:
+            self.row_pool = RowBuildPool(self, trello_data, self.build_workers)
+        except RuntimeError as e:
+            log.warning(f"[WARN] Cannot fork row build workers ({e}), building rows in this process")
+
+    def migrate_loaded_board(self, trello_data: Dict[str, Any]) -> int:
+        """
+        Migrate a loaded board; the rest of migrate_board.
+
+        Args:
+            trello_data: Parsed Trello board data
+
+        Returns:
+            Smartsheet sheet ID (the summary sheet, or the first shard, when
+            the board was split)
+
+        Raises:
+            ValueError: If the board does not fit in one sheet and sharding is
+                disabled, or it has more columns than a sheet allows
+        """
 
         # Extract board name, list names, and label names
         board_name = trello_data.get('name', 'Untitled Board')
         list_names = self.extract_list_names(trello_data)
         label_names = self.extract_label_names(trello_data)
+        custom_fields = self.extract_custom_fields(trello_data)
 
-        # Create Smartsheet
-        sheet = self.create_sheet(board_name, list_names, label_names)
+        # Pre-flight size check
+        estimate = self.estimate_sheet_size(trello_data, custom_fields)
+        log.info(f"[*] Estimated sheet size: {estimate['rows']} rows x "
+                 f"{estimate['columns']} columns = {estimate['cells']} cells")
 
-        # Add cards as rows
-        card_to_row_map = self.add_cards_to_sheet(sheet, trello_data)
+        if estimate['columns'] > MAX_SHEET_COLUMNS:
+            raise ValueError(
+                f"Board needs {estimate['columns']} columns, "
+                f"Smartsheet allows at most {MAX_SHEET_COLUMNS} per sheet"
+            )
 
-        # Add comments as discussions
-        self.add_comments_to_rows(sheet.id, trello_data, card_to_row_map)
+        # Fail before the contact checks and the validation pass
+        if estimate['fits']:
+            shards = [{'label': '', 'cards': None}]
+        elif self.shard_strategy == 'none':
+            raise ValueError(
+                f"Board has {estimate['rows']} cards ({estimate['cells']} cells) but a sheet "
+                f"holds at most {estimate['max_rows_per_sheet']} rows with "
+                f"{estimate['columns']} columns; enable a shard strategy to split it"
+            )
+        else:
+            shards = self.plan_shards(trello_data, estimate['max_rows_per_sheet'], self.shard_strategy)
+            log.warning(f"[WARN] Board exceeds Smartsheet sheet limits, splitting into "
+                        f"{len(shards)} sheets by {self.shard_strategy}")
+
+        profile_phase(self.memory_profiler, 'analyze')
+
+        if self.contact_directory is not None:
+            self.check_member_contacts(trello_data)
+            profile_phase(self.memory_profiler, 'contacts')
+
+        if self.validate_rows:
+            report = self.validate_board_rows(trello_data, list_names, label_names, custom_fields)
+            if not report.ok:
+                raise ValueError(
+                    f"Row validation failed with {len(report.errors)} errors; "
+                    f"nothing was uploaded\n{report.format()}"
+                )
+            profile_phase(self.memory_profiler, 'validate')
+
+        shard_results = []
+        for index, shard in enumerate(shards, start=1):
+            phase_suffix = f" {index}/{len(shards)}" if len(shards) > 1 else ''
+            if shard['cards'] is None:
+                shard_data = trello_data
+                name_suffix = ''
+            else:
+                # Shallow copy: only the card list differs between shards
+                shard_data = dict(trello_data, cards=shard['cards'])
+                name_suffix = f" ({index}/{len(shards)})"
+                log.info(f"\n[*] Shard {index}/{len(shards)}: {shard['label']} "
+                         f"({len(shard['cards'])} cards)")
+
+            if self.upload_mode == 'import':
+                # Create the sheet and its rows with one file import
+                sheet, card_to_row_map = self.import_cards_to_sheet(
+                    board_name, list_names, label_names, shard_data, custom_fields, name_suffix
+                )
+                self.register_card_links(sheet, shard_data, card_to_row_map)
+                profile_phase(self.memory_profiler, f"rows{phase_suffix}")
+                # Add comments as discussions
+                self.add_comments_to_rows(sheet.id, shard_data, card_to_row_map)
+                profile_phase(self.memory_profiler, f"comments{phase_suffix}")
+            elif self.pipeline:
+                sheet = self.create_sheet(board_name, list_names, label_names, custom_fields, name_suffix)
+
+                # Rows and comments upload concurrently
+                card_to_row_map = self.upload_cards_pipelined(sheet, shard_data, custom_fields)
+                self.register_card_links(sheet, shard_data, card_to_row_map)
+                profile_phase(self.memory_profiler, f"rows+comments{phase_suffix}")
+            else:
+                # Create Smartsheet
+                sheet = self.create_sheet(board_name, list_names, label_names, custom_fields, name_suffix)
+
+                # Add cards as rows
+                card_to_row_map = self.add_cards_to_sheet(sheet, shard_data, custom_fields)
+                self.register_card_links(sheet, shard_data, card_to_row_map)
+                profile_phase(self.memory_profiler, f"rows{phase_suffix}")
+
+                # Add comments as discussions
+                self.add_comments_to_rows(sheet.id, shard_data, card_to_row_map)
+                profile_phase(self.memory_profiler, f"comments{phase_suffix}")
+
+            shard_results.append({
+                'sheet': sheet,
+                'label': shard['label'],
+                'card_count': len(card_to_row_map)
+            })
 
-        print(f"\n[SUCCESS] Migration complete!")
-        print(f"   Sheet ID: {sheet.id}")
-        print(f"   Sheet name: {sheet.name}")
-        print(f"\n[NEXT STEPS]")
-        print(f"   1. Open the sheet in Smartsheet")
-        print(f"   2. Switch to Card View")
-        print(f"   3. Set 'List' as the lane field")
-        print(f"   4. Enjoy your Kanban board!")
+        sheet = shard_results[0]['sheet']
+        if len(shard_results) > 1 and self.create_summary_sheet:
+            sheet = self.create_shard_summary_sheet(board_name, shard_results)
+
+        # Report warnings suppressed as repeats before the summary
+        flush_logging()
+        log.info(f"\n[SUCCESS] Migration complete!")
+        if len(shard_results) > 1:
+            for result in shard_results:
+                log.info(f"   Sheet {result['sheet'].id}: {result['sheet'].name} ({result['label']})")
+        log.info(f"   Sheet ID: {sheet.id}")
+        log.info(f"   Sheet name: {sheet.name}")
+        if self.token_pool:
+            log.info(f"   {self.token_pool.summary()}")
+        if self.wire_stats.requests:
+            log.info(f"   {self.wire_stats.summary()}")
+        if self.cassette is not None:
+            log.info(f"   {self.cassette.summary()}")
+        if self.memory_profiler is not None:
+            profile_phase(self.memory_profiler, 'finish')
+            self.memory_profiler.stop()
+            log.info(f"   Memory profile: {self.memory_profiler.report_path}")
+        log.info(f"\n[NEXT STEPS]")
+        log.info(f"   1. Open the sheet in Smartsheet")
+        log.info(f"   2. Switch to Card View")
+        log.info(f"   3. Set 'List' as the lane field")
+        log.info(f"   4. Enjoy your Kanban board!")
 
         return sheet.id
 
+    def start_memory_profile(self, source: str, entry: Optional[str] = None) -> MemoryProfiler:
+        """
+        Start profiling the memory use of one board migration.
+
+        Args:
+            source: Export path or Trello API source of the board
+            entry: Board entry of a zip archive; its name is added to the
+                report file name
+
+        Returns:
+            The started MemoryProfiler, also stored as memory_profiler
+        """
+        if self.memory_profiler is not None:
+            # Left tracing by a migration that failed
+            self.memory_profiler.stop()
+
+        report_path = self.memory_profile
+        if entry:
+            root, extension = os.path.splitext(report_path)
+            report_path = f"{root}.{os.path.splitext(os.path.basename(entry))[0]}{extension}"
+        label = f"{source} ({entry})" if entry else source
+        self.memory_profiler = MemoryProfiler(report_path, label)
+        self.memory_profiler.start()
+        return self.memory_profiler
+
+    def migrate_archive(self, archive_path: str) -> Dict[str, int]:
+        """
+        Migrate every board of a zip archive of exports, one at a time.
+
+        Each entry is decompressed, migrated and released before the next one
+        is read. A board that fails is reported and the others still run.
+
+        Args:
+            archive_path: Path to a zip archive of Trello JSON exports
+
+        Returns:
+            Dictionary mapping entry names to sheet IDs, for the boards that
+            were migrated
+        """
+        entries = list_export_entries(archive_path)
+        log.info(f"[*] Archive {archive_path} holds {len(entries)} boards")
+
+        sheet_ids = {}
+        for index, entry in enumerate(entries, start=1):
+            log.info(f"\n{'=' * 60}\n[*] Board {index}/{len(entries)}: {entry}")
+            try:
+                sheet_ids[entry] = self.migrate_board(archive_path, entry)
+            except Exception as e:
+                log.warning(f"[WARN] Migration of {entry} failed: {e}")
+            # Overflow text belongs to the board just migrated
+            self.cell_overflow = {}
+
+        log.info(f"\n[OK] Migrated {len(sheet_ids)} of {len(entries)} boards from the archive")
+        return sheet_ids
+
+    def register_card_links(self, sheet: Sheet, trello_data: Dict[str, Any], card_to_row_map: Dict[str, int]):
+        """
+        Add the rows of a migrated sheet to the card link index, if there is one.
+
+        Args:
+            sheet: Sheet the cards were migrated to
+            trello_data: Board data holding the sheet's cards
+            card_to_row_map: Card ID -> row ID mapping of the sheet
+        """
+        if self.link_index is None:
+            return
+        permalink = sheet.permalink or self.smartsheet_client.Sheets.get_sheet(sheet.id, page_size=1).permalink
+        description_column_id = next((col.id for col in sheet.columns if col.title == 'Description'), None)
+        self.link_index.add_sheet(
+            sheet.id, permalink, description_column_id, trello_data.get('cards', []), card_to_row_map
+        )
+
+    def rewrite_card_links(self) -> int:
+        """
+        Point links between migrated cards at their rows, in the descriptions.
+
+        Descriptions were uploaded before the rows of later boards existed;
+        now that every board is migrated, the descriptions containing card
+        links are rewritten and updated with batched update_rows calls.
+        Text pushed out of a cell by the longer row permalinks is posted as
+        discussions on the row, as text cut from long cells is.
+
+        Returns:
+            Number of rows updated
+        """
+        log.info(f"\n[*] Rewriting links between cards...")
+        updated = 0
+        overflow_posted = 0
+        for sheet_id, updates in self.link_index.pending_updates():
+            rows = []
+            overflow = {}
+            for row_id, column_id, text, cut in updates:
+                row = Row()
+                row.id = row_id
+                row.cells.append({'column_id': column_id, 'value': text})
+                rows.append(row)
+                if cut:
+                    overflow[row_id] = cut
+
+            batcher = self.create_batcher('links')
+            for _, row_ids in batcher.run(
+                    rows, lambda batch: self.smartsheet_client.Bulk.update_rows(sheet_id, batch), resend):
+                updated += len(row_ids)
+                for row_id in row_ids:
+                    if row_id in overflow:
+                        for text in self.format_overflow('Description', overflow[row_id]):
+                            overflow_posted += self.post_discussion(sheet_id, row_id, text)
+
+        stats = self.link_index.stats
+        log.info(f"[OK] Rewrote {stats['rewritten']} card links ({updated} descriptions updated)")
+        if overflow_posted:
+            log.info(f"   Posted {overflow_posted} discussions with description text pushed out of its cell")
+        if stats['unresolved']:
+            log.info(f"   {stats['unresolved']} links still point at Trello (cards that were not migrated, "
+                     f"or comments posted before the linked board was migrated)")
+        return updated
+
+    def load_card_links(self, sheet_ids: List[int]):
+        """
+        Index the rows of sheets migrated earlier, for rewriting links to their cards.
+
+        Rows are indexed by the short link in their URL column, so links
+        written with a full card ID are not resolved.
+
+        Args:
+            sheet_ids: Sheets of a workspace migration
+
+        Raises:
+            ValueError: If a sheet has no URL column
+        """
+        if self.link_index is None:
+            self.link_index = CardLinkIndex()
+        for sheet_id in sheet_ids:
+            sheet = self.smartsheet_client.Sheets.get_sheet(sheet_id, page_size=1)
+            url_column_id = next((col.id for col in sheet.columns if col.title == 'URL'), None)
+            if url_column_id is None:
+                raise ValueError(f"Sheet {sheet_id} has no URL column; was it migrated from a Trello export?")
+            self.link_index.add_rows(sheet_id, sheet.permalink, (
+                (short_link_from_url(url), row_id)
+                for url, row_id in self.iter_url_column(sheet_id, url_column_id) if short_link_from_url(url)
+            ))
+        log.info(f"[OK] Indexed {self.link_index.stats['cards']} cards of {len(sheet_ids)} sheets for links")
+
+    def migrate_workspace(self, sources: List[str]) -> Dict[str, int]:
+        """
+        Migrate several boards together and link their cards to each other.
+
+        Every board is migrated as by migrate_board (into the configured
+        folder), while a global index maps each card's short link to its
+        sheet and row. Links in comments are rewritten as comments are
+        posted, for the cards migrated up to then; a final pass rewrites the
+        links in descriptions once every board is migrated. A board that
+        fails is reported and the others still run.
+
+        Args:
+            sources: Export files, zip archives of exports (every board is
+                migrated) or 'trello:<board id>' sources
+
+        Returns:
+            Dictionary mapping board labels (source, or archive entry) to
+            sheet IDs, for the boards that were migrated
+        """
+        boards = []
+        for source in sources:
+            if not source.startswith(TRELLO_SOURCE_PREFIX) and len(list_export_entries(source)) > 1:
+                boards.extend((source, entry) for entry in list_export_entries(source))
+            else:
+                boards.append((source, None))
+
+        destination = f"folder {self.folder_id}" if self.folder_id else "Home"
+        log.info(f"[*] Workspace migration: {len(boards)} boards into {destination}")
+        if self.link_index is None:
+            self.link_index = CardLinkIndex()
+
+        sheet_ids = {}
+        for index, (source, entry) in enumerate(boards, start=1):
+            label = entry or source
+            log.info(f"\n{'=' * 60}\n[*] Board {index}/{len(boards)}: {label}")
+            try:
+                sheet_ids[label] = self.migrate_board(source, entry)
+            except Exception as e:
+                log.warning(f"[WARN] Migration of {label} failed: {e}")
+            # Overflow text belongs to the board just migrated
+            self.cell_overflow = {}
+
+        self.rewrite_card_links()
+        log.info(f"\n[OK] Migrated {len(sheet_ids)} of {len(boards)} boards "
+                 f"({self.link_index.stats['cards']} cards indexed for links)")
+        return sheet_ids
+
+    def verify_board(self, trello_file_path: str, sheet_ids: List[int]) -> VerificationReport:
+        """
+        Compare migrated sheets with the rows and comments expected from the export.
+
+        The expected rows are rebuilt exactly as migrate_board builds them
+        (including contact checks and validation repairs), then each sheet is
+        read back with parallel paginated requests and compared row by row
+        through content hashes. Rows are matched to cards by their URL.
+
+        With a card link index (see load_card_links), links in the expected
+        descriptions are rewritten as migrate_workspace rewrote them,
+        including the discussions holding text pushed out of the cells.
+
+        Args:
+            trello_file_path: Path to Trello JSON export file, or
+                'trello:<board id>' to read the board from the Trello API
+            sheet_ids: Sheets the board was migrated to (all shards)
+
+        Returns:
+            VerificationReport; check report.ok
+        """
+        trello_data = self.load_trello_source(trello_file_path)
+        list_names = self.extract_list_names(trello_data)
+        label_names = self.extract_label_names(trello_data)
+        custom_fields = self.extract_custom_fields(trello_data)
+
+        # Apply the same email and content repairs as the migration did
+        if self.contact_directory is not None:
+            self.check_member_contacts(trello_data)
+        if self.validate_rows:
+            self.validate_board_rows(trello_data, list_names, label_names, custom_fields)
+
+        log.info(f"\n[*] Verifying {len(sheet_ids)} sheet(s)...")
+
+        columns = self.build_sheet_columns(list_names, label_names, custom_fields)
+        titles = [col.title for col in columns]
+        positions = {title: index for index, title in enumerate(titles)}
+        member_lookup = self.build_member_lookup(trello_data)
+        comments_by_card = self.extract_comments_for_cards(trello_data)
+
+        verifier = SheetVerifier(self.smartsheet_client)
+        for card_id, row in self.iter_card_rows(trello_data, positions, custom_fields):
+            texts = self.build_discussion_texts(card_id, comments_by_card, member_lookup)
+            if self.link_index is not None:
+                for cell in row.cells:
+                    if cell.column_id == positions['Description'] and cell.value:
+                        cell.value, cut = self.link_index.rewrite_cell(cell.value)
+                        texts.extend(self.format_overflow('Description', cut))
+            values = {titles[cell.column_id]: cell_text(cell) for cell in row.cells}
+            verifier.expect(card_id, values, texts)
+
+        for sheet_id in sheet_ids:
+            verifier.verify_sheet(sheet_id)
+        report = verifier.finish()
+
+        if report.ok:
+            log.info(f"[OK] {report.format()}")
+        else:
+            log.warning(f"[WARN] {report.format()}")
+        return report
+
+
+def parse_cli_args(argv: List[str]):
+    """
+    Split command line arguments into positional arguments and --options.
+
+    Options are written as ``--name=value`` or ``--flag`` (value True).
+
+    Args:
+        argv: Command line arguments without the program name
+
+    Returns:
+        Tuple of (positional arguments, options dictionary)
+    """
+    args = []
+    options = {}
+    for arg in argv:
+        if arg.startswith('--'):
+            name, sep, value = arg[2:].partition('=')
+            options[name] = value if sep else True
+        else:
+            args.append(arg)
+    return args, options
+
 
 def main():
     """Main entry point for the script."""
@@ -697,24 +2467,60 @@ def main():
     print(f"Trello to Smartsheet Migration Tool v{__version__}")
     print("=" * 60)
 
+    args, options = parse_cli_args(sys.argv[1:])
+
     # Check arguments
-    if len(sys.argv) < 2:
-        print("Usage: python trello_to_smartsheet_kanban.py <trello_export.json> [api_token] [folder_id] [email_mapping.xlsx]")
+    if len(args) < 1:
+        print("Usage: python trello_to_smartsheet_kanban.py <trello_export.json> [api_token] [folder_id] [email_mapping.xlsx] [options]")
+        print("\nThe export may also be .json.gz, .json.zst or a .zip of exports (every board is migrated).")
+        print("Use trello:<board id> instead of a file to read the board from the Trello API")
+        print("(requires TRELLO_API_KEY and TRELLO_TOKEN environment variables).")
+        print("\nOptions:")
+        print("  --shard=list|date|rows|none   How to split boards too large for one sheet (default: list)")
+        print("  --summary-sheet               Create an index sheet linking all shards")
+        print("  --cache-dir=DIR               Cache parsed exports in DIR and reuse them on re-runs")
+        print("  --import[=xlsx|csv]           Upload all rows with a single sheet import")
+        print("  --no-validate                 Skip the offline row validation pass")
+        print("  --pipeline                    Upload comments while rows are still being inserted")
+        print("  --tokens=TOKEN2,TOKEN3        Extra API tokens to spread requests across")
+        print("  --lists=A,B                   Only migrate cards in these lists (names or IDs)")
+        print("  --labels=A,B                  Only migrate cards with one of these labels")
+        print("  --members=A,B                 Only migrate cards assigned to one of these members")
+        print("  --since=YYYY-MM-DD            Only migrate cards active on or after this date")
+        print("  --until=YYYY-MM-DD            Only migrate cards active on or before this date")
+        print("  --include-archived            Also migrate archived cards")
+        print("  --check-contacts              Check member emails against the Smartsheet user list")
+        print("  --contacts-ttl=SECONDS        How long the fetched user list is reused (default: 1 day)")
+        print("  --verify=SHEET_ID[,SHEET_ID]  Compare already migrated sheets with the export instead of migrating")
+        print("  --link-sheets=SHEET_ID[,...]  With --verify: every sheet of a --workspace migration, to check rewritten links")
+        print("  --workspace                   Migrate every export of a directory or archive and rewrite links between cards")
+        print("  --json-backend=NAME           orjson, simdjson, ujson or stdlib (default: fastest installed)")
+        print("  --compress                    gzip row upload requests")
+        print("  --memprofile[=FILE]           Record memory use per migration phase (default: memprofile.txt)")
+        print("  --log-level=LEVEL             debug, info, warning or error (default: info)")
+        print("  --log-json[=FILE]             Also write JSON lines to FILE (without FILE: JSON lines on stdout only)")
+        print("  --record=FILE                 Record all API requests and responses to a cassette file")
+        print("  --replay=FILE                 Answer API requests from a recorded cassette, at recorded latency")
+        print("  --replay-fast                 With --replay: answer immediately instead of at recorded latency")
+        print("  --build-workers=N|auto        Validate and build rows in N worker processes (auto: one per CPU)")
         sys.exit(1)
 
-    trello_file = sys.argv[1]
+    trello_file = args[0]
 
     # Check file exists
-    if not os.path.exists(trello_file):
+    if not trello_file.startswith(TRELLO_SOURCE_PREFIX) and not os.path.exists(trello_file):
         print(f"Error: File not found: {trello_file}")
         sys.exit(1)
 
     # Get API token from command line or environment
     api_token = None
-    if len(sys.argv) >= 3:
-        api_token = sys.argv[2]
+    if len(args) >= 2:
+        api_token = args[1]
     else:
         api_token = os.getenv('SMARTSHEET_ACCESS_TOKEN')
+    if not api_token and options.get('replay'):
+        # Replayed requests never reach the API
+        api_token = 'replay'
 
     if not api_token:
         print("Error: SMARTSHEET_ACCESS_TOKEN not provided")
@@ -725,30 +2531,153 @@ def main():
 
     # Get optional folder ID
     folder_id = None
-    if len(sys.argv) >= 4:
+    if len(args) >= 3:
         try:
-            folder_id = int(sys.argv[3])
+            folder_id = int(args[2])
             print(f"[*] Will create sheet in folder ID: {folder_id}")
         except ValueError:
-            print(f"[WARN] Invalid folder ID: {sys.argv[3]}, creating in Home")
+            print(f"[WARN] Invalid folder ID: {args[2]}, creating in Home")
 
     # Get optional email mapping file
     email_mapping_file = None
-    if len(sys.argv) >= 5:
-        email_mapping_file = sys.argv[4]
+    if len(args) >= 4:
+        email_mapping_file = args[3]
         if not os.path.exists(email_mapping_file):
             print(f"[WARN] Email mapping file not found: {email_mapping_file}")
             email_mapping_file = None
 
+    shard_strategy = options.get('shard', 'list')
+    if shard_strategy not in SHARD_STRATEGIES:
+        print(f"Error: Invalid shard strategy: {shard_strategy} (expected one of: {', '.join(SHARD_STRATEGIES)})")
+        sys.exit(1)
+
+    import_option = options.get('import')
+    import_format = import_option if isinstance(import_option, str) else 'xlsx'
+    if import_format not in ('xlsx', 'csv'):
+        print(f"Error: Invalid import format: {import_format} (expected xlsx or csv)")
+        sys.exit(1)
+
+    card_filter = None
+    filter_options = ('lists', 'labels', 'members', 'since', 'until', 'include-archived')
+    if any(name in options for name in filter_options):
+        for name in ('since', 'until'):
+            if name in options:
+                try:
+                    datetime.strptime(str(options[name]), '%Y-%m-%d')
+                except ValueError:
+                    print(f"Error: Invalid --{name} date: {options[name]} (expected YYYY-MM-DD)")
+                    sys.exit(1)
+        card_filter = CardFilter(
+            lists=[name for name in str(options.get('lists', '')).split(',') if name],
+            labels=[name for name in str(options.get('labels', '')).split(',') if name],
+            members=[name for name in str(options.get('members', '')).split(',') if name],
+            since=options.get('since') or None,
+            until=options.get('until') or None,
+            include_archived=bool(options.get('include-archived', False))
+        )
+
+    if options.get('json-backend'):
+        try:
+            json_backend.set_backend(str(options['json-backend']))
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+
+    if options.get('record') and options.get('replay'):
+        print("Error: --record and --replay cannot be combined")
+        sys.exit(1)
+    for name in ('record', 'replay'):
+        if options.get(name) is True:
+            print(f"Error: --{name} needs a cassette file (--{name}=FILE)")
+            sys.exit(1)
+
+    build_workers = options.get('build-workers', 0)
+    if build_workers is True or build_workers == 'auto':
+        build_workers = os.cpu_count() or 1
+    elif not str(build_workers).isdigit():
+        print(f"Error: Invalid --build-workers: {build_workers} (expected a number or 'auto')")
+        sys.exit(1)
+
+    log_level = str(options.get('log-level', 'info')).lower()
+    if log_level not in LOG_LEVELS:
+        print(f"Error: Invalid log level: {log_level} (expected one of: {', '.join(LOG_LEVELS)})")
+        sys.exit(1)
+    log_json = options.get('log-json')
+    if log_json is True:
+        # Bare --log-json: JSON lines replace the console output
+        log_json = '-'
+    configure_logging(level=log_level, json_file=log_json or None)
+    log.info(f"[*] JSON backend: {json_backend.BACKEND}")
+
+    cassette = None
+    try:
+        if options.get('record'):
+            cassette = Cassette(options['record'], 'record')
+        elif options.get('replay'):
+            cassette = Cassette(options['replay'], 'replay', latency_scale=0.0 if options.get('replay-fast') else 1.0)
+    except (OSError, ValueError) as e:
+        flush_logging()
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    memprofile_option = options.get('memprofile')
+    memory_profile = None
+    if memprofile_option:
+        memory_profile = memprofile_option if isinstance(memprofile_option, str) else 'memprofile.txt'
+
     # Run migration
     try:
-        migrator = TrelloToSmartsheetMigrator(api_token, folder_id, email_mapping_file)
-        migrator.migrate_board(trello_file)
+        migrator = TrelloToSmartsheetMigrator(
+            api_token,
+            folder_id,
+            email_mapping_file,
+            shard_strategy=shard_strategy,
+            create_summary_sheet=bool(options.get('summary-sheet', False)),
+            cache_dir=options.get('cache-dir') or None,
+            upload_mode='import' if import_option else 'rows',
+            import_format=import_format,
+            validate_rows=not options.get('no-validate', False),
+            pipeline=bool(options.get('pipeline', False)),
+            extra_tokens=[token for token in str(options.get('tokens', '')).split(',') if token],
+            card_filter=card_filter,
+            compress_requests=bool(options.get('compress', False)),
+            memory_profile=memory_profile,
+            cassette=cassette,
+            build_workers=int(build_workers)
+        )
+        if options.get('check-contacts'):
+            migrator.contact_directory = ContactDirectory(
+                migrator.smartsheet_client,
+                cache_dir=options.get('cache-dir') or None,
+                ttl=float(options.get('contacts-ttl', DEFAULT_CONTACTS_TTL))
+            )
+        if options.get('verify'):
+            sheet_ids = [int(sheet_id) for sheet_id in str(options['verify']).split(',') if sheet_id]
+            if options.get('link-sheets'):
+                migrator.load_card_links(
+                    [int(sheet_id) for sheet_id in str(options['link-sheets']).split(',') if sheet_id])
+            report = migrator.verify_board(trello_file, sheet_ids)
+            if not report.ok:
+                sys.exit(2)
+        elif options.get('workspace'):
+            if os.path.isdir(trello_file):
+                sources = sorted(
+                    os.path.join(trello_file, name) for name in os.listdir(trello_file)
+                    if name.lower().endswith(WORKSPACE_EXPORT_EXTENSIONS)
+                )
+            else:
+                sources = [trello_file]
+            migrator.migrate_workspace(sources)
+        elif not trello_file.startswith(TRELLO_SOURCE_PREFIX) and len(list_export_entries(trello_file)) > 1:
+            migrator.migrate_archive(trello_file)
+        else:
+            migrator.migrate_board(trello_file)
     except Exception as e:
-        print(f"\n[ERROR] Migration failed: {e}")
-        import traceback
-        traceback.print_exc()
+        log.error(f"\n[ERROR] Migration failed: {e}", exc_info=True)
         sys.exit(1)
+    finally:
+        if cassette is not None:
+            cassette.close()
 
 
 if __name__ == '__main__':